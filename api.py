@@ -2,18 +2,53 @@
 FastAPI Backend for Medicare Stars Analyzer
 Reuses all existing business logic from contract_report.py
 """
-from fastapi import FastAPI, HTTPException
+import asyncio
+import json
+import os
+import secrets
+
+from fastapi import FastAPI, Header, HTTPException, Request, WebSocket, WebSocketDisconnect
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 from fastapi.middleware.cors import CORSMiddleware
 from typing import List, Dict, Optional
 import pandas as pd
+import numpy as np
 
-from contract_report import ContractReportGenerator
+from contract_report import ContractReportGenerator, CAI_PATH
 from measure_config import get_measure_config
+from measure_index import MeasureIndex
+from contract_search import ContractSearchIndex
+from cai_calculator import CAICalculator
+from rating_engine import RatingEngine
+from whatif_session import WhatIfSessionStore, EDIT_DEBOUNCE_SECONDS
+from risk_engine import RiskEngine
+from cliff_scan import CliffScan, DEFAULT_TOLERANCE
+from star_gaps import StarGaps
+from contract_compare import ContractComparison
+import measure_profile
+import sensitivity
+import domain_rollup
+import leaderboards
+from measure_profile import get_profile
+from dataset_version import dataset_version
+from improvement import ImprovementEngine, find_prior_year_files, PRIOR_RATING_YEAR
+from cohorts import CohortIndex
+from sensitivity import get_sensitivity
+from domain_rollup import get_domain_rollup
+from leaderboards import get_leaderboards, DEFAULT_K
+from cut_shift import CutPointShift, DEFAULT_THRESHOLD, MAX_SWEEP_LEVELS
+from reweight import ReweightEngine
+from weight_profile import list_profiles, load_profile, profile_from_dict
+from singleflight import SingleFlight
+from memory_report import memory_report, trace_allocations
+from scenarios import ScenarioEvaluator, ScenarioStore, DEFAULT_SCENARIO_DB_PATH
 
 app = FastAPI(title="Medicare Stars API")
 
+# Debug endpoints need this token in X-Debug-Token; unset disables them
+DEBUG_TOKEN = os.environ.get("STARS_DEBUG_TOKEN", "")
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -26,6 +61,89 @@ app.add_middleware(
 # Initialize generator (loads data from CSV files in current directory)
 generator = ContractReportGenerator()
 
+# Columnar contract x measure index for cross-contract queries
+index = MeasureIndex(generator)
+
+# CAI-adjusted Part C, Part D and Overall ratings for every contract
+cai_calculator = CAICalculator(CAI_PATH)
+rating_engine = RatingEngine(index, cai_calculator)
+
+# Market-wide risk status, computed once and cached
+risk_engine = RiskEngine(index)
+cliff_scan = CliffScan(index)
+star_gaps = StarGaps(index)
+
+# Side-by-side comparisons, cached by contract set
+comparison = ContractComparison(index, rating_engine, star_gaps)
+
+# C30/D04 improvement measures, when the prior year's Measure Data is present
+prior_year_files = find_prior_year_files('.', PRIOR_RATING_YEAR)
+improvement_engine = (
+    ImprovementEngine.from_files(index, prior_year_files['measure_data'], prior_year_files['measure_stars'])
+    if prior_year_files else None
+)
+
+# Server-side what-if sessions (incremental rating updates)
+whatif_sessions = WhatIfSessionStore(rating_engine, improvement=improvement_engine)
+
+# Saved what-if scenarios, re-scored whenever the dataset changes
+scenario_evaluator = ScenarioEvaluator(rating_engine, improvement_engine)
+scenario_store = ScenarioStore(DEFAULT_SCENARIO_DB_PATH)
+# Hash over every table behind the ratings (incl. CAI and prior-year data); keys
+# scenario re-scoring, the per-version caches and SingleFlight
+current_dataset_hash = dataset_version()
+rescored = scenario_store.evaluate_if_stale(scenario_evaluator, current_dataset_hash)
+if rescored and rescored['evaluated']:
+    print(f"✓ Re-scored {rescored['evaluated']} saved scenarios: {len(rescored['changed'])} changed outcome")
+
+# Market-wide cut point shift scenarios
+cut_shift = CutPointShift(rating_engine)
+
+# Re-scoring under versioned weight profiles (weight_profiles/*.json)
+reweight_engine = ReweightEngine(rating_engine)
+
+# Bitmap indexes for cohort filters (org type, SNP, Puerto Rico, High/Low Performing, star levels)
+cohorts = CohortIndex.from_generator(generator, index, cai_calculator)
+
+# One-star sensitivity of every contract x measure, cached per dataset version
+get_sensitivity(rating_engine, current_dataset_hash)
+
+# HD1-HD5 / DD1-DD4 domain ratings for every contract, cached per dataset version
+get_domain_rollup(rating_engine, current_dataset_hash)
+
+# Presorted top/bottom-K leaderboards (ratings, measures, domains) with cohort filters
+get_leaderboards(rating_engine, current_dataset_hash, cohorts)
+
+# Concurrent identical requests share one computation
+flights = SingleFlight(version=current_dataset_hash)
+
+# Typeahead search over contract IDs, names and parent organizations
+search_index = ContractSearchIndex.from_generator(generator)
+
+def memory_components() -> Dict:
+    """Loaded datasets, indexes, engines and caches for the memory report"""
+    return {
+        "generator": generator,
+        "cai_calculator": cai_calculator,
+        "index": index,
+        "rating_engine": rating_engine,
+        "risk_engine": risk_engine,
+        "star_gaps": star_gaps,
+        "cliff_scan": cliff_scan,
+        "comparison": comparison,
+        "improvement_engine": improvement_engine,
+        "whatif_sessions": whatif_sessions,
+        "cohorts": cohorts,
+        "search_index": search_index,
+        "cut_shift": cut_shift,
+        "reweight_engine": reweight_engine,
+        "flights": flights,
+        "profile_cache": measure_profile._memory_cache,
+        "sensitivity_cache": sensitivity._cache,
+        "domain_cache": domain_rollup._cache,
+        "leaderboard_cache": leaderboards._cache,
+    }
+
 # Mount static files FIRST (before routes)
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
@@ -34,81 +152,128 @@ async def root():
     """Serve the main frontend"""
     return FileResponse("static/index.html")
 
+def build_contract_list() -> Dict:
+    """Contract list for the picker (one row per Measure Data contract)"""
+    metadata = generator.measure_data_table.metadata
+    summary = generator.summary_table
+    overall_of = dict(zip(summary['contract_id'].astype(str), summary['overall_rating']))
+    
+    contracts = []
+    for contract_id, org_name, marketing_name in zip(metadata['contract_id'].astype(str),
+                                                     metadata['org_type'].astype(str),
+                                                     metadata['contract_name'].astype(str)):
+        # Overall rating from summary (NaN where CMS gives a status instead)
+        overall = overall_of.get(contract_id)
+        overall_rating = float(overall) if overall is not None and overall == overall else None
+        
+        contracts.append({
+            "id": contract_id,
+            "org_name": org_name,
+            "marketing_name": marketing_name,
+            "overall_rating": overall_rating,
+            "display": f"{contract_id} - {marketing_name}" if marketing_name else contract_id
+        })
+    
+    return {"contracts": contracts}
+
 @app.get("/api/contracts")
 async def get_contracts():
     """Get list of all contracts"""
     try:
-        contracts = []
-        for _, row in generator.df_measure_data.iterrows():
-            contract_id = str(row.iloc[0]).strip()
-            org_name = str(row.iloc[1]).strip() if len(row) > 1 else ""
-            marketing_name = str(row.iloc[2]).strip() if len(row) > 2 else ""
-            
-            # Get overall rating from summary
-            summary_row = generator.df_summary[generator.df_summary.iloc[:, 0].astype(str).str.strip() == contract_id]
-            overall_rating = None
-            if not summary_row.empty:
-                overall_val = summary_row.iloc[0, 5]
-                try:
-                    overall_rating = int(float(overall_val))
-                except:
-                    pass
-            
-            contracts.append({
-                "id": contract_id,
-                "org_name": org_name,
-                "marketing_name": marketing_name,
-                "overall_rating": overall_rating,
-                "display": f"{contract_id} - {marketing_name}" if marketing_name else contract_id
-            })
-        
-        return {"contracts": contracts}
+        return await flights.do("contracts", None, build_contract_list)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/contracts/search")
+async def search_contracts(q: str = "", org_type: Optional[str] = None, snp: Optional[bool] = None,
+                           min_rating: Optional[float] = None, max_rating: Optional[float] = None,
+                           year: Optional[int] = None, limit: int = 20, cursor: Optional[str] = None):
+    """Search contracts by ID, name, marketing name or parent organization"""
+    try:
+        return search_index.search(
+            q, org_type=org_type, snp=snp, min_rating=min_rating, max_rating=max_rating,
+            year=year, limit=limit, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+def build_contract_detail(contract_id: str) -> Dict:
+    """Contract measures with risk, star gaps, CAI and CAI-adjusted ratings"""
+    report = generator.generate_report(contract_id)
+    risk = risk_engine.contract_risk(contract_id)
+    gaps = star_gaps.contract_gaps(contract_id)
+    
+    # Format measures for frontend
+    measures = []
+    for line in report['measure_lines']:
+        config = get_measure_config(line.measure_code)
+        measure_risk = risk['measures'].get(line.measure_code, {})
+        measure_gaps = gaps.get(line.measure_code, {})
+        
+        measures.append({
+            "code": line.measure_code,
+            "name": line.measure_name,
+            "weight": int(rating_engine.profile.weight(line.measure_code)),
+            "is_inverse": config.is_inverse if config else False,
+            "star_rating": line.star_rating,
+            "performance": line.performance_value,
+            "performance_numeric": line.performance_numeric,
+            "threshold_band": line.threshold_band,
+            "threshold_lower": line.threshold_lower,
+            "threshold_upper": line.threshold_upper,
+            "is_special": line.is_special,
+            "domain": line.domain,
+            "format_type": config.format_type if config else "PERCENTAGE",
+            "risk_status": measure_risk.get('status', 'N/A'),
+            "risk_outside": measure_risk.get('outside', False),
+            "distance_to_lower": measure_risk.get('distance_to_lower'),
+            "distance_to_upper": measure_risk.get('distance_to_upper'),
+            "gap_to_next": measure_gaps.get('gap_to_next'),
+            "next_threshold": measure_gaps.get('next_threshold'),
+            "next_inclusive": measure_gaps.get('next_inclusive', True),
+            "margin_above_floor": measure_gaps.get('margin_above_floor')
+        })
+    
+    # Calculate raw weighted average star
+    weighted_sum = 0
+    total_weight = 0
+    for measure in measures:
+        if measure['star_rating'] is not None:
+            weighted_sum += measure['star_rating'] * measure['weight']
+            total_weight += measure['weight']
+    
+    raw_weighted_avg = weighted_sum / total_weight if total_weight > 0 else 0
+    
+    return {
+        "contract_info": report['contract_info'],
+        "part_d_set": report['part_d_set'],
+        "measures": measures,
+        "raw_weighted_avg": round(raw_weighted_avg, 2),
+        "risk_score": risk['risk_score'],
+        "cai": cai_calculator.get_cai_for_contract(contract_id),
+        "cai_adjusted_ratings": rating_engine.contract_ratings(contract_id),
+        "domains": get_domain_rollup(rating_engine, current_dataset_hash).contract_domains(contract_id)
+    }
+
 @app.get("/api/contract/{contract_id}")
 async def get_contract(contract_id: str):
     """Get detailed contract performance data"""
     try:
-        report = generator.generate_report(contract_id)
-        
-        # Format measures for frontend
-        measures = []
-        for line in report['measure_lines']:
-            config = get_measure_config(line.measure_code)
-            
-            measures.append({
-                "code": line.measure_code,
-                "name": line.measure_name,
-                "weight": int(config.weight) if config else 1,
-                "is_inverse": config.is_inverse if config else False,
-                "star_rating": line.star_rating,
-                "performance": line.performance_value,
-                "performance_numeric": line.performance_numeric,
-                "threshold_band": line.threshold_band,
-                "threshold_lower": line.threshold_lower,
-                "threshold_upper": line.threshold_upper,
-                "is_special": line.is_special,
-                "domain": line.domain,
-                "format_type": config.format_type if config else "PERCENTAGE"
-            })
-        
-        # Calculate raw weighted average star
-        weighted_sum = 0
-        total_weight = 0
-        for measure in measures:
-            if measure['star_rating'] is not None:
-                weighted_sum += measure['star_rating'] * measure['weight']
-                total_weight += measure['weight']
-        
-        raw_weighted_avg = weighted_sum / total_weight if total_weight > 0 else 0
-        
-        return {
-            "contract_info": report['contract_info'],
-            "part_d_set": report['part_d_set'],
-            "measures": measures,
-            "raw_weighted_avg": round(raw_weighted_avg, 2)
-        }
+        return await flights.do("contract", {"contract_id": contract_id}, build_contract_detail, contract_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/compare")
+async def compare_contracts(ids: str):
+    """Compare several contracts (comma-separated IDs) measure by measure"""
+    try:
+        return await flights.do("compare", {"ids": ids}, comparison.compare, ids)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -133,6 +298,416 @@ async def calculate_whatif(data: dict):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/whatif/session")
+async def create_whatif_session(data: dict):
+    """Start a what-if session for a contract"""
+    try:
+        session = whatif_sessions.create(data.get("contract_id", ""))
+        return session.to_dict()
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/whatif/session/{session_id}")
+async def update_whatif_session(session_id: str, data: dict):
+    """Apply one measure change; returns only the ratings that changed"""
+    try:
+        session = whatif_sessions.get(session_id)
+        value = data.get("value")
+        return session.apply(data.get("measure_code", ""), None if value is None else float(value))
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/whatif/session/{session_id}")
+async def get_whatif_session(session_id: str):
+    """Get the full state of a what-if session"""
+    try:
+        return whatif_sessions.get(session_id).to_dict()
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+
+@app.delete("/api/whatif/session/{session_id}")
+async def delete_whatif_session(session_id: str):
+    """End a what-if session"""
+    whatif_sessions.delete(session_id)
+    return {"deleted": session_id}
+
+@app.websocket("/api/whatif/ws")
+async def whatif_socket(websocket: WebSocket, contract_id: str = "", session_id: Optional[str] = None):
+    """
+    Streamed what-if edits over one connection
+    
+    Opens (or resumes, with session_id) a session and sends its state. The client
+    then sends {"measure_code", "value"} edits or {"type": "reset"}; edits arriving
+    within EDIT_DEBOUNCE_SECONDS are coalesced (latest value per measure wins) and
+    answered with one {"type": "update"} carrying the new stars and changed ratings.
+    """
+    await websocket.accept()
+    try:
+        session = whatif_sessions.get(session_id) if session_id else whatif_sessions.create(contract_id)
+    except (KeyError, ValueError) as e:
+        await websocket.send_json({"type": "error", "detail": str(e.args[0])})
+        await websocket.close(code=1008)
+        return
+    await websocket.send_json({"type": "state", **session.to_dict()})
+    
+    pending: Dict[str, Optional[float]] = {}
+    edited = asyncio.Event()
+    
+    async def push_updates():
+        while True:
+            await edited.wait()
+            await asyncio.sleep(EDIT_DEBOUNCE_SECONDS)
+            edits = dict(pending)
+            pending.clear()
+            edited.clear()
+            try:
+                update = session.apply_many(edits)
+            except (TypeError, ValueError) as e:
+                await websocket.send_json({"type": "error", "detail": str(e)})
+                continue
+            await websocket.send_json({"type": "update", **update})
+    
+    sender = asyncio.create_task(push_updates())
+    try:
+        while True:
+            try:
+                message = json.loads(await websocket.receive_text())
+                if not isinstance(message, dict):
+                    raise ValueError
+            except ValueError:
+                await websocket.send_json({"type": "error", "detail": "Messages must be JSON objects"})
+                continue
+            if message.get("type") == "reset":
+                for code in list(pending) + list(session.overrides):
+                    pending[code] = None
+            else:
+                pending[str(message.get("measure_code", ""))] = message.get("value")
+            edited.set()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        sender.cancel()
+
+@app.get("/api/scenarios")
+async def list_scenarios(contract_id: Optional[str] = None):
+    """List saved what-if scenarios (optionally for one contract)"""
+    try:
+        return {"scenarios": scenario_store.list(contract_id)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/scenarios")
+async def save_scenario(data: dict):
+    """Save a named scenario (same name replaces it): contract_id, values, optional cut_points"""
+    try:
+        return scenario_store.save(
+            scenario_evaluator, data.get("name", ""), data.get("contract_id", ""),
+            data.get("values") or {}, data.get("cut_points") or {}, current_dataset_hash,
+        )
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    except (ValueError, TypeError, AttributeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/scenarios/evaluate")
+async def evaluate_scenarios():
+    """Re-score every saved scenario and report which changed outcome"""
+    try:
+        return scenario_store.evaluate_all(scenario_evaluator, current_dataset_hash)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/scenarios/{scenario_id}")
+async def get_scenario(scenario_id: int):
+    """Get one saved scenario"""
+    try:
+        return scenario_store.get(scenario_id)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+
+@app.delete("/api/scenarios/{scenario_id}")
+async def delete_scenario(scenario_id: int):
+    """Delete a saved scenario"""
+    try:
+        scenario_store.delete(scenario_id)
+        return {"deleted": scenario_id}
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+
+@app.get("/api/risk")
+async def get_market_risk(sort: str = "score", limit: int = 100, offset: int = 0):
+    """Get risk scores for all contracts"""
+    try:
+        return await flights.do("risk", {"sort": sort, "limit": limit, "offset": offset},
+                                risk_engine.market_risk, sort=sort, limit=limit, offset=offset)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/cliff")
+async def get_cliff_scan(tolerance: float = DEFAULT_TOLERANCE, sort: str = "down",
+                         limit: int = 50, offset: int = 0, details: bool = True):
+    """Rank contracts by weighted stars within tolerance (in SDs) of a cut point"""
+    try:
+        params = {"tolerance": tolerance, "sort": sort, "limit": limit, "offset": offset, "details": details}
+        return await flights.do("cliff", params, cliff_scan.rank, tolerance,
+                                sort=sort, limit=limit, offset=offset, details=details)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/gaps")
+async def get_star_gaps(measure: Optional[str] = None, limit: int = 100, offset: int = 0):
+    """Get the contract-measures closest to their next star across the market"""
+    if measure is not None:
+        try:
+            index.get_column(measure)
+        except ValueError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+    try:
+        return await flights.do("gaps", {"measure": measure, "limit": limit, "offset": offset},
+                                star_gaps.smallest_gaps, measure, limit=limit, offset=offset)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/improvement/{contract_id}")
+async def get_improvement(contract_id: str):
+    """Get the modelled C30/D04 improvement scores and stars for a contract"""
+    if improvement_engine is None:
+        raise HTTPException(status_code=404, detail=f"No {PRIOR_RATING_YEAR} Measure Data loaded")
+    try:
+        return improvement_engine.contract_improvement(contract_id)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/cutshift")
+async def shift_cut_points(data: dict):
+    """
+    Re-score every contract with shifted cut points
+
+    Body: shift (positive tightens; in absolute mode percentage points, applied
+    to 0-100 scale measures only), optional measure_shifts {code: shift},
+    mode ('absolute' or 'percentile'), measures, threshold and limit
+    """
+    try:
+        return await flights.do(
+            "cutshift", data, cut_shift.apply,
+            float(data.get("shift", 0.0)), data.get("measure_shifts") or {}, data.get("mode", "absolute"),
+            data.get("measures") or None, float(data.get("threshold", DEFAULT_THRESHOLD)), data.get("limit"),
+        )
+    except (ValueError, TypeError, AttributeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/cutshift/sweep")
+async def sweep_cut_points(data: dict):
+    """Market summary at each shift level: shifts [...] or start, stop and steps (at most MAX_SWEEP_LEVELS)"""
+    try:
+        shifts = data.get("shifts")
+        if shifts is None:
+            steps = int(data.get("steps", 50))
+            if not 1 <= steps <= MAX_SWEEP_LEVELS:
+                raise ValueError(f"steps must be between 1 and {MAX_SWEEP_LEVELS}, got {steps}")
+            shifts = np.linspace(float(data.get("start", -5.0)), float(data.get("stop", 5.0)), steps)
+        return await flights.do("cutshift_sweep", data, cut_shift.sweep, shifts, data.get("mode", "absolute"),
+                                data.get("measures") or None, float(data.get("threshold", DEFAULT_THRESHOLD)))
+    except (ValueError, TypeError, AttributeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/weights/profiles")
+async def get_weight_profiles():
+    """List the weight profiles in weight_profiles/"""
+    return {'current': reweight_engine.current.name, 'profiles': list_profiles()}
+
+@app.get("/api/weights/profiles/{name}")
+async def get_weight_profile(name: str):
+    """Get one weight profile with its extends resolved"""
+    try:
+        return load_profile(name).to_dict()
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/weights/compare")
+async def compare_weight_profile(data: dict):
+    """
+    Re-score the market under a weight profile and diff against the current one
+
+    Body: profile (a saved profile name) or an inline profile (name, extends,
+    weights, overall_duplicates), plus an optional limit on changed contracts
+    """
+    try:
+        profile = load_profile(data["profile"]) if data.get("profile") else profile_from_dict(data)
+        return await flights.do("weights_compare", data, reweight_engine.compare, profile, limit=data.get("limit"))
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    except (ValueError, TypeError, AttributeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/cohorts")
+async def filter_cohort(request: Request, limit: int = 100, offset: int = 0):
+    """
+    Filter contracts by any combination of cohort fields
+
+    Repeat a field to OR values (org_type=Local CCP&org_type=PFFS); fields are
+    ANDed, as are star clauses (star=C12:2&star=C01:4-5&low_performing=true)
+    """
+    criteria: Dict[str, List[str]] = {}
+    for key, value in request.query_params.multi_items():
+        if key not in ('limit', 'offset'):
+            criteria.setdefault(key, []).append(value)
+    try:
+        return cohorts.filter(criteria, limit=limit, offset=offset)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/sensitivity")
+async def get_rating_sensitivity(part: str = "overall", direction: str = "up",
+                                 contract_id: Optional[str] = None, measure: Optional[str] = None,
+                                 limit: int = 100, offset: int = 0):
+    """
+    Rating change from moving one measure one star, ranked by impact
+
+    part picks the rating to sort by (part_c, part_d, overall); direction=up
+    lists the biggest gains first, down the biggest losses
+    """
+    try:
+        params = {"part": part, "direction": direction, "contract_id": contract_id,
+                  "measure": measure, "limit": limit, "offset": offset}
+        return await flights.do("sensitivity", params, get_sensitivity(rating_engine, current_dataset_hash).ranked,
+                                part, direction, contract_id=contract_id, measure_code=measure,
+                                limit=limit, offset=offset)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/domains")
+async def get_domains():
+    """Domains with their measures and market-wide domain star distribution"""
+    try:
+        return {"domains": get_domain_rollup(rating_engine, current_dataset_hash).summary()}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/domains/{domain}")
+async def get_domain_leaderboard(domain: str, sort: str = "star", org_type: Optional[str] = None,
+                                 limit: int = 100, offset: int = 0):
+    """
+    Contracts ranked by one domain's rating
+
+    sort=star ranks by domain star then mean star; mean and weighted rank by
+    the unweighted or summary-weighted average
+    """
+    try:
+        params = {"domain": domain, "sort": sort, "org_type": org_type, "limit": limit, "offset": offset}
+        return await flights.do("domains", params, get_domain_rollup(rating_engine, current_dataset_hash).leaderboard,
+                                domain, sort, limit=limit, offset=offset, org_type=org_type)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/leaderboards")
+async def list_leaderboards():
+    """Leaderboard names: rating parts, measure codes and domains"""
+    return {"boards": get_leaderboards(rating_engine, current_dataset_hash, cohorts).list_boards()}
+
+@app.get("/api/leaderboards/{board}")
+async def get_leaderboard(board: str, request: Request, end: str = "top", k: int = DEFAULT_K, offset: int = 0):
+    """
+    Top or bottom K contracts by overall/part_c/part_d rating, measure or domain
+
+    Any cohort field narrows the board (parent_org=Humana Inc.&org_type=Local CCP),
+    as in /api/cohorts
+    """
+    criteria: Dict[str, List[str]] = {}
+    for key, value in request.query_params.multi_items():
+        if key not in ('end', 'k', 'offset'):
+            criteria.setdefault(key, []).append(value)
+    try:
+        return get_leaderboards(rating_engine, current_dataset_hash, cohorts).ranked(
+            board, end, k=k, offset=offset, criteria=criteria)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/measure/{measure_code}")
+async def get_measure_distribution(measure_code: str, bins: int = 20):
+    """Get the distribution of one measure across all contracts"""
+    try:
+        index.get_column(measure_code)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    try:
+        return index.measure_distribution(measure_code, bins=bins)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/profile")
+async def get_data_profile():
+    """Get the per-measure data profile (cached by dataset hash)"""
+    try:
+        return await flights.do("profile", None, get_profile)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/singleflight")
+async def get_singleflight_stats():
+    """Get request coalescing counters for this worker"""
+    return flights.stats()
+
+@app.get("/api/debug/memory")
+async def get_memory_report(x_debug_token: Optional[str] = Header(None), columns: bool = False,
+                            trace_contract: Optional[str] = None, top: int = 10):
+    """
+    Memory used by each table, column, index and cache (needs STARS_DEBUG_TOKEN)
+
+    trace_contract runs one contract detail request under tracemalloc and adds
+    its top allocating lines
+    """
+    if not DEBUG_TOKEN:
+        raise HTTPException(status_code=404, detail="Debug endpoints are disabled")
+    if not x_debug_token or not secrets.compare_digest(x_debug_token, DEBUG_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid debug token")
+    try:
+        trace = None
+        if trace_contract:
+            _, trace = await asyncio.to_thread(trace_allocations, build_contract_detail, trace_contract, top=top)
+        report = await asyncio.to_thread(memory_report, memory_components(), columns)
+        return {**report, "trace": trace}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
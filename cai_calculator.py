@@ -3,79 +3,94 @@ CAI (Categorical Adjustment Index) Calculator
 Maps FAC (Final Adjustment Category) to CAI values per CMS Technical Notes 2026
 """
 
-import pandas as pd
-from typing import Optional, Dict
-
-# CAI Values from Technical Notes Tables 12, 15, 18, 21
-# These are the exact values CMS uses to adjust star ratings
-
-CAI_VALUES_OVERALL = {
-    1: -0.063262,
-    2: -0.040422,
-    3: -0.017803,
-    4: 0.003256,
-    5: 0.018790,
-    6: 0.045683,
-    7: 0.058145,
-    8: 0.101257,
-    9: 0.145515
-}
+import csv
+import numpy as np
+from typing import Optional, Dict, List
 
-CAI_VALUES_PART_C = {
-    1: -0.058259,
-    2: -0.036927,
-    3: -0.013699,
-    4: 0.004022,
-    5: 0.032302,
-    6: 0.059788,
-    7: 0.080451,
-    8: 0.102370
-}
+from ingest import load_cai_table
 
-CAI_VALUES_PART_D_MAPD = {
-    1: -0.033144,
-    2: -0.014987,
-    3: -0.002688,
-    4: 0.046282,
-    5: 0.072332,
-    6: 0.128476
-}
+# CAI values from Technical Notes Tables 12, 15, 18, 21 live in a data file so a
+# new release only needs a new table, not a code change
+DEFAULT_CAI_VALUES_PATH = 'cai_values.csv'
 
-CAI_VALUES_PART_D_PDP = {
-    1: -0.028,  # Approximate - need to verify from tech notes
-    2: -0.010,
-    3: 0.015,
-    4: 0.045
+# Table names in cai_values.csv and the CAI CSV column holding each table's FAC
+CAI_TABLES = {
+    'part_c': 'Part C FAC',
+    'part_d_mapd': 'Part D MA-PD FAC',
+    'part_d_pdp': 'Part D PDP FAC',
+    'overall': 'Overall FAC',
 }
 
 
+def load_cai_values(path: str = DEFAULT_CAI_VALUES_PATH) -> Dict[str, Dict[int, float]]:
+    """
+    Load CAI values per table from a CSV with columns table, fac, cai_value
+
+    Returns:
+        {'overall': {1: -0.063262, ...}, 'part_c': {...}, ...}
+    """
+    tables: Dict[str, Dict[int, float]] = {name: {} for name in CAI_TABLES}
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            table = row['table'].strip()
+            if table not in tables:
+                raise ValueError(f"Unknown CAI table '{table}' in {path}")
+            tables[table][int(row['fac'])] = float(row['cai_value'])
+    return tables
+
+
+def build_cai_lookup(values: Dict[int, float]) -> np.ndarray:
+    """Lookup array indexed by FAC (index 0 = no FAC = no adjustment)"""
+    lookup = np.zeros(max(values, default=0) + 1)
+    for fac, cai in values.items():
+        lookup[fac] = cai
+    return lookup
+
+
 class CAICalculator:
     """Handles CAI data loading and adjustment calculations"""
-    
-    def __init__(self, cai_csv_path: str):
-        """Load CAI data from CSV"""
-        self.df_cai = pd.read_csv(cai_csv_path, skiprows=1)
-        print(f"✓ Loaded CAI data for {len(self.df_cai)} contracts")
-    
+
+    def __init__(self, cai_csv_path: str, cai_values_path: str = DEFAULT_CAI_VALUES_PATH):
+        """Load CAI data from CSV and map every contract's FACs to CAI values"""
+        self.cai_table = load_cai_table(cai_csv_path)
+        self.cai_values = load_cai_values(cai_values_path)
+        self.lookups = {name: build_cai_lookup(values) for name, values in self.cai_values.items()}
+
+        self.contract_ids = self.cai_table['contract_id'].astype(str).to_numpy(dtype=object)
+        self.row_of = {cid: r for r, cid in enumerate(self.contract_ids)}
+
+        # FAC columns arrive as int8 (0 = N/A)
+        self.fac = {name: self.cai_table[f'{name}_fac'].to_numpy() for name in CAI_TABLES}
+        self.cai = {name: self._map_fac(name, fac) for name, fac in self.fac.items()}
+
+        # Part D uses the MA-PD table when the contract has an MA-PD FAC, else PDP
+        self.cai['part_d'] = np.where(
+            self.fac['part_d_mapd'] > 0, self.cai['part_d_mapd'], self.cai['part_d_pdp']
+        )
+        print(f"✓ Loaded CAI data for {len(self.cai_table)} contracts")
+
+    def _map_fac(self, table: str, fac: np.ndarray) -> np.ndarray:
+        """Map FAC codes through a lookup array (unknown FACs get no adjustment)"""
+        lookup = self.lookups[table]
+        in_table = fac < len(lookup)
+        return np.where(in_table, lookup[np.where(in_table, fac, 0)], 0.0)
+
     def get_cai_for_contract(self, contract_id: str) -> Dict[str, Optional[float]]:
         """
         Get CAI values for a specific contract
-        
+
         Returns dict with:
         - overall_fac: Overall FAC category (1-9)
         - part_c_fac: Part C FAC category (1-8)
         - part_d_mapd_fac: Part D MA-PD FAC category (1-6)
-        - part_d_pdp_fac: Part D PDP FAC category (1-4)
+        - part_d_pdp_fac: Part D PDP FAC category (1-3)
         - overall_cai: Overall CAI value
         - part_c_cai: Part C CAI value
         - part_d_cai: Part D CAI value
         """
-        contract_id = str(contract_id).strip()
-        
-        # Find contract in CAI data
-        row = self.df_cai[self.df_cai.iloc[:, 0].astype(str).str.strip() == contract_id]
-        
-        if row.empty:
+        r = self.row_of.get(str(contract_id).strip())
+
+        if r is None:
             return {
                 'overall_fac': None,
                 'part_c_fac': None,
@@ -85,62 +100,45 @@ class CAICalculator:
                 'part_c_cai': 0,
                 'part_d_cai': 0
             }
-        
-        row = row.iloc[0]
-        
-        # Parse FAC values from CSV (columns: Part C FAC, Part D MA-PD FAC, Part D PDP FAC, Overall FAC)
-        part_c_fac = self._parse_fac(row.iloc[5])  # Column index 5: Part C FAC
-        part_d_mapd_fac = self._parse_fac(row.iloc[6])  # Column index 6: Part D MA-PD FAC
-        part_d_pdp_fac = self._parse_fac(row.iloc[7])  # Column index 7: Part D PDP FAC
-        overall_fac = self._parse_fac(row.iloc[8])  # Column index 8: Overall FAC
-        
-        # Map FAC to CAI values
-        overall_cai = CAI_VALUES_OVERALL.get(overall_fac, 0) if overall_fac else 0
-        part_c_cai = CAI_VALUES_PART_C.get(part_c_fac, 0) if part_c_fac else 0
-        
-        # Determine Part D CAI based on contract type
-        part_d_cai = 0
-        if part_d_mapd_fac:
-            part_d_cai = CAI_VALUES_PART_D_MAPD.get(part_d_mapd_fac, 0)
-        elif part_d_pdp_fac:
-            part_d_cai = CAI_VALUES_PART_D_PDP.get(part_d_pdp_fac, 0)
-        
+
+        def fac(name):
+            return int(self.fac[name][r]) or None
+
+        return {
+            'overall_fac': fac('overall'),
+            'part_c_fac': fac('part_c'),
+            'part_d_mapd_fac': fac('part_d_mapd'),
+            'part_d_pdp_fac': fac('part_d_pdp'),
+            'overall_cai': float(self.cai['overall'][r]),
+            'part_c_cai': float(self.cai['part_c'][r]),
+            'part_d_cai': float(self.cai['part_d'][r])
+        }
+
+    def aligned_cai(self, contract_ids: List[str]) -> Dict[str, np.ndarray]:
+        """
+        CAI arrays ('part_c', 'part_d', 'overall') reordered to match contract_ids
+
+        Contracts missing from the CAI table get no adjustment.
+        """
+        rows = np.array([self.row_of.get(str(cid).strip(), -1) for cid in contract_ids])
+        found = rows >= 0
         return {
-            'overall_fac': overall_fac,
-            'part_c_fac': part_c_fac,
-            'part_d_mapd_fac': part_d_mapd_fac,
-            'part_d_pdp_fac': part_d_pdp_fac,
-            'overall_cai': overall_cai,
-            'part_c_cai': part_c_cai,
-            'part_d_cai': part_d_cai
+            name: np.where(found, self.cai[name][np.where(found, rows, 0)], 0.0)
+            for name in ('part_c', 'part_d', 'overall')
         }
-    
-    def _parse_fac(self, value) -> Optional[int]:
-        """Parse FAC value from CSV (handle N/A, etc.)"""
-        if pd.isna(value):
-            return None
-        
-        try:
-            val_str = str(value).strip().upper()
-            if val_str in ['N/A', 'NA', '']:
-                return None
-            return int(float(val_str))
-        except (ValueError, TypeError):
-            return None
-    
+
     def apply_cai_to_rating(self, raw_rating: float, cai_value: float) -> float:
         """
         Apply CAI adjustment to a raw star rating
-        
+
         Args:
             raw_rating: The unadjusted star rating
             cai_value: The CAI adjustment value
-            
+
         Returns:
             Adjusted star rating (raw + CAI)
         """
         if raw_rating is None or cai_value is None:
             return raw_rating
-        
-        return raw_rating + cai_value
 
+        return raw_rating + cai_value
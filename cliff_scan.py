@@ -0,0 +1,197 @@
+"""
+Market-wide cliff scan
+Ranks every contract by the weighted stars it could lose or gain from small performance moves
+"""
+
+import argparse
+import csv
+import sys
+import numpy as np
+from typing import Dict, List
+
+from rating_engine import json_value
+from weight_profile import current_profile
+
+# Default tolerance in standard deviations of the measure across contracts
+DEFAULT_TOLERANCE = 0.1
+
+SORT_KEYS = ('down', 'up', 'net')
+
+
+class CliffScan:
+    """
+    Distance from every contract's performance to the edges of its star band
+
+    margin_down is how far performance can worsen before the measure drops a
+    star; margin_up is how far it must improve to gain one (both in measure
+    units, direction-aware for inverse measures, NaN where there is no edge to
+    cross). Margins are divided by the measure's standard deviation across
+    contracts so measures on different scales are comparable. A negative
+    margin means the published star does not follow the displayed value
+    (case-mix adjustment, CAHPS significance testing); those cells are left
+    out of the exposure and counted as outside_band instead.
+    """
+
+    def __init__(self, index):
+        self.index = index
+        # Overall-rating weight per measure (D02/D03 count once, under C28/C29)
+        self.weights = current_profile().part_weights(index.codes)['overall']
+        lower, upper = index.cut_points.band_edges(index.stars, index.part_d_set)
+        values = index.values
+        inverse = index.is_inverse[None, :]
+        stars = index.stars
+
+        # Worse is higher for inverse measures, lower otherwise
+        edge_down = np.where(inverse, upper, lower)
+        edge_up = np.where(inverse, lower, upper)
+        self.margin_down = np.where(inverse, edge_down - values, values - edge_down)
+        self.margin_up = np.where(inverse, values - edge_up, edge_up - values)
+        self.margin_down[stars <= 1] = np.nan
+        self.margin_up[(stars == 5) | (stars == 0)] = np.nan
+
+        self.outside_band = (self.margin_down < 0) | (self.margin_up < 0)
+
+        self.spread = index.measure_spread()
+        self.scaled_down = self.margin_down / self.spread
+        self.scaled_up = self.margin_up / self.spread
+
+    def exposure(self, tolerance: float = DEFAULT_TOLERANCE) -> Dict[str, np.ndarray]:
+        """
+        Weighted stars within tolerance of an edge, per contract
+
+        Args:
+            tolerance: Distance in standard deviations
+
+        Returns:
+            Dictionary of (contracts,) arrays: down, up, net, count_down, count_up
+            plus the (contracts, measures) near_down / near_up masks
+        """
+        weights = self.weights[None, :]
+        with np.errstate(invalid='ignore'):
+            near_down = (self.scaled_down >= 0) & (self.scaled_down <= tolerance)
+            near_up = (self.scaled_up >= 0) & (self.scaled_up <= tolerance)
+        down = (near_down * weights).sum(axis=1)
+        up = (near_up * weights).sum(axis=1)
+        return {
+            'down': down,
+            'up': up,
+            'net': up - down,
+            'count_down': near_down.sum(axis=1),
+            'count_up': near_up.sum(axis=1),
+            'near_down': near_down,
+            'near_up': near_up,
+        }
+
+    def _measure_hits(self, r: int, mask: np.ndarray, scaled: np.ndarray, margin: np.ndarray) -> List[Dict]:
+        hits = [{
+            'code': self.index.codes[m],
+            'star': int(self.index.stars[r, m]),
+            'weight': float(self.weights[m]),
+            'performance': json_value(self.index.values[r, m], 4),
+            'margin': json_value(margin[r, m], 4),
+            'scaled_margin': json_value(scaled[r, m], 4),
+        } for m in np.flatnonzero(mask[r])]
+        return sorted(hits, key=lambda h: h['scaled_margin'])
+
+    def rank(self, tolerance: float = DEFAULT_TOLERANCE, sort: str = 'down',
+             limit: int = 50, offset: int = 0, details: bool = True) -> Dict:
+        """
+        Contracts ranked by weighted exposure
+
+        Args:
+            tolerance: Distance in standard deviations
+            sort: 'down' (most to lose), 'up' (most to gain) or 'net' (most net downside)
+            limit: Maximum contracts returned
+            offset: Contracts to skip
+            details: Include the measures near each edge
+
+        Returns:
+            Dictionary with tolerance, total and ranked contracts
+        """
+        if sort not in SORT_KEYS:
+            raise ValueError(f"Unknown sort: {sort} (use one of {', '.join(SORT_KEYS)})")
+        if not tolerance >= 0:
+            raise ValueError("Tolerance must be zero or positive")
+        if offset < 0:
+            raise ValueError("offset must be non-negative")
+
+        exp = self.exposure(tolerance)
+        key = {'down': -exp['down'], 'up': -exp['up'], 'net': exp['net']}[sort]
+        order = np.lexsort((self.index.contract_ids, key))
+        page = order[offset:offset + max(1, min(int(limit), 1000))]
+
+        contracts = []
+        for r in page:
+            item = {
+                'contract_id': self.index.contract_ids[r],
+                'org_type': self.index.org_type[r],
+                'exposure_down': float(exp['down'][r]),
+                'exposure_up': float(exp['up'][r]),
+                'net_exposure': float(exp['net'][r]),
+                'measures_down': int(exp['count_down'][r]),
+                'measures_up': int(exp['count_up'][r]),
+                'outside_band': int(self.outside_band[r].sum()),
+            }
+            if details:
+                item['near_down'] = self._measure_hits(r, exp['near_down'], self.scaled_down, self.margin_down)
+                item['near_up'] = self._measure_hits(r, exp['near_up'], self.scaled_up, self.margin_up)
+            contracts.append(item)
+
+        return {'tolerance': tolerance, 'sort': sort, 'total': int(len(order)), 'contracts': contracts}
+
+
+def print_scan(result: Dict):
+    """Print a ranked scan to console"""
+    print("\n" + "="*100)
+    print(f"CLIFF SCAN (tolerance {result['tolerance']} SD, sorted by {result['sort']})")
+    print("="*100)
+    print(f"{'Contract':<10} | {'Type':<22} | {'Down':>6} | {'Up':>6} | {'Net':>6} | Closest to losing a star")
+    print("-"*100)
+    for c in result['contracts']:
+        closest = ', '.join(f"{h['code']} ({h['scaled_margin']:+.2f})" for h in c.get('near_down', [])[:3])
+        print(f"{c['contract_id']:<10} | {str(c['org_type'])[:22]:<22} | {c['exposure_down']:>6.1f} | "
+              f"{c['exposure_up']:>6.1f} | {c['net_exposure']:>+6.1f} | {closest}")
+    print("="*100)
+
+
+def write_csv(result: Dict, path: str):
+    """Write one row per contract x near-edge measure"""
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['contract_id', 'exposure_down', 'exposure_up', 'direction',
+                         'measure', 'star', 'weight', 'performance', 'margin', 'scaled_margin'])
+        for c in result['contracts']:
+            for direction in ('down', 'up'):
+                for h in c.get(f'near_{direction}', []):
+                    writer.writerow([c['contract_id'], c['exposure_down'], c['exposure_up'], direction,
+                                     h['code'], h['star'], h['weight'], h['performance'],
+                                     h['margin'], h['scaled_margin']])
+
+
+def main():
+    """Main entry point"""
+    from contract_report import ContractReportGenerator
+    from measure_index import MeasureIndex
+
+    parser = argparse.ArgumentParser(description="Rank contracts by weighted stars near a cut point")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="distance in standard deviations (default %(default)s)")
+    parser.add_argument('--sort', choices=SORT_KEYS, default='down')
+    parser.add_argument('--top', type=int, default=25, help="contracts to show (default %(default)s)")
+    parser.add_argument('--csv', help="also write measure-level rows to this CSV")
+    args = parser.parse_args()
+
+    try:
+        scan = CliffScan(MeasureIndex(ContractReportGenerator()))
+        result = scan.rank(args.tolerance, sort=args.sort, limit=args.top)
+        print_scan(result)
+        if args.csv:
+            write_csv(scan.rank(args.tolerance, sort=args.sort, limit=1000), args.csv)
+            print(f"✓ Wrote {args.csv}")
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+"""
+Cohort bitmap indexes
+One bitset per attribute value over contract rows, so filter combinations are a few bitwise ANDs/ORs
+"""
+
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from contract_report import CAI_PATH
+from ingest import load_cai_table, load_contract_list
+from measure_index import PART_D_SETS
+
+HIGH_PERFORMING_PATH = '2026 Star Ratings Data Table - High Performing Contracts (Oct 8 2025).csv'
+LOW_PERFORMING_PATH = '2026 Star Ratings Data Table - Low Performing Contracts (Oct 8 2025).csv'
+
+# Filter fields with one bitmap per value ('star' is per measure: star=C12:2)
+FIELDS = ('org_type', 'parent_org', 'part_d_set', 'snp', 'puerto_rico_only',
+          'high_performing', 'low_performing', 'star')
+
+BOOLEAN_VALUES = {'true': 'true', 'yes': 'true', '1': 'true', 'false': 'false', 'no': 'false', '0': 'false'}
+
+DEFAULT_COHORT_LIMIT = 100
+
+
+def bitmap_from_mask(mask: np.ndarray) -> int:
+    """Boolean row mask as an int bitset (bit r = row r)"""
+    packed = np.packbits(np.asarray(mask, dtype=bool), bitorder='little')
+    return int.from_bytes(packed.tobytes(), 'little')
+
+
+def bitmap_rows(bits: int, n: int) -> np.ndarray:
+    """Row indices set in a bitset of n rows, ascending"""
+    packed = np.frombuffer(bits.to_bytes((n + 7) // 8, 'little'), dtype=np.uint8)
+    return np.flatnonzero(np.unpackbits(packed, bitorder='little')[:n])
+
+
+def _value_bitmaps(values: np.ndarray) -> Dict[str, int]:
+    """Bitmap per distinct value of a per-row array (values with no rows are not stored)"""
+    return {str(value): bitmap_from_mask(values == value) for value in np.unique(values)}
+
+
+def _flag_bitmaps(flags: np.ndarray) -> Dict[str, int]:
+    return {'true': bitmap_from_mask(flags), 'false': bitmap_from_mask(~flags)}
+
+
+def parse_star_clause(clause: str) -> Tuple[str, List[int]]:
+    """'C12:2' -> ('C12', [2]); 'C12:1-2' -> ('C12', [1, 2]); level 0 = not rated"""
+    code, sep, levels = str(clause).partition(':')
+    code = code.strip().upper()
+    try:
+        low, _, high = levels.partition('-')
+        low, high = int(low), int(high or low)
+    except ValueError:
+        raise ValueError(f"Star filter must look like C12:2 or C12:1-2, got '{clause}'")
+    if not sep or not 0 <= low <= high <= 5:
+        raise ValueError(f"Star filter must look like C12:2 or C12:1-2, got '{clause}'")
+    return code, list(range(low, high + 1))
+
+
+class CohortIndex:
+    """
+    Bitmap index over the contracts of a MeasureIndex
+
+    Every attribute value (org type, parent organization, Part D threshold
+    set, SNP, Puerto Rico only, High/Low Performing lists, and each measure's
+    star level) maps to a Python int used as a bitset over contract rows.
+    At ~800 contracts a bitset is ~100 bytes, so only values with at least one
+    contract are stored and a filter is a handful of big-int operations.
+    """
+
+    def __init__(self, index, snp: np.ndarray, puerto_rico_only: np.ndarray,
+                 high_performing: Iterable[str], low_performing: Iterable[str]):
+        self.index = index
+        self.n = len(index.contract_ids)
+        self.all = (1 << self.n) - 1
+
+        ids = index.contract_ids
+        high, low = set(high_performing), set(low_performing)
+        self.bitmaps: Dict[str, Dict[str, int]] = {
+            'org_type': _value_bitmaps(np.char.strip(index.org_type.astype(str))),
+            'parent_org': _value_bitmaps(np.char.strip(index.parent_org.astype(str))),
+            'part_d_set': _value_bitmaps(np.array(PART_D_SETS, dtype=object)[index.part_d_set].astype(str)),
+            'snp': _flag_bitmaps(np.asarray(snp, dtype=bool)),
+            'puerto_rico_only': _flag_bitmaps(np.asarray(puerto_rico_only, dtype=bool)),
+            'high_performing': _flag_bitmaps(np.array([cid in high for cid in ids], dtype=bool)),
+            'low_performing': _flag_bitmaps(np.array([cid in low for cid in ids], dtype=bool)),
+        }
+        self.star_bitmaps: Dict[str, Dict[int, int]] = {
+            code: {int(level): bitmap_from_mask(index.stars[:, m] == level)
+                   for level in np.unique(index.stars[:, m])}
+            for m, code in enumerate(index.codes)
+        }
+
+        count = sum(len(v) for v in self.bitmaps.values()) + sum(len(v) for v in self.star_bitmaps.values())
+        print(f"✓ Built cohort bitmaps: {count} bitmaps over {self.n} contracts")
+
+    @classmethod
+    def from_generator(cls, generator, index, cai_calculator=None,
+                       high_path: str = HIGH_PERFORMING_PATH, low_path: str = LOW_PERFORMING_PATH,
+                       cai_path: str = CAI_PATH) -> 'CohortIndex':
+        """Cohorts from the loaded Summary Ratings plus the CAI and High/Low Performing tables"""
+        summary = generator.summary_table
+        snp_of = dict(zip(summary['contract_id'].astype(str), summary['is_snp']))
+
+        cai_table = cai_calculator.cai_table if cai_calculator is not None else load_cai_table(cai_path)
+        pr_of = dict(zip(cai_table['contract_id'].astype(str), cai_table['puerto_rico_only']))
+
+        ids = index.contract_ids
+        return cls(
+            index,
+            snp=np.array([bool(snp_of.get(cid, False)) for cid in ids]),
+            puerto_rico_only=np.array([bool(pr_of.get(cid, False)) for cid in ids]),
+            high_performing=load_contract_list(high_path)['contract_id'].astype(str),
+            low_performing=load_contract_list(low_path)['contract_id'].astype(str),
+        )
+
+    def _field_bitmap(self, field: str, values: List[str]) -> int:
+        """OR of one field's value bitmaps"""
+        bits = 0
+        if field == 'star':
+            for clause in values:
+                code, levels = parse_star_clause(clause)
+                if code not in self.star_bitmaps:
+                    raise ValueError(f"Unknown measure code: {code}")
+                for level in levels:
+                    bits |= self.star_bitmaps[code].get(level, 0)
+            return bits
+
+        bitmaps = self.bitmaps[field]
+        for value in values:
+            value = str(value).strip()
+            if field in ('snp', 'puerto_rico_only', 'high_performing', 'low_performing'):
+                if value.lower() not in BOOLEAN_VALUES:
+                    raise ValueError(f"{field} must be true or false, got '{value}'")
+                value = BOOLEAN_VALUES[value.lower()]
+            bits |= bitmaps.get(value, 0)
+        return bits
+
+    def match(self, criteria: Dict[str, List[str]]) -> int:
+        """
+        Bitset of contracts matching every field (values within a field are ORed)
+
+        Star clauses are ANDed with each other, so star=[C12:2, C01:5] needs both.
+
+        Raises:
+            ValueError: For unknown fields, measure codes or malformed values
+        """
+        bits = self.all
+        for field, values in criteria.items():
+            if field not in FIELDS:
+                raise ValueError(f"Unknown cohort field: {field}")
+            if field == 'star':
+                for clause in values:
+                    bits &= self._field_bitmap('star', [clause])
+            else:
+                bits &= self._field_bitmap(field, values)
+        return bits
+
+    def filter(self, criteria: Dict[str, List[str]], limit: int = DEFAULT_COHORT_LIMIT,
+               offset: int = 0) -> Dict:
+        """
+        Contracts matching a filter combination
+
+        Args:
+            criteria: Field -> list of accepted values, e.g. {'org_type': ['Local CCP'],
+                'snp': ['true'], 'star': ['C12:2'], 'low_performing': ['true']}
+            limit: Page size
+            offset: Contracts to skip
+
+        Returns:
+            Dictionary with total, offset, limit and contracts [{contract_id,
+            org_type, marketing_name, parent_org}] in Measure Data order
+        """
+        if limit < 1 or offset < 0:
+            raise ValueError("limit must be positive and offset non-negative")
+        bits = self.match(criteria)
+        rows = bitmap_rows(bits, self.n)[offset:offset + limit]
+        index = self.index
+        return {
+            'total': bits.bit_count(),
+            'offset': offset,
+            'limit': limit,
+            'contracts': [{
+                'contract_id': index.contract_ids[r],
+                'org_type': index.org_type[r],
+                'marketing_name': index.marketing_name[r],
+                'parent_org': index.parent_org[r],
+            } for r in rows],
+        }
+
+    def values(self, field: str) -> Dict[str, int]:
+        """Contract count per value of a field (for filter pickers)"""
+        if field not in self.bitmaps:
+            raise ValueError(f"Unknown cohort field: {field}")
+        return {value: bits.bit_count() for value, bits in self.bitmaps[field].items()}
+
+
+# Test cases
+if __name__ == "__main__":
+    import time
+    from contract_report import ContractReportGenerator
+    from measure_index import MeasureIndex
+
+    print("Testing cohort bitmaps...")
+
+    mask = np.array([True, False, True] + [False] * 10 + [True])
+    bits = bitmap_from_mask(mask)
+    assert bits == 0b10000000000101
+    assert bitmap_rows(bits, len(mask)).tolist() == [0, 2, 13]
+    assert parse_star_clause('c12:1-2') == ('C12', [1, 2])
+    print("✓ Bitset round trip and star clauses work")
+
+    generator = ContractReportGenerator()
+    index = MeasureIndex(generator)
+    cohorts = CohortIndex.from_generator(generator, index)
+
+    c12 = index.get_column('C12')
+    criteria = {'org_type': ['Local CCP'], 'snp': ['true'], 'star': ['C12:2']}
+    result = cohorts.filter(criteria, limit=1000)
+    snp = bitmap_rows(cohorts.bitmaps['snp']['true'], cohorts.n)
+    expected = [r for r in snp
+                if index.org_type[r].strip() == 'Local CCP' and index.stars[r, c12] == 2]
+    assert [c['contract_id'] for c in result['contracts']] == [index.contract_ids[r] for r in expected]
+    print(f"✓ Local CCP, SNP, 2-star on C12: {result['total']} contracts")
+
+    low = cohorts.filter({'low_performing': ['yes']})
+    assert low['total'] == 4 and 'H4982' in [c['contract_id'] for c in low['contracts']]
+    assert cohorts.values('high_performing')['true'] > 0
+    assert cohorts.values('puerto_rico_only')['true'] > 0
+    print("✓ High/Low Performing and Puerto Rico flags loaded")
+
+    for bad in ({'colour': ['red']}, {'star': ['C12']}, {'snp': ['maybe']}, {'star': ['X99:1']}):
+        try:
+            cohorts.match(bad)
+            assert False, bad
+        except ValueError:
+            pass
+    print("✓ Bad filters are rejected")
+
+    criteria = {'org_type': ['Local CCP'], 'snp': ['true'], 'star': ['C12:2'], 'low_performing': ['true']}
+    start = time.perf_counter()
+    for _ in range(10000):
+        cohorts.match(criteria)
+    print(f"✓ {(time.perf_counter() - start) / 10000 * 1e6:.1f} µs per 4-field filter")
+
+    print("\n✅ All cohort tests passed!")
@@ -0,0 +1,183 @@
+"""
+Side-by-side contract comparison
+Aligned contracts x measures matrices sliced from the columnar index, cached by contract set
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from measure_config import MEASURE_CONFIGS
+from measure_index import PART_D_SETS
+
+# Most contracts accepted in one comparison
+MAX_COMPARE_CONTRACTS = 50
+
+# Comparisons kept in memory; the least recently used is dropped beyond this
+COMPARE_CACHE_SIZE = 256
+
+
+def _matrix(values: np.ndarray, digits: int = 6) -> List[List]:
+    """Float matrix as nested lists, None where not finite"""
+    finite = np.isfinite(values)
+    return np.where(finite, np.round(values.astype(np.float64), digits), None).tolist()
+
+
+def parse_contract_ids(ids) -> Tuple[str, ...]:
+    """Comma-separated string or list of IDs as a sorted, de-duplicated tuple"""
+    if isinstance(ids, str):
+        ids = ids.split(',')
+    return tuple(sorted({str(cid).strip().upper() for cid in ids if str(cid).strip()}))
+
+
+class ContractComparison:
+    """
+    Comparison matrices for a set of contracts
+
+    One fancy-indexing pass over the index, rating and gap arrays per request;
+    results are cached by the set of contract IDs, so the same comparison in a
+    different order (or repeated) is a dictionary lookup.
+    """
+
+    def __init__(self, index, rating_engine, star_gaps, cache_size: int = COMPARE_CACHE_SIZE):
+        self.index = index
+        self.rating_engine = rating_engine
+        self.star_gaps = star_gaps
+        self.cache_size = cache_size
+        self._cache: 'OrderedDict[Tuple[str, ...], Dict]' = OrderedDict()
+        # compare() runs in worker threads (SingleFlight); the LRU is only touched under this lock
+        self._lock = threading.Lock()
+
+        self.measures = [{
+            'code': code,
+            'name': MEASURE_CONFIGS[code].name,
+            'domain': MEASURE_CONFIGS[code].domain,
+            'weight': rating_engine.profile.weight(code),
+            'is_inverse': MEASURE_CONFIGS[code].is_inverse,
+            'format_type': MEASURE_CONFIGS[code].format_type,
+        } for code in index.codes]
+
+    def compare(self, contract_ids) -> Dict:
+        """
+        Compare contracts measure by measure
+
+        Args:
+            contract_ids: Comma-separated string or list of contract IDs
+
+        Returns:
+            Dictionary with contracts (metadata and ratings, sorted by ID),
+            measures, and contracts x measures matrices: stars, values, bands,
+            gap_to_next and margin_above_floor (None where missing)
+
+        Raises:
+            ValueError: If no IDs or more than MAX_COMPARE_CONTRACTS are given
+            KeyError: If any contract is unknown
+        """
+        key = parse_contract_ids(contract_ids)
+        if not key:
+            raise ValueError("No contract IDs given")
+        if len(key) > MAX_COMPARE_CONTRACTS:
+            raise ValueError(f"At most {MAX_COMPARE_CONTRACTS} contracts can be compared at once")
+
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return cached
+
+        missing = [cid for cid in key if cid not in self.index.row_of]
+        if missing:
+            raise KeyError(f"Contracts not found: {', '.join(missing)}")
+
+        result = self._build(key)
+        with self._lock:
+            self._cache[key] = result
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+    def _build(self, contract_ids: Tuple[str, ...]) -> Dict:
+        index = self.index
+        rows = np.array([index.row_of[cid] for cid in contract_ids])
+        stars = index.stars[rows]
+        sets = index.part_d_set[rows]
+
+        cols = np.arange(len(index.codes))[None, :]
+        star_idx = np.clip(stars.astype(np.intp) - 1, 0, 4)
+        bands = np.where(stars > 0, index.cut_points.band_text[sets[:, None], star_idx, cols], None)
+
+        contracts = [{
+            'contract_id': cid,
+            'org_type': index.org_type[r],
+            'marketing_name': index.marketing_name[r],
+            'parent_org': index.parent_org[r],
+            'part_d_set': PART_D_SETS[index.part_d_set[r]],
+            'ratings': self.rating_engine.contract_ratings(cid),
+        } for cid, r in zip(contract_ids, rows)]
+
+        return {
+            'contract_ids': list(contract_ids),
+            'contracts': contracts,
+            'measures': self.measures,
+            'stars': np.where(stars > 0, stars, None).tolist(),
+            'values': _matrix(index.values[rows]),
+            'bands': bands.tolist(),
+            'gap_to_next': _matrix(self.star_gaps.gap_to_next[rows]),
+            'margin_above_floor': _matrix(self.star_gaps.margin_above_floor[rows]),
+        }
+
+
+# Test cases
+if __name__ == "__main__":
+    import time
+    from contract_report import ContractReportGenerator
+    from measure_index import MeasureIndex
+    from rating_engine import RatingEngine
+    from star_gaps import StarGaps
+
+    print("Testing contract comparison...")
+    assert parse_contract_ids(' h1290, H0028,,H0028 ') == ('H0028', 'H1290')
+    print("✓ ID parsing works")
+
+    generator = ContractReportGenerator()
+    index = MeasureIndex(generator)
+    comparison = ContractComparison(index, RatingEngine(index), StarGaps(index))
+
+    result = comparison.compare('H1290,H0028')
+    assert result['contract_ids'] == ['H0028', 'H1290']
+    report = generator.generate_report('H0028')
+    for line in report['measure_lines']:
+        m = index.get_column(line.measure_code)
+        assert result['stars'][0][m] == line.star_rating, line.measure_code
+        if line.star_rating and line.threshold_band != 'N/A':
+            assert result['bands'][0][m] == line.threshold_band, line.measure_code
+    print("✓ Matrices match the contract report")
+
+    assert comparison.compare(['H0028', 'H1290']) is result
+    print("✓ Cached by contract set")
+
+    for bad in ('', 'H0028,ZZZZZ'):
+        try:
+            comparison.compare(bad)
+            assert False, bad
+        except (ValueError, KeyError):
+            pass
+    print("✓ Bad ID sets are rejected")
+
+    ids = list(index.contract_ids[:20])
+    start = time.perf_counter()
+    comparison.compare(ids)
+    print(f"✓ 20 contracts compared in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    # Worker threads hitting and evicting the LRU at once (as under SingleFlight)
+    from concurrent.futures import ThreadPoolExecutor
+    small = ContractComparison(index, comparison.rating_engine, comparison.star_gaps, cache_size=4)
+    pairs = [(ids[i % 8], ids[(i + 1) % 8]) for i in range(2000)]
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(small.compare, pairs))
+    assert len(small._cache) <= 4
+    print("✓ LRU stays consistent under concurrent compares")
+
+    print("\n✅ All comparison tests passed!")
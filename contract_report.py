@@ -7,34 +7,116 @@ Displays all measures for a contract with star ratings and cut point bands
 import sys
 import pandas as pd
 from typing import Optional, List, Dict
-from dataclasses import dataclass
 
 # Import our modules
-from data_parsers import (
-    is_special_value, normalize_value, parse_star_rating,
-    format_value_for_display, categorize_special_value
-)
+from data_parsers import format_number_for_display
 from threshold_parser import parse_threshold_band, format_band_for_display
+from ingest import load_measure_table, load_summary_table
+from measure_index import SPECIAL_CATEGORIES
+from stars_core.dataset import MeasureLine
 from measure_config import (
     get_measure_config, get_all_part_c_measures, get_all_part_d_measures,
     DOMAIN_NAMES, get_measures_by_domain
 )
 
+# CMS data tables (current directory)
+SUMMARY_PATH = '2026 Star Ratings Data Table - Summary Ratings (Oct 8 2025).csv'
+MEASURE_DATA_PATH = '2026 Star Ratings Data Table - Measure Data (Oct 8 2025).csv'
+MEASURE_STARS_PATH = '2026 Star Ratings Data Table - Measure Stars (Oct 8 2025).csv'
+PART_C_CUT_POINTS_PATH = '2026 Star Ratings Data Table - Part C Cut Points (Oct 8 2025).csv'
+PART_D_CUT_POINTS_PATH = '2026 Star Ratings Data Table - Part D Cut Points (Oct 8 2025).csv'
+CAI_PATH = '2026 Star Ratings Data Table - CAI (Oct 8 2025).csv'
+
+
+def part_d_threshold_set(contract_id: str, org_type: str) -> str:
+    """
+    Part D cut point set for a contract: 'PDP' for S contracts and PDP org types, else 'MA-PD'
+    """
+    contract_id = str(contract_id).strip()
+    org_type = str(org_type).strip()
+    
+    if contract_id.startswith('S'):
+        return 'PDP'
+    elif contract_id.startswith('H') or contract_id.startswith('R'):
+        return 'MA-PD'
+    elif 'PDP' in org_type:
+        return 'PDP'
+    else:
+        return 'MA-PD'
+
+
+def threshold_from_cut_points(df_cutpoints_c: pd.DataFrame, df_cutpoints_d: pd.DataFrame,
+                              measure_code: str, star_rating: int, part_d_set: str = 'MA-PD'):
+    """
+    Look up the threshold band for a measure at a given star rating in the raw cut point tables
+    
+    Returns:
+        Tuple of (formatted_string, lower_bound, upper_bound) or (None, None, None)
+    """
+    config = get_measure_config(measure_code)
+
+    try:
+        if config.part_type == 'C':
+            # Part C - rows 4-8 are 1-5 stars (indices 3-7)
+            row_idx = 3 + (star_rating - 1)
+            # Find column index for this measure in cutpoints file
+            # The cutpoints file has measure names in row 1 (index 1)
+            col_idx = None
+            for i, col in enumerate(df_cutpoints_c.iloc[1, 1:]):  # Skip first col
+                col_str = str(col).strip()
+                if config.code in col_str or config.name in col_str:
+                    col_idx = 1 + i
+                    break
 
-@dataclass
-class MeasureLine:
-    """Data for one measure in the report"""
-    measure_code: str
-    measure_name: str
-    star_rating: Optional[int]
-    performance_value: str
-    performance_numeric: Optional[float]
-    threshold_band: Optional[str]
-    threshold_lower: Optional[float]
-    threshold_upper: Optional[float]
-    is_special: bool
-    special_category: Optional[str]
-    domain: str
+            if col_idx is None:
+                return (None, None, None)
+
+            threshold_str = df_cutpoints_c.iloc[row_idx, col_idx]
+            band = parse_threshold_band(str(threshold_str))
+            lower, upper, _, _ = band
+            formatted = format_band_for_display(band, config.format_type)
+            return (formatted, lower, upper)
+
+        else:  # Part D
+            # MA-PD: indices 3-7 (1-5 stars), PDP: indices 8-12 (1-5 stars)
+            if part_d_set == 'MA-PD':
+                row_idx = 3 + (star_rating - 1)
+            else:  # PDP
+                row_idx = 8 + (star_rating - 1)
+
+            # Find column for this measure (measure names in row at index 1)
+            col_idx = None
+            for i, col in enumerate(df_cutpoints_d.iloc[1, 2:]):  # Skip first 2 cols
+                col_str = str(col).strip()
+                if config.code in col_str or config.name in col_str:
+                    col_idx = 2 + i
+                    break
+
+            if col_idx is None or row_idx >= len(df_cutpoints_d):
+                return (None, None, None)
+
+            threshold_str = df_cutpoints_d.iloc[row_idx, col_idx]
+            band = parse_threshold_band(str(threshold_str))
+            lower, upper, _, _ = band
+            formatted = format_band_for_display(band, config.format_type)
+            return (formatted, lower, upper)
+
+    except Exception as e:
+        # Silently handle parsing errors
+        return (None, None, None)
+
+
+def _first_rows(ids) -> Dict[str, int]:
+    """Contract ID -> first row holding it"""
+    rows: Dict[str, int] = {}
+    for r, contract_id in enumerate(ids):
+        rows.setdefault(str(contract_id), r)
+    return rows
+
+
+def _cell(value, default=None):
+    """Categorical cell, or default where the table has no value"""
+    return default if pd.isna(value) else value
 
 
 class ContractReportGenerator:
@@ -44,43 +126,30 @@ class ContractReportGenerator:
         """Load all data files"""
         print("Loading data files...")
         
-        # Load contracts and summary
-        self.df_summary = pd.read_csv(
-            '2026 Star Ratings Data Table - Summary Ratings (Oct 8 2025).csv',
-            skiprows=2
-        )
+        # Typed tables streamed in chunks (ingest.py): categorical contract
+        # metadata, float32 summary ratings, float32 values / int8 stars plus
+        # special status codes. These are the only copies of the three tables.
+        self.summary_table = load_summary_table(SUMMARY_PATH)
+        self.measure_data_table = load_measure_table(MEASURE_DATA_PATH, 'values')
+        self.measure_stars_table = load_measure_table(MEASURE_STARS_PATH, 'stars')
         
-        # Load measure data (skiprows=4 to get past headers)
-        self.df_measure_data = pd.read_csv(
-            '2026 Star Ratings Data Table - Measure Data (Oct 8 2025).csv',
-            skiprows=4
-        )
-        
-        # Load measure stars
-        self.df_measure_stars = pd.read_csv(
-            '2026 Star Ratings Data Table - Measure Stars (Oct 8 2025).csv',
-            skiprows=4
-        )
+        # Row lookups by contract ID, and star columns by measure code
+        self._summary_row_of = _first_rows(self.summary_table['contract_id'])
+        self._data_row_of = _first_rows(self.measure_data_table.contract_ids)
+        self._stars_row_of = _first_rows(self.measure_stars_table.contract_ids)
+        self._stars_col_of = {code: m for m, code in enumerate(self.measure_stars_table.measure_codes)}
         
         # Load cut points
-        self.df_cutpoints_c = pd.read_csv(
-            '2026 Star Ratings Data Table - Part C Cut Points (Oct 8 2025).csv'
-        )
+        self.df_cutpoints_c = pd.read_csv(PART_C_CUT_POINTS_PATH)
         
-        self.df_cutpoints_d = pd.read_csv(
-            '2026 Star Ratings Data Table - Part D Cut Points (Oct 8 2025).csv'
-        )
+        self.df_cutpoints_d = pd.read_csv(PART_D_CUT_POINTS_PATH)
         
-        # Get measure codes from row 3 (index 2) of measure data file
-        measure_codes_df = pd.read_csv(
-            '2026 Star Ratings Data Table - Measure Data (Oct 8 2025).csv',
-            skiprows=2,
-            nrows=1,
-            header=None
-        )
-        self.measure_columns = measure_codes_df.iloc[0, 5:].tolist()  # Skip first 5 contract columns
+        # Measure names ("C01: Breast Cancer Screening") from the codes row, after the 5 contract columns
+        data_layout = self.measure_data_table.layout
+        last_col = max(data_layout.measure_names, default=4)
+        self.measure_columns = [data_layout.measure_names.get(col, '') for col in range(5, last_col + 1)]
         
-        print(f"✓ Loaded data: {len(self.df_measure_data)} contracts, {len(self.measure_columns)} measures")
+        print(f"✓ Loaded data: {len(self._data_row_of)} contracts, {len(self.measure_columns)} measures")
     
     def determine_part_d_threshold_set(self, contract_id: str, org_type: str) -> str:
         """
@@ -89,17 +158,19 @@ class ContractReportGenerator:
         Returns:
             'MA-PD' or 'PDP'
         """
-        contract_id = str(contract_id).strip()
-        org_type = str(org_type).strip()
+        return part_d_threshold_set(contract_id, org_type)
+    
+    def list_contracts(self, parent_org: Optional[str] = None) -> List[str]:
+        """
+        Contract IDs in Summary Ratings order
         
-        if contract_id.startswith('S'):
-            return 'PDP'
-        elif contract_id.startswith('H') or contract_id.startswith('R'):
-            return 'MA-PD'
-        elif 'PDP' in org_type:
-            return 'PDP'
-        else:
-            return 'MA-PD'
+        Args:
+            parent_org: Only contracts under this parent organization
+        """
+        ids = self.summary_table['contract_id'].astype(str)
+        if parent_org is not None:
+            ids = ids[self.summary_table['parent_org'] == parent_org.strip()]
+        return ids.tolist()
     
     def calculate_star_from_performance(self, measure_code: str, performance_value: float, 
                                        part_d_set: str = 'MA-PD') -> Optional[int]:
@@ -157,57 +228,8 @@ class ContractReportGenerator:
         Returns:
             Tuple of (formatted_string, lower_bound, upper_bound) or (None, None, None)
         """
-        config = get_measure_config(measure_code)
-        
-        try:
-            if config.part_type == 'C':
-                # Part C - rows 4-8 are 1-5 stars (indices 3-7)
-                row_idx = 3 + (star_rating - 1)
-                # Find column index for this measure in cutpoints file
-                # The cutpoints file has measure names in row 1 (index 1)
-                col_idx = None
-                for i, col in enumerate(self.df_cutpoints_c.iloc[1, 1:]):  # Skip first col
-                    col_str = str(col).strip()
-                    if config.code in col_str or config.name in col_str:
-                        col_idx = 1 + i
-                        break
-                
-                if col_idx is None:
-                    return (None, None, None)
-                
-                threshold_str = self.df_cutpoints_c.iloc[row_idx, col_idx]
-                band = parse_threshold_band(str(threshold_str))
-                lower, upper, _, _ = band
-                formatted = format_band_for_display(band, config.format_type)
-                return (formatted, lower, upper)
-                
-            else:  # Part D
-                # MA-PD: indices 3-7 (1-5 stars), PDP: indices 8-12 (1-5 stars)
-                if part_d_set == 'MA-PD':
-                    row_idx = 3 + (star_rating - 1)
-                else:  # PDP
-                    row_idx = 8 + (star_rating - 1)
-                
-                # Find column for this measure (measure names in row at index 1)
-                col_idx = None
-                for i, col in enumerate(self.df_cutpoints_d.iloc[1, 2:]):  # Skip first 2 cols
-                    col_str = str(col).strip()
-                    if config.code in col_str or config.name in col_str:
-                        col_idx = 2 + i
-                        break
-                
-                if col_idx is None or row_idx >= len(self.df_cutpoints_d):
-                    return (None, None, None)
-                
-                threshold_str = self.df_cutpoints_d.iloc[row_idx, col_idx]
-                band = parse_threshold_band(str(threshold_str))
-                lower, upper, _, _ = band
-                formatted = format_band_for_display(band, config.format_type)
-                return (formatted, lower, upper)
-                
-        except Exception as e:
-            # Silently handle parsing errors
-            return (None, None, None)
+        return threshold_from_cut_points(self.df_cutpoints_c, self.df_cutpoints_d,
+                                         measure_code, star_rating, part_d_set)
     
     def generate_report(self, contract_id: str) -> Dict:
         """
@@ -216,93 +238,68 @@ class ContractReportGenerator:
         Returns:
             Dictionary with contract info and measure lines
         """
-        # Find contract
         contract_id = str(contract_id).strip()
         
         # Get from summary ratings
-        summary_row = self.df_summary[self.df_summary.iloc[:, 0].astype(str).str.strip() == contract_id]
-        if summary_row.empty:
+        r = self._summary_row_of.get(contract_id)
+        if r is None:
             raise ValueError(f"Contract {contract_id} not found")
+        summary = self.summary_table.iloc[r]
         
-        summary_row = summary_row.iloc[0]
-        
-        # Get contract info
+        # Get contract info (ratings as the table shows them: "3.5" or the status text)
         contract_info = {
             'contract_id': contract_id,
-            'org_type': summary_row.iloc[1] if len(summary_row) > 1 else 'Unknown',
-            'contract_name': summary_row.iloc[2] if len(summary_row) > 2 else 'Unknown',
-            'marketing_name': summary_row.iloc[3] if len(summary_row) > 3 else 'Unknown',
-            'parent_org': summary_row.iloc[4] if len(summary_row) > 4 else 'Unknown',
-            'is_snp': summary_row.iloc[5] if len(summary_row) > 5 else 'Unknown',
-            'part_c_rating': summary_row.iloc[8] if len(summary_row) > 8 else None,
-            'part_d_rating': summary_row.iloc[9] if len(summary_row) > 9 else None,
-            'overall_rating': summary_row.iloc[10] if len(summary_row) > 10 else None,
+            'org_type': _cell(summary['org_type'], 'Unknown'),
+            'contract_name': _cell(summary['contract_name'], 'Unknown'),
+            'marketing_name': _cell(summary['marketing_name'], 'Unknown'),
+            'parent_org': _cell(summary['parent_org'], 'Unknown'),
+            'is_snp': 'Yes' if summary['is_snp'] else 'No',
+            'part_c_rating': _cell(summary['part_c_text']),
+            'part_d_rating': _cell(summary['part_d_text']),
+            'overall_rating': _cell(summary['overall_text']),
         }
         
         # Determine Part D threshold set
         part_d_set = self.determine_part_d_threshold_set(contract_id, contract_info['org_type'])
         
-        # Get measure data row
-        data_row = self.df_measure_data[
-            self.df_measure_data.iloc[:, 0].astype(str).str.strip() == contract_id
-        ]
-        if data_row.empty:
+        # Get measure data and star ratings rows
+        data, stars = self.measure_data_table, self.measure_stars_table
+        d = self._data_row_of.get(contract_id)
+        if d is None:
             raise ValueError(f"No measure data found for {contract_id}")
-        data_row = data_row.iloc[0]
-        
-        # Get star ratings row
-        stars_row = self.df_measure_stars[
-            self.df_measure_stars.iloc[:, 0].astype(str).str.strip() == contract_id
-        ]
-        if stars_row.empty:
+        s = self._stars_row_of.get(contract_id)
+        if s is None:
             raise ValueError(f"No star ratings found for {contract_id}")
-        stars_row = stars_row.iloc[0]
         
-        # Process each measure
+        # Process each measure (Measure Data column order)
         measure_lines = []
         
-        for i, measure_col_name in enumerate(self.measure_columns):
-            # Get measure code from column name (e.g., "C01: Breast Cancer Screening" -> "C01")
-            measure_code = measure_col_name.split(':')[0].strip() if ':' in measure_col_name else None
-            
-            if not measure_code or measure_code not in ['C01', 'C02', 'C03', 'C04', 'C05', 'C06', 'C07', 'C08', 'C09', 'C10',
-                                                         'C11', 'C12', 'C13', 'C14', 'C15', 'C16', 'C17', 'C18', 'C19', 'C20',
-                                                         'C21', 'C22', 'C23', 'C24', 'C25', 'C26', 'C27', 'C28', 'C29', 'C30',
-                                                         'C31', 'C32', 'C33', 'D01', 'D02', 'D03', 'D04', 'D05', 'D06', 'D07',
-                                                         'D08', 'D09', 'D10', 'D11', 'D12']:
-                continue
-            
-            try:
-                config = get_measure_config(measure_code)
-            except:
-                continue
-            
-            # Get values (column index is 5 + i since first 5 are contract info)
-            col_idx = 5 + i
-            perf_value = data_row.iloc[col_idx] if col_idx < len(data_row) else None
-            star_value = stars_row.iloc[col_idx] if col_idx < len(stars_row) else None
+        for m, measure_code in enumerate(data.measure_codes):
+            config = get_measure_config(measure_code)
             
-            # Parse
-            is_spec = is_special_value(perf_value)
-            star_rating = parse_star_rating(star_value)
+            star_col = self._stars_col_of.get(measure_code)
+            star_rating = int(stars.values[s, star_col]) if star_col is not None else 0
+            star_rating = star_rating or None
+            special = int(data.special[d, m])
+            label = int(data.label_codes[d, m])
             
-            if is_spec:
+            if special:
                 measure_lines.append(MeasureLine(
                     measure_code=measure_code,
                     measure_name=config.name,
                     star_rating=star_rating,  # Keep star rating even if performance is special!
-                    performance_value=str(perf_value).strip(),
+                    performance_value=data.labels[label],
                     performance_numeric=None,
                     threshold_band='N/A',
                     threshold_lower=None,
                     threshold_upper=None,
                     is_special=True,
-                    special_category=categorize_special_value(perf_value),
+                    special_category=SPECIAL_CATEGORIES[special - 1],
                     domain=config.domain
                 ))
             else:
-                # Get numeric value
-                numeric_val = normalize_value(perf_value, config.format_type)
+                # float32 storage rounded back to the reported decimals (as in MeasureIndex)
+                numeric_val = None if label >= 0 else round(float(data.values[d, m]), 6)
                 
                 # Get threshold band if we have a star rating
                 threshold_band = 'N/A'
@@ -320,7 +317,8 @@ class ContractReportGenerator:
                     measure_code=measure_code,
                     measure_name=config.name,
                     star_rating=star_rating,
-                    performance_value=format_value_for_display(perf_value, config.format_type),
+                    performance_value=(data.labels[label] if numeric_val is None
+                                       else format_number_for_display(numeric_val, config.format_type)),
                     performance_numeric=numeric_val,
                     threshold_band=threshold_band,
                     threshold_lower=threshold_lower,
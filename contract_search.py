@@ -0,0 +1,320 @@
+"""
+Contract search index
+Trigram and prefix index over contract ID, names and parent organization,
+built once at load so typeahead never scans the DataFrames
+"""
+
+import base64
+import bisect
+import re
+import numpy as np
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+# Minimum trigram Dice similarity for a misspelled token to count as a match
+MIN_TRIGRAM_SIMILARITY = 0.5
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric tokens"""
+    return _TOKEN_RE.findall(str(text).lower())
+
+
+def trigrams(tokens: List[str]) -> set:
+    """Space-padded trigrams of each token ("hum" -> "  h", " hu", "hum", "um ")"""
+    grams = set()
+    for token in tokens:
+        padded = f"  {token} "
+        for i in range(len(padded) - 2):
+            grams.add(padded[i:i + 3])
+    return grams
+
+
+def parse_summary_rating(value) -> Optional[float]:
+    """Parse a summary rating cell ("3.5" -> 3.5, "Not Applicable" -> None)"""
+    try:
+        rating = float(str(value).strip())
+    except (ValueError, TypeError):
+        return None
+    return rating if 0 < rating <= 5 else None
+
+
+def encode_cursor(offset: int) -> str:
+    """Opaque pagination cursor"""
+    return base64.urlsafe_b64encode(f"o:{offset}".encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: Optional[str]) -> int:
+    """Offset encoded in a cursor (0 for no cursor)"""
+    if not cursor:
+        return 0
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        prefix, offset = base64.urlsafe_b64decode(padded.encode()).decode().split(':')
+        if prefix != 'o' or int(offset) < 0:
+            raise ValueError
+        return int(offset)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+
+@dataclass
+class ContractDocument:
+    """One searchable contract for one rating year"""
+    contract_id: str
+    year: int
+    org_type: str
+    contract_name: str
+    marketing_name: str
+    parent_org: str
+    is_snp: bool
+    part_c_rating: Optional[float]
+    part_d_rating: Optional[float]
+    overall_rating: Optional[float]
+
+    def to_dict(self) -> Dict:
+        return {
+            'id': self.contract_id,
+            'year': self.year,
+            'org_type': self.org_type,
+            'contract_name': self.contract_name,
+            'marketing_name': self.marketing_name,
+            'parent_org': self.parent_org,
+            'is_snp': self.is_snp,
+            'part_c_rating': self.part_c_rating,
+            'part_d_rating': self.part_d_rating,
+            'overall_rating': self.overall_rating,
+            'display': f"{self.contract_id} - {self.marketing_name}" if self.marketing_name else self.contract_id,
+        }
+
+
+class ContractSearchIndex:
+    """
+    Typo-tolerant contract search
+
+    Documents are keyed by (year, contract ID) so several rating years can be
+    loaded side by side. Call add_documents() for each year, then build().
+    """
+
+    def __init__(self):
+        self.documents: List[ContractDocument] = []
+        self._built = False
+
+    @classmethod
+    def from_generator(cls, generator, year: int = 2026) -> 'ContractSearchIndex':
+        """Index every contract in a ContractReportGenerator's Summary Ratings table"""
+        search_index = cls()
+        search_index.add_summary_frame(generator.summary_table, year)
+        search_index.build()
+        return search_index
+
+    def add_summary_frame(self, summary, year: int):
+        """Add one year of contracts from a typed Summary Ratings table (ingest.load_summary_table)"""
+        text = {name: summary[name].astype(str).where(summary[name].notna(), '').tolist()
+                for name in ('contract_id', 'org_type', 'contract_name', 'marketing_name', 'parent_org')}
+        ratings = {name: [parse_summary_rating(v) for v in summary[name].tolist()]
+                   for name in ('part_c_rating', 'part_d_rating', 'overall_rating')}
+        docs = []
+        for i, is_snp in enumerate(summary['is_snp'].tolist()):
+            docs.append(ContractDocument(
+                contract_id=text['contract_id'][i],
+                year=int(year),
+                org_type=text['org_type'][i],
+                contract_name=text['contract_name'][i],
+                marketing_name=text['marketing_name'][i],
+                parent_org=text['parent_org'][i],
+                is_snp=bool(is_snp),
+                part_c_rating=ratings['part_c_rating'][i],
+                part_d_rating=ratings['part_d_rating'][i],
+                overall_rating=ratings['overall_rating'][i],
+            ))
+        self.add_documents(docs)
+
+    def add_documents(self, docs: List[ContractDocument]):
+        """Add documents (call build() afterwards)"""
+        self.documents.extend(docs)
+        self._built = False
+
+    def build(self):
+        """Build the token vocabulary, trigram postings, prefix table and filter columns"""
+        docs = self.documents
+        n = len(docs)
+
+        token_docs: Dict[str, List[int]] = {}
+        for doc_id, doc in enumerate(docs):
+            tokens = set()
+            for field in (doc.contract_id, doc.contract_name, doc.marketing_name, doc.parent_org):
+                tokens.update(tokenize(field))
+            for token in tokens:
+                token_docs.setdefault(token, []).append(doc_id)
+
+        # Sorted vocabulary doubles as the prefix table (bisect on a prefix range)
+        self._vocab = sorted(token_docs)
+        self._token_docs = [np.array(token_docs[t], dtype=np.int32) for t in self._vocab]
+        self._token_gram_counts = np.array([len(trigrams([t])) for t in self._vocab])
+
+        postings: Dict[str, List[int]] = {}
+        for token_id, token in enumerate(self._vocab):
+            for gram in trigrams([token]):
+                postings.setdefault(gram, []).append(token_id)
+        self._postings = {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()}
+
+        self._ids_lower = np.array([doc.contract_id.lower() for doc in docs], dtype=object)
+        self._years = np.array([doc.year for doc in docs], dtype=np.int32)
+        self._org_types = np.array([doc.org_type.lower() for doc in docs], dtype=object)
+        self._snp = np.array([doc.is_snp for doc in docs], dtype=bool)
+        self._overall = np.array(
+            [doc.overall_rating if doc.overall_rating is not None else np.nan for doc in docs]
+        )
+        # Default ordering for empty queries: contract ID, newest year first
+        self._default_order = np.array(
+            sorted(range(n), key=lambda i: (docs[i].contract_id, -docs[i].year)), dtype=np.int64
+        )
+        self._built = True
+
+    def _token_scores(self, token: str) -> np.ndarray:
+        """
+        Best match score per vocabulary token for one query token
+
+        1.0 exact, 0.9 prefix, otherwise 0.8 x trigram Dice similarity when it
+        reaches MIN_TRIGRAM_SIMILARITY (0 below that).
+        """
+        vocab_size = len(self._vocab)
+        grams = trigrams([token])
+        lists = [self._postings[g] for g in grams if g in self._postings]
+        shared = (np.bincount(np.concatenate(lists), minlength=vocab_size)
+                  if lists else np.zeros(vocab_size, dtype=np.int64))
+        dice = 2.0 * shared / (len(grams) + self._token_gram_counts)
+        scores = np.where(dice >= MIN_TRIGRAM_SIMILARITY, 0.8 * dice, 0.0)
+
+        lo = bisect.bisect_left(self._vocab, token)
+        hi = bisect.bisect_left(self._vocab, token + '\uffff')
+        scores[lo:hi] = 0.9
+        if lo < vocab_size and self._vocab[lo] == token:
+            scores[lo] = 1.0
+        return scores
+
+    def _doc_scores(self, token: str) -> np.ndarray:
+        """Best token score per document for one query token"""
+        token_scores = self._token_scores(token)
+        doc_scores = np.zeros(len(self.documents))
+        for token_id in np.flatnonzero(token_scores):
+            docs = self._token_docs[token_id]
+            np.maximum.at(doc_scores, docs, token_scores[token_id])
+        return doc_scores
+
+    def _filter_mask(self, org_type: Optional[str], snp: Optional[bool],
+                     min_rating: Optional[float], max_rating: Optional[float],
+                     year: Optional[int]) -> np.ndarray:
+        mask = np.ones(len(self.documents), dtype=bool)
+        if org_type:
+            mask &= self._org_types == org_type.strip().lower()
+        if snp is not None:
+            mask &= self._snp == bool(snp)
+        with np.errstate(invalid='ignore'):
+            if min_rating is not None:
+                mask &= self._overall >= min_rating
+            if max_rating is not None:
+                mask &= self._overall <= max_rating
+        if year is not None:
+            mask &= self._years == int(year)
+        return mask
+
+    def search(self, query: str = '', org_type: Optional[str] = None, snp: Optional[bool] = None,
+               min_rating: Optional[float] = None, max_rating: Optional[float] = None,
+               year: Optional[int] = None, limit: int = 20, cursor: Optional[str] = None) -> Dict:
+        """
+        Ranked, filtered and paginated contract search
+
+        Every query token must match a token of the contract ID, names or
+        parent organization, exactly, by prefix or by trigram similarity (so
+        misspellings like "humaan" still match). Exact and prefix contract ID
+        matches rank first.
+
+        Returns:
+            Dictionary with results, total match count and next_cursor
+        """
+        if not self._built:
+            self.build()
+
+        offset = decode_cursor(cursor)
+        limit = max(1, min(int(limit), 200))
+        mask = self._filter_mask(org_type, snp, min_rating, max_rating, year)
+        query_tokens = tokenize(query)
+
+        if not query_tokens:
+            ranked = self._default_order[mask[self._default_order]]
+            scores = None
+        else:
+            per_token = np.array([self._doc_scores(token) for token in query_tokens])
+            matched_all = (per_token > 0).all(axis=0)
+
+            query_id = ''.join(query_tokens)
+            exact_id = self._ids_lower == query_id
+            id_prefix = np.array([cid.startswith(query_id) for cid in self._ids_lower], dtype=bool)
+
+            scores = 100.0 * exact_id + 50.0 * id_prefix + 10.0 * per_token.mean(axis=0)
+            rows = np.flatnonzero(mask & (matched_all | id_prefix))
+            # Highest score first, ties broken by contract ID
+            order = np.lexsort((self._ids_lower[rows], -scores[rows]))
+            ranked = rows[order]
+
+        page = ranked[offset:offset + limit]
+        results = []
+        for doc_id in page:
+            item = self.documents[doc_id].to_dict()
+            if scores is not None:
+                item['score'] = round(float(scores[doc_id]), 3)
+            results.append(item)
+
+        next_offset = offset + len(page)
+        return {
+            'results': results,
+            'total': int(len(ranked)),
+            'next_cursor': encode_cursor(next_offset) if next_offset < len(ranked) else None,
+        }
+
+
+# Test cases
+if __name__ == "__main__":
+    print("Testing contract search...")
+
+    def doc(cid, name, marketing, parent, org_type='Local CCP', snp=False, overall=None):
+        return ContractDocument(cid, 2026, org_type, name, marketing, parent, snp, None, None, overall)
+
+    idx = ContractSearchIndex()
+    idx.add_documents([
+        doc('H0028', 'CHA HMO, INC.', 'Humana', 'Humana Inc.', snp=True, overall=3.5),
+        doc('H0034', 'HAMASPIK, INC.', 'Hamaspik, Inc.', 'Hamaspik of Rockland County, Inc.', overall=3.0),
+        doc('H1290', 'DEVOTED HEALTH PLAN OF FLORIDA, INC.', 'Devoted Health', 'Devoted Health, Inc.', overall=5.0),
+        doc('S5601', 'SILVERSCRIPT INSURANCE COMPANY', 'Aetna Medicare', 'CVS Health Corporation', org_type='PDP'),
+    ])
+    idx.build()
+
+    assert idx.search('H0028')['results'][0]['id'] == 'H0028'
+    assert idx.search('h00')['total'] == 2
+    print("✓ Contract ID exact and prefix match works")
+
+    assert idx.search('devoted')['results'][0]['id'] == 'H1290'
+    assert idx.search('cvs health')['results'][0]['id'] == 'S5601'
+    print("✓ Name and parent organization match works")
+
+    assert idx.search('humaan')['results'][0]['id'] == 'H0028'
+    assert idx.search('devotd helth')['results'][0]['id'] == 'H1290'
+    print("✓ Typo-tolerant matching works")
+
+    assert idx.search('', org_type='pdp')['total'] == 1
+    assert idx.search('', snp=True)['total'] == 1
+    assert idx.search('', min_rating=3.5)['total'] == 2
+    print("✓ Filters work")
+
+    page1 = idx.search('', limit=3)
+    page2 = idx.search('', limit=3, cursor=page1['next_cursor'])
+    assert [r['id'] for r in page1['results']] == ['H0028', 'H0034', 'H1290']
+    assert [r['id'] for r in page2['results']] == ['S5601'] and page2['next_cursor'] is None
+    print("✓ Cursor pagination works")
+
+    print("\n✅ All contract search tests passed!")
@@ -0,0 +1,358 @@
+"""
+Market-wide cut point shifts
+Tightens or loosens the compiled Part C/D cut points and re-scores every contract in one vectorised pass
+"""
+
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from measure_config import MEASURE_CONFIGS
+from measure_index import PART_D_SETS
+from rating_engine import RATING_PARTS, json_value
+
+SHIFT_MODES = ('absolute', 'percentile')
+
+# Formats on a 0-100 scale; a global absolute shift (percentage points) only applies to these
+PERCENT_SCALE_FORMATS = ('PERCENTAGE', 'INTEGER')
+
+# Overall rating levels for the transition matrix (None = no overall rating)
+RATING_LEVELS = [1.0, 1.5, 2.0, 2.5, 3.0, 3.5, 4.0, 4.5, 5.0, None]
+
+DEFAULT_THRESHOLD = 4.0
+
+# Shift levels scored per batch in a sweep (bounds the (levels, contracts, measures, 4) edge array)
+SWEEP_CHUNK = 10
+
+# Most shift levels accepted in one sweep
+MAX_SWEEP_LEVELS = 200
+
+
+def _level_codes(ratings: np.ndarray) -> np.ndarray:
+    """Overall ratings -> RATING_LEVELS positions (unrated last)"""
+    codes = np.full(ratings.shape, len(RATING_LEVELS) - 1, dtype=np.intp)
+    rated = np.isfinite(ratings) & (ratings >= 1.0)
+    codes[rated] = np.round((ratings[rated] - 1.0) * 2).astype(np.intp)
+    return codes
+
+
+class CutPointShift:
+    """
+    Re-scores the market under shifted cut points
+
+    A positive shift tightens: every star 2-5 entry threshold moves towards
+    better performance (up for normal measures, down for inverse ones).
+    'absolute' shifts are in the measure's own units. A global absolute shift
+    is read as percentage points, so it only moves measures on a 0-100 scale
+    (PERCENTAGE/INTEGER); rate measures such as C28/D02 (complaints per
+    1,000) move only by their own measure_shifts entry. 'percentile' shifts
+    move each threshold by that many percentile points of the measure's
+    distribution within its threshold set, for every measure.
+    Only cells whose assignment actually changes take the new star, so a zero
+    shift reproduces the published stars exactly.
+    """
+
+    def __init__(self, rating_engine):
+        self.engine = rating_engine
+        index = rating_engine.index
+        self.index = index
+        self.set_idx = index.part_d_set.astype(np.intp)
+
+        # (set, measure, 4) entry thresholds and the stars they assign today
+        self.edges, self.inclusive = index.cut_points.entry_edges(index.is_inverse, np.arange(len(PART_D_SETS)))
+        self.row_inclusive = self.inclusive[self.set_idx]
+        self.base_assigned = index.cut_points.stars_from_edges(
+            index.values, self.edges[self.set_idx], self.row_inclusive, index.is_inverse)
+        self.shiftable = (index.stars > 0) & np.isfinite(index.values) & \
+            np.isfinite(self.edges[self.set_idx]).all(axis=-1)
+
+        # Sorted values per (set, measure) for percentile shifts
+        self.sorted_values = [
+            [np.sort(col[np.isfinite(col)]) for col in index.values[self.set_idx == s].T]
+            for s in range(len(PART_D_SETS))
+        ]
+        self.baseline_levels = _level_codes(rating_engine.baseline['overall']['rating'])
+        self.percent_scale = np.array([MEASURE_CONFIGS[code].format_type in PERCENT_SCALE_FORMATS
+                                       for code in index.codes], dtype=bool)
+
+    def shift_vectors(self, shifts, measure_shifts: Optional[Dict[str, float]] = None,
+                      measures: Optional[List[str]] = None, mode: str = 'absolute') -> np.ndarray:
+        """
+        Per-measure shift for each level
+
+        Args:
+            shifts: Global shift levels (absolute mode: 0-100 scale measures only)
+            measure_shifts: Code -> shift overriding the global shift for that measure
+            measures: Only shift these measures (default all)
+            mode: 'absolute' or 'percentile'
+
+        Returns:
+            (levels, measures) float array
+
+        Raises:
+            ValueError: For unknown measure codes or non-numeric shifts
+        """
+        index = self.index
+        shifts = np.asarray(shifts, dtype=float).reshape(-1)
+        selected = self.percent_scale.copy() if mode == 'absolute' else np.ones(len(index.codes), dtype=bool)
+        if measures:
+            listed = np.zeros(len(index.codes), dtype=bool)
+            for code in measures:
+                listed[index.get_column(code)] = True
+            selected &= listed
+        vectors = np.where(selected[None, :], shifts[:, None], 0.0)
+        for code, shift in (measure_shifts or {}).items():
+            vectors[:, index.get_column(code)] = float(shift)
+        if not np.isfinite(vectors).all():
+            raise ValueError("Shifts must be finite numbers")
+        return vectors
+
+    def shifted_edges(self, vectors: np.ndarray, mode: str = 'absolute') -> np.ndarray:
+        """
+        Entry thresholds after each shift vector
+
+        Args:
+            vectors: (levels, measures) shifts from shift_vectors
+            mode: 'absolute' or 'percentile'
+
+        Returns:
+            (levels, set, measures, 4) thresholds
+        """
+        if mode not in SHIFT_MODES:
+            raise ValueError(f"Shift mode must be one of {SHIFT_MODES}, got '{mode}'")
+        direction = np.where(self.index.is_inverse, -1.0, 1.0)
+        if mode == 'absolute':
+            return self.edges[None] + (direction * vectors)[:, None, :, None]
+
+        # Move each edge's percentile rank; the edge moves by the matching change in value
+        edges = np.repeat(self.edges[None], len(vectors), axis=0)
+        for s in range(len(PART_D_SETS)):
+            for m, values in enumerate(self.sorted_values[s]):
+                edge = self.edges[s, m]
+                if not len(values) or not np.isfinite(edge).any() or not vectors[:, m].any():
+                    continue
+                rank = np.searchsorted(values, np.nan_to_num(edge), side='left') / len(values)
+                target = np.clip(rank[None, :] + direction[m] * vectors[:, m, None] / 100.0, 0.0, 1.0)
+                edges[:, s, m] += np.quantile(values, target) - np.quantile(values, rank)[None, :]
+        return edges
+
+    def rate(self, edges: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Stars and ratings for every contract under each set of thresholds
+
+        Args:
+            edges: (levels, set, measures, 4) thresholds
+
+        Returns:
+            {'stars': (levels, contracts, measures), 'changed': (levels, contracts)
+            star cells changed, part: (levels, contracts) half-star ratings}
+        """
+        index = self.index
+        levels, n = len(edges), len(index.contract_ids)
+        assigned = index.cut_points.stars_from_edges(
+            index.values[None], edges[:, self.set_idx], self.row_inclusive[None], index.is_inverse)
+        moved = self.shiftable[None] & (assigned != self.base_assigned[None])
+        stars = np.where(moved, assigned, index.stars[None])
+
+        cai = {part: np.tile(self.engine.cai[part], levels) for part in RATING_PARTS}
+        ratings = self.engine.compute(stars.reshape(levels * n, -1), cai=cai)
+        result = {part: ratings[part]['rating'].reshape(levels, n) for part in RATING_PARTS}
+        result['stars'] = stars
+        result['changed'] = moved.sum(axis=2)
+        return result
+
+    def apply(self, shift: float = 0.0, measure_shifts: Optional[Dict[str, float]] = None,
+              mode: str = 'absolute', measures: Optional[List[str]] = None,
+              threshold: float = DEFAULT_THRESHOLD, limit: Optional[int] = None) -> Dict:
+        """
+        Re-score the whole market under one shift scenario
+
+        Args:
+            shift: Global shift (positive tightens)
+            measure_shifts: Code -> shift overriding the global shift for that measure
+            mode: 'absolute' or 'percentile'
+            measures: Only shift these measures (default all)
+            threshold: Overall rating to count contracts falling below
+            limit: Cap on the affected contract list
+
+        Returns:
+            Dictionary with mode, shift, measure_shifts, levels, transition
+            (rows = old overall rating, columns = new), summary and affected
+            [{contract_id, stars_changed, part_c, part_d, overall}] ordered by
+            largest overall drop
+
+        Raises:
+            ValueError: For unknown modes, measure codes or shifts
+        """
+        start = time.perf_counter()
+        vectors = self.shift_vectors([shift], measure_shifts, measures, mode)
+        result = self.rate(self.shifted_edges(vectors, mode))
+        baseline = self.engine.baseline
+
+        new_levels = _level_codes(result['overall'][0])
+        transition = np.zeros((len(RATING_LEVELS), len(RATING_LEVELS)), dtype=int)
+        np.add.at(transition, (self.baseline_levels, new_levels), 1)
+
+        before, after = baseline['overall']['rating'], result['overall'][0]
+        changed = np.zeros(len(before), dtype=bool)
+        for part in RATING_PARTS:
+            a, b = baseline[part]['rating'], result[part][0]
+            changed |= ~((a == b) | (np.isnan(a) & np.isnan(b)))
+        drop = np.nan_to_num(before - after, nan=0.0)
+        rows = np.flatnonzero(changed)
+        rows = rows[np.lexsort((rows, -drop[rows]))][:limit]
+
+        return {
+            'mode': mode,
+            'shift': float(shift),
+            'measure_shifts': {code.strip().upper(): float(v) for code, v in (measure_shifts or {}).items()},
+            'levels': RATING_LEVELS,
+            'transition': transition.tolist(),
+            'summary': {
+                **self._summary(before, after, threshold),
+                'contracts_changed': int(changed.sum()),
+                'stars_changed': int(result['changed'][0].sum()),
+            },
+            'affected': [{
+                'contract_id': self.index.contract_ids[r],
+                'stars_changed': int(result['changed'][0, r]),
+                **{part: {'before': json_value(baseline[part]['rating'][r], 1),
+                          'after': json_value(result[part][0, r], 1)} for part in RATING_PARTS},
+            } for r in rows],
+            'seconds': round(time.perf_counter() - start, 4),
+        }
+
+    def sweep(self, shifts, mode: str = 'absolute', measures: Optional[List[str]] = None,
+              threshold: float = DEFAULT_THRESHOLD) -> Dict:
+        """
+        Market summary at each of several global shift levels
+
+        Returns:
+            Dictionary with mode, threshold, results [{shift, moved_down, moved_up,
+            below_threshold, fell_below_threshold, distribution}] and seconds
+
+        Raises:
+            ValueError: For no levels or more than MAX_SWEEP_LEVELS, unknown modes or measures
+        """
+        start = time.perf_counter()
+        if not 1 <= np.size(shifts) <= MAX_SWEEP_LEVELS:
+            raise ValueError(f"A sweep takes 1 to {MAX_SWEEP_LEVELS} shift levels, got {np.size(shifts)}")
+        vectors = self.shift_vectors(shifts, None, measures, mode)
+        shifts = np.asarray(shifts, dtype=float).reshape(-1)
+        before = self.engine.baseline['overall']['rating']
+
+        results = []
+        for first in range(0, len(vectors), SWEEP_CHUNK):
+            overall = self.rate(self.shifted_edges(vectors[first:first + SWEEP_CHUNK], mode))['overall']
+            for k, after in enumerate(overall):
+                counts = np.bincount(_level_codes(after), minlength=len(RATING_LEVELS))
+                results.append({
+                    'shift': float(shifts[first + k]),
+                    **self._summary(before, after, threshold),
+                    'distribution': {('unrated' if level is None else str(level)): int(c)
+                                     for level, c in zip(RATING_LEVELS, counts)},
+                })
+
+        return {
+            'mode': mode,
+            'threshold': threshold,
+            'results': results,
+            'seconds': round(time.perf_counter() - start, 4),
+        }
+
+    @staticmethod
+    def _summary(before: np.ndarray, after: np.ndarray, threshold: float) -> Dict[str, int]:
+        with np.errstate(invalid='ignore'):
+            return {
+                'moved_down': int((after < before).sum()),
+                'moved_up': int((after > before).sum()),
+                'below_threshold_before': int((before < threshold).sum()),
+                'below_threshold': int((after < threshold).sum()),
+                'fell_below_threshold': int(((before >= threshold) & (after < threshold)).sum()),
+            }
+
+
+# Test cases
+if __name__ == "__main__":
+    from contract_report import ContractReportGenerator
+    from measure_index import MeasureIndex
+    from rating_engine import RatingEngine
+    from cai_calculator import CAICalculator
+
+    print("Testing cut point shifts...")
+
+    generator = ContractReportGenerator()
+    index = MeasureIndex(generator)
+    engine = RatingEngine(index, CAICalculator('2026 Star Ratings Data Table - CAI (Oct 8 2025).csv'))
+    shifter = CutPointShift(engine)
+
+    for mode in SHIFT_MODES:
+        zero = shifter.apply(0.0, mode=mode)
+        assert zero['summary']['contracts_changed'] == 0 and not zero['affected']
+        assert np.trace(np.array(zero['transition'])) == len(index.contract_ids)
+    print("✓ Zero shift reproduces published ratings")
+
+    # Edge-based assignment agrees with the band-based one wherever both apply
+    banded = index.cut_points.assign_stars(index.values, index.part_d_set)
+    agree = shifter.shiftable & (banded > 0)
+    assert (shifter.base_assigned[agree] == banded[agree]).mean() > 0.99
+    print("✓ Entry thresholds match the compiled bands")
+
+    tight = shifter.apply(2.0, threshold=4.0)
+    loose = shifter.apply(-2.0, threshold=4.0)
+    assert tight['summary']['moved_up'] == 0 and tight['summary']['moved_down'] > 0
+    assert loose['summary']['moved_down'] == 0 and loose['summary']['moved_up'] > 0
+    drops = [c['overall']['before'] - c['overall']['after'] for c in tight['affected']
+             if c['overall']['before'] is not None and c['overall']['after'] is not None]
+    assert drops == sorted(drops, reverse=True)
+    print(f"✓ Tighten by 2 points: {tight['summary']['fell_below_threshold']} contracts fall below 4 stars "
+          f"({tight['summary']['stars_changed']} measure stars change)")
+
+    # A single measure shift only moves that measure's stars
+    c12 = index.get_column('C12')
+    only = shifter.rate(shifter.shifted_edges(shifter.shift_vectors([5.0], measures=['C12'])))
+    other = np.ones(len(index.codes), dtype=bool)
+    other[c12] = False
+    assert (only['stars'][0][:, other] == index.stars[:, other]).all()
+    assert (only['stars'][0][:, c12] <= index.stars[:, c12]).all()
+    print("✓ Per-measure shifts stay on their measure")
+
+    # A global +2 is in percentage points: complaint rates (per 1,000) keep their stars
+    rates = [index.get_column(code) for code in ('C28', 'D02')]
+    tight_stars = shifter.rate(shifter.shifted_edges(shifter.shift_vectors([2.0])))['stars'][0]
+    for m in rates:
+        assert np.array_equal(np.bincount(tight_stars[:, m], minlength=6), np.bincount(index.stars[:, m], minlength=6))
+    explicit = shifter.rate(shifter.shifted_edges(shifter.shift_vectors([0.0], {'C28': 0.2})))['stars'][0]
+    assert (explicit[:, rates[0]] != index.stars[:, rates[0]]).any()
+    print("✓ Global absolute shifts leave C28/D02 alone; measure_shifts still move them")
+
+    pct = shifter.apply(5.0, mode='percentile')
+    assert pct['summary']['moved_up'] == 0 and pct['summary']['moved_down'] > 0
+    print(f"✓ Tighten by 5 percentile points: {pct['summary']['moved_down']} overall ratings drop")
+
+    levels = np.linspace(-5, 5, 50)
+    sweep = shifter.sweep(levels)
+    below = [r['below_threshold'] for r in sweep['results']]
+    assert below == sorted(below)
+    assert sweep['results'][0]['shift'] == -5.0 and len(sweep['results']) == 50
+    print(f"✓ 50-level sweep in {sweep['seconds']:.2f} s")
+
+    pct_sweep = shifter.sweep(np.linspace(-10, 10, 50), mode='percentile')
+    print(f"✓ 50-level percentile sweep in {pct_sweep['seconds']:.2f} s")
+
+    for bad in ({'mode': 'relative'}, {'measure_shifts': {'X99': 1}}, {'shift': float('nan')}):
+        try:
+            shifter.apply(**bad)
+            assert False, bad
+        except ValueError:
+            pass
+    for bad in ([], np.zeros(MAX_SWEEP_LEVELS + 1)):
+        try:
+            shifter.sweep(bad)
+            assert False, len(bad)
+        except ValueError:
+            pass
+    print("✓ Bad shifts are rejected")
+
+    print("\n✅ All cut point shift tests passed!")
@@ -183,6 +183,26 @@ def parse_star_rating(value) -> Optional[int]:
     return None
 
 
+def format_number_for_display(num: float, format_type: str) -> str:
+    """
+    Format an already-parsed number: 76.0 -> "76.0%", 87.0 -> "87", 0.16 -> "0.16"
+    
+    Args:
+        num: Normalized value
+        format_type: Format type
+        
+    Returns:
+        Formatted string
+    """
+    if format_type == 'PERCENTAGE':
+        return f"{num:.1f}%"
+    elif format_type == 'INTEGER':
+        return f"{int(num)}"
+    elif format_type == 'DECIMAL':
+        return f"{num:.2f}"
+    return str(num)
+
+
 def format_value_for_display(value, format_type: str) -> str:
     """
     Format value for human-readable display
@@ -198,15 +218,9 @@ def format_value_for_display(value, format_type: str) -> str:
         return str(value).strip()
     
     try:
-        if format_type == 'PERCENTAGE':
-            num = normalize_value(value, format_type)
-            return f"{num:.1f}%" if num is not None else str(value)
-        elif format_type == 'INTEGER':
+        if format_type in ('PERCENTAGE', 'INTEGER', 'DECIMAL'):
             num = normalize_value(value, format_type)
-            return f"{int(num)}" if num is not None else str(value)
-        elif format_type == 'DECIMAL':
-            num = normalize_value(value, format_type)
-            return f"{num:.2f}" if num is not None else str(value)
+            return format_number_for_display(num, format_type) if num is not None else str(value)
         else:
             return str(value)
     except:
@@ -247,5 +261,11 @@ if __name__ == "__main__":
     assert normalize_value("Plan too small", "PERCENTAGE") is None
     print("✓ Normalization works")
     
+    # Test display formatting
+    assert format_value_for_display("76%", "PERCENTAGE") == format_number_for_display(76.0, "PERCENTAGE") == "76.0%"
+    assert format_number_for_display(87.0, "INTEGER") == "87"
+    assert format_number_for_display(0.16, "DECIMAL") == "0.16"
+    print("✓ Display formatting works")
+    
     print("\n✅ All data parser tests passed!")
 
@@ -0,0 +1,77 @@
+"""
+Dataset version
+One hash over every file behind reports, CAI-adjusted ratings and the improvement measures
+"""
+
+import os
+from typing import Dict, Optional
+
+from cai_calculator import DEFAULT_CAI_VALUES_PATH
+from contract_report import (
+    SUMMARY_PATH, MEASURE_DATA_PATH, MEASURE_STARS_PATH, PART_C_CUT_POINTS_PATH, PART_D_CUT_POINTS_PATH,
+    CAI_PATH,
+)
+from improvement import PRIOR_RATING_YEAR, find_prior_year_files
+from measure_profile import dataset_hash
+from weight_profile import CURRENT_PROFILE, WEIGHT_PROFILE_DIR
+
+
+def dataset_inputs(cai_path: str = CAI_PATH, cai_values_path: str = DEFAULT_CAI_VALUES_PATH,
+                   prior_year: int = PRIOR_RATING_YEAR) -> Dict[str, str]:
+    """
+    Every input file, keyed by role
+
+    The tables ContractReportGenerator and MeasureIndex load, the CAI table
+    and cai_values.csv (CAICalculator), the current weight profile, and the
+    prior year's Measure Data / Measure Stars when present in the current
+    directory (ImprovementEngine).
+    """
+    inputs = {
+        'summary': SUMMARY_PATH,
+        'measure_data': MEASURE_DATA_PATH,
+        'measure_stars': MEASURE_STARS_PATH,
+        'part_c_cut_points': PART_C_CUT_POINTS_PATH,
+        'part_d_cut_points': PART_D_CUT_POINTS_PATH,
+        'cai': cai_path,
+        'cai_values': cai_values_path,
+        'weights': os.path.join(WEIGHT_PROFILE_DIR, f'{CURRENT_PROFILE}.json'),
+    }
+    prior = find_prior_year_files('.', prior_year) or {}
+    inputs.update({f'prior_{key}': path for key, path in prior.items() if path})
+    return inputs
+
+
+def dataset_version(inputs: Optional[Dict[str, str]] = None) -> str:
+    """
+    SHA-256 over every input file (dataset_inputs() by default)
+
+    Keys the per-version caches (sensitivity, domains, leaderboards),
+    SingleFlight and saved scenario re-scoring, and is recorded in compiled
+    stars_core datasets, so a change to any input invalidates all of them.
+    """
+    return dataset_hash(dataset_inputs() if inputs is None else inputs)
+
+
+# Test cases
+if __name__ == "__main__":
+    import shutil
+    import tempfile
+
+    print("Testing dataset version...")
+    inputs = dataset_inputs()
+    assert all(os.path.exists(path) for path in inputs.values())
+    version = dataset_version(inputs)
+    assert version == dataset_version() and len(version) == 64
+    print(f"✓ {len(inputs)} input files -> {version[:12]}")
+
+    # Changing any input (here cai_values.csv) changes the version
+    with tempfile.TemporaryDirectory() as tmp:
+        changed = os.path.join(tmp, 'cai_values.csv')
+        shutil.copyfile(inputs['cai_values'], changed)
+        assert dataset_version(dict(inputs, cai_values=changed)) == version
+        with open(changed, 'a') as f:
+            f.write('\n')
+        assert dataset_version(dict(inputs, cai_values=changed)) != version
+    print("✓ Editing cai_values.csv changes the dataset version")
+
+    print("\n✅ All dataset version tests passed!")
@@ -0,0 +1,294 @@
+"""
+Domain star rollups
+HD1-HD5 and DD1-DD4 domain ratings, star counts and weighted averages for every contract at once
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from measure_config import DOMAIN_NAMES, MEASURE_CONFIGS
+from measure_index import SPECIAL_CODES
+from rating_engine import json_value
+from version_cache import VersionCache
+
+DOMAINS = list(DOMAIN_NAMES)
+DOMAIN_SORTS = ('star', 'mean', 'weighted')
+
+# Measures a contract does not have to report don't count toward the domain size
+NOT_APPLICABLE = (SPECIAL_CODES['NOT_REQUIRED'], SPECIAL_CODES['NOT_OFFERED'])
+
+# Rollups kept per dataset version
+_cache: VersionCache['DomainRollup'] = VersionCache()
+
+
+def minimum_rated(n_measures: np.ndarray) -> np.ndarray:
+    """
+    Rated measures needed for a domain rating (Technical Notes, Table 5):
+    more than half of an even-sized domain, half rounded up of an odd-sized one
+    """
+    n_measures = np.asarray(n_measures)
+    return np.where(n_measures % 2 == 0, n_measures // 2 + 1, (n_measures + 1) // 2)
+
+
+def domain_star(mean, rated, minimum) -> np.ndarray:
+    """Domain rating: mean measure star rounded to the nearest whole star, 0 below the rated minimum"""
+    rated = np.asarray(rated)
+    rounded = np.floor(np.round(np.nan_to_num(np.asarray(mean, dtype=np.float64)), 6) + 0.5)
+    return np.where((rated > 0) & (rated >= minimum), rounded, 0).astype(np.int8)
+
+
+class DomainRollup:
+    """
+    Domain ratings for every contract as (contracts, domains) arrays
+
+    Measures are grouped with a one-hot (measures, domains) matrix, so star
+    counts, sums and weighted sums for every contract and domain are a few
+    matrix products over MeasureIndex.stars. A domain rating is the
+    unweighted mean of the domain's measure stars rounded to the nearest
+    whole star, given when the contract has at least the Technical Notes
+    minimum of rated measures. The domain size is the number of measures the
+    contract had to report (all but "not required" / "benefit not offered"),
+    which reproduces Table 5's per contract type sizes (e.g. HD2 15 with
+    SNPs, 12 without). The weighted average uses the Part C / Part D summary
+    weights.
+
+    Attributes:
+        counts: int16 (contracts, domains, 5) measures at each star level
+        rated: int16 (contracts, domains) rated measures
+        applicable: int16 (contracts, domains) measures the contract had to report
+        minimum: int16 (contracts, domains) rated measures needed for a rating
+        mean: float64 (contracts, domains) unweighted mean star, NaN if unrated
+        weighted: float64 (contracts, domains) weighted mean star, NaN if unrated
+        star: int8 (contracts, domains) domain rating, 0 = not rated
+    """
+
+    def __init__(self, rating_engine):
+        self.engine = rating_engine
+        index = rating_engine.index
+        self.index = index
+        domain_of = [DOMAINS.index(MEASURE_CONFIGS[code].domain) for code in index.codes]
+        self.membership = np.zeros((len(index.codes), len(DOMAINS)))
+        self.membership[np.arange(len(domain_of)), domain_of] = 1.0
+        self.domain_codes: Dict[str, List[str]] = {
+            domain: [code for code, d in zip(index.codes, domain_of) if d == j] for j, domain in enumerate(DOMAINS)
+        }
+
+        weights = rating_engine.weights
+        measure_weights = np.where(rating_engine.masks['part_c'], weights['part_c'], weights['part_d'])
+
+        stars = index.stars
+        rated = stars > 0
+        applicable = ~np.isin(index.special, NOT_APPLICABLE)
+        # (stars == k) for k = 1..5 stacked along the last axis, grouped in one product
+        levels = (stars[:, :, None] == np.arange(1, 6)).astype(np.float64)
+        self.counts = np.einsum('rmk,md->rdk', levels, self.membership).astype(np.int16)
+        self.rated = (rated @ self.membership).astype(np.int16)
+        self.applicable = (applicable @ self.membership).astype(np.int16)
+        self.minimum = minimum_rated(self.applicable).astype(np.int16)
+
+        star_sum = stars.astype(np.float64) @ self.membership
+        weighted_sum = (stars * measure_weights) @ self.membership
+        total_weight = (rated * measure_weights) @ self.membership
+        with np.errstate(invalid='ignore', divide='ignore'):
+            self.mean = np.where(self.rated > 0, star_sum / self.rated, np.nan)
+            self.weighted = np.where(total_weight > 0, weighted_sum / total_weight, np.nan)
+        self.star = domain_star(self.mean, self.rated, self.minimum)
+
+        # Leaderboard order per (domain, sort): contracts with a domain rating, best first
+        self._order: Dict[tuple, np.ndarray] = {}
+        for j, domain in enumerate(DOMAINS):
+            star = self.star[:, j]
+            mean = np.nan_to_num(self.mean[:, j], nan=-np.inf)
+            weighted = np.nan_to_num(self.weighted[:, j], nan=-np.inf)
+            keys = {'star': (-weighted, -mean, -star), 'mean': (-weighted, -star, -mean),
+                    'weighted': (-mean, -star, -weighted)}
+            for sort, key in keys.items():
+                order = np.lexsort(key)
+                self._order[domain, sort] = order[star[order] > 0]
+
+        print(f"✓ Computed domain ratings: {int((self.star > 0).sum())} contract x domain ratings")
+
+    def _domain(self, r: int, j: int) -> Dict:
+        return {
+            'domain': DOMAINS[j],
+            'name': DOMAIN_NAMES[DOMAINS[j]],
+            'star': int(self.star[r, j]) or None,
+            'mean': json_value(self.mean[r, j], 4),
+            'weighted': json_value(self.weighted[r, j], 4),
+            'rated': int(self.rated[r, j]),
+            'measures': int(self.applicable[r, j]),
+            'minimum': int(self.minimum[r, j]),
+            'star_counts': {str(k + 1): int(c) for k, c in enumerate(self.counts[r, j])},
+        }
+
+    def contract_domains(self, contract_id: str) -> Dict[str, Dict]:
+        """
+        Domain ratings for one contract
+
+        Returns:
+            {domain: {domain, name, star, mean, weighted, rated, measures,
+            minimum, star_counts}} (star None below the rated-measure minimum)
+
+        Raises:
+            ValueError: If the contract is unknown
+        """
+        r = self.index.row_of.get(str(contract_id).strip().upper())
+        if r is None:
+            raise ValueError(f"Contract {contract_id} not found")
+        return {domain: self._domain(r, j) for j, domain in enumerate(DOMAINS)}
+
+    def summary(self) -> List[Dict]:
+        """Every domain with its measures and market-wide domain star distribution"""
+        result = []
+        for j, domain in enumerate(DOMAINS):
+            star = self.star[:, j]
+            result.append({
+                'domain': domain,
+                'name': DOMAIN_NAMES[domain],
+                'measures': self.domain_codes[domain],
+                'rated_contracts': int((star > 0).sum()),
+                'distribution': {str(k): int((star == k).sum()) for k in range(1, 6)},
+                'mean_star': json_value(star[star > 0].mean(), 4) if (star > 0).any() else None,
+            })
+        return result
+
+    def order(self, domain: str, sort: str = 'star') -> np.ndarray:
+        """
+        Presorted rows of the contracts with a domain rating, best first
+
+        Raises:
+            ValueError: For unknown domains or sorts
+        """
+        domain = str(domain).strip().upper()
+        if domain not in DOMAIN_NAMES:
+            raise ValueError(f"Unknown domain: {domain} (expected one of {', '.join(DOMAINS)})")
+        if sort not in DOMAIN_SORTS:
+            raise ValueError(f"Sort must be one of {DOMAIN_SORTS}, got '{sort}'")
+        return self._order[domain, sort]
+
+    def leaderboard(self, domain: str, sort: str = 'star', limit: int = 100, offset: int = 0,
+                    org_type: Optional[str] = None) -> Dict:
+        """
+        Contracts ranked within one domain
+
+        'star' ranks by domain rating, then unweighted and weighted mean;
+        'mean' and 'weighted' rank by that average first. Only contracts with
+        a domain rating are listed.
+
+        Args:
+            domain: Domain code (HD1-HD5, DD1-DD4)
+            sort: 'star', 'mean' or 'weighted'
+            limit: Page size
+            offset: Rows to skip
+            org_type: Only this organization type (e.g. 'Local CCP', 'PDP')
+
+        Returns:
+            Dictionary with domain, name, sort, total, offset, limit and rows
+            [{rank, contract_id, marketing_name, parent_org, org_type, star,
+            mean, weighted, rated, measures, star_counts}]
+
+        Raises:
+            ValueError: For unknown domains or sorts, or bad paging
+        """
+        order = self.order(domain, sort)
+        if limit < 1 or offset < 0:
+            raise ValueError("limit must be positive and offset non-negative")
+
+        domain = str(domain).strip().upper()
+        index = self.index
+        j = DOMAINS.index(domain)
+        if org_type:
+            order = order[index.org_type[order] == org_type.strip()]
+
+        rows = []
+        for rank, r in enumerate(order[offset:offset + limit], start=offset + 1):
+            r = int(r)
+            row = self._domain(r, j)
+            rows.append({
+                'rank': rank,
+                'contract_id': index.contract_ids[r],
+                'marketing_name': index.marketing_name[r],
+                'parent_org': index.parent_org[r],
+                'org_type': index.org_type[r],
+                **{key: row[key] for key in ('star', 'mean', 'weighted', 'rated', 'measures', 'star_counts')},
+            })
+        return {
+            'domain': domain,
+            'name': DOMAIN_NAMES[domain],
+            'sort': sort,
+            'total': int(len(order)),
+            'offset': offset,
+            'limit': limit,
+            'rows': rows,
+        }
+
+
+def get_domain_rollup(rating_engine, dataset_version: str) -> DomainRollup:
+    """Domain rollup for a dataset version, computed once per version"""
+    return _cache.get(dataset_version, rating_engine, lambda: DomainRollup(rating_engine))
+
+
+# Test cases
+if __name__ == "__main__":
+    import time
+    from contract_report import ContractReportGenerator
+    from measure_index import MeasureIndex
+    from rating_engine import RatingEngine
+    from cai_calculator import CAICalculator
+
+    print("Testing domain rollups...")
+    generator = ContractReportGenerator()
+    index = MeasureIndex(generator)
+    engine = RatingEngine(index, CAICalculator('2026 Star Ratings Data Table - CAI (Oct 8 2025).csv'))
+
+    start = time.perf_counter()
+    rollup = DomainRollup(engine)
+    print(f"✓ Rolled up {len(index.contract_ids)} contracts in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    assert list(minimum_rated(np.array([1, 2, 3, 6, 9, 11, 12, 15]))) == [1, 2, 2, 4, 5, 6, 7, 8]
+
+    # Grouped arrays match grouping each contract's report lines by domain
+    for contract_id in generator.list_contracts()[:150]:
+        try:
+            report = generator.generate_report(contract_id)
+        except ValueError:
+            continue
+        domains = rollup.contract_domains(contract_id)
+        for domain in DOMAINS:
+            lines = [line for line in report['measure_lines'] if line.domain == domain]
+            stars = [line.star_rating for line in lines if line.star_rating]
+            applicable = [line for line in lines
+                          if line.special_category not in ('NOT_REQUIRED', 'NOT_OFFERED')]
+            got = domains[domain]
+            assert got['rated'] == len(stars), (contract_id, domain)
+            assert got['measures'] == len(applicable), (contract_id, domain)
+            assert got['star_counts'] == {str(k): stars.count(k) for k in range(1, 6)}
+            if stars:
+                assert abs(got['mean'] - sum(stars) / len(stars)) < 1e-4, (contract_id, domain)
+    print("✓ Domain counts and means match per-contract report grouping")
+
+    # Table 5 domain sizes: HD2 has 15 measures for CCPs with SNPs, 12 without
+    ccp = index.org_type == 'Local CCP'
+    hd2 = DOMAINS.index('HD2')
+    sizes = np.unique(rollup.applicable[ccp, hd2], return_counts=True)
+    assert {12, 15} <= set(sizes[0]), sizes
+    assert (rollup.minimum[ccp, hd2][rollup.applicable[ccp, hd2] == 15] == 8).all()
+    pdp = index.part_d_set == 1
+    assert (rollup.star[pdp, :5] == 0).all()
+    print("✓ Domain sizes follow the Technical Notes minimums")
+
+    board = rollup.leaderboard('HD2', limit=5)
+    stars = [row['star'] for row in board['rows']]
+    assert stars == sorted(stars, reverse=True) and board['total'] > 0
+    for row in board['rows']:
+        print(f"  {row['rank']}. {row['contract_id']} HD2 {row['star']}⭐ (mean {row['mean']}, "
+              f"{row['rated']}/{row['measures']} rated)")
+    try:
+        rollup.leaderboard('HD9')
+        assert False, "unknown domain accepted"
+    except ValueError:
+        pass
+
+    assert get_domain_rollup(engine, 'v1') is get_domain_rollup(engine, 'v1')
+    print("\n✅ All domain rollup tests passed!")
@@ -0,0 +1,324 @@
+"""
+Improvement measures (C30 Health Plan / D04 Drug Plan Quality Improvement)
+Year-over-year change significance and improvement scores for every contract (Tech Notes Attachment I)
+"""
+
+import glob
+import math
+import os
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from ingest import load_measure_table
+from measure_config import MEASURE_CONFIGS
+from weight_profile import current_profile
+
+# Prior Star Ratings year, for the improvement measures
+PRIOR_RATING_YEAR = 2025
+
+# Improvement measure per rating part
+IMPROVEMENT_MEASURES = {'part_c': 'C30', 'part_d': 'D04'}
+
+# Measures used in the improvement measures and their year-over-year score
+# correlation (Tech Notes Tables I-1 and I-2, 2026 Star Ratings)
+IMPROVEMENT_CORRELATIONS = {
+    'C01': 0.945918, 'C02': 0.888326, 'C03': 0.902341, 'C06': 0.845725, 'C07': 0.868694,
+    'C08': 0.854992, 'C09': 0.928640, 'C10': 0.833787, 'C11': 0.843728, 'C12': 0.791850,
+    'C14': 0.835804, 'C15': 0.841469, 'C16': 0.432892, 'C17': 0.872774, 'C18': 0.523042,
+    'C19': 0.729464, 'C20': 0.887062, 'C21': 0.463245, 'C22': 0.787381, 'C23': 0.729360,
+    'C24': 0.740178, 'C25': 0.711479, 'C26': 0.784188, 'C27': 0.747242, 'C28': 0.713325,
+    'C29': 0.790100, 'C31': 0.433903, 'C32': 0.490732, 'C33': 0.453086,
+    'D01': 0.518133, 'D02': 0.723507, 'D03': 0.791540, 'D05': 0.784401, 'D06': 0.681827,
+    'D07': 0.832817, 'D08': 0.605524, 'D09': 0.757009, 'D10': 0.754567, 'D11': 0.779423,
+    'D12': 0.835138,
+}
+
+# Two-sided t-test at the 0.05 level
+SIGNIFICANCE_Z = 1.96
+
+# Denominator assumed for the binomial standard error when none is supplied
+# (the HEDIS hybrid sample size). Measure Data does not publish denominators.
+DEFAULT_DENOMINATOR = 411
+
+# Formats scored on a 0-100 scale, where the binomial standard error applies
+BINOMIAL_FORMATS = ('PERCENTAGE', 'INTEGER')
+
+
+def binomial_standard_error(score: np.ndarray, denominator) -> np.ndarray:
+    """sqrt(score * (100 - score) / denominator) for 0-100 scores (Attachment I, SEF 1)"""
+    score = np.clip(np.asarray(score, dtype=float), 0.0, 100.0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.sqrt(score * (100.0 - score) / denominator)
+
+
+def change_standard_error(se_current, se_prior, correlation) -> np.ndarray:
+    """Standard error of a change score between two correlated years"""
+    se_current = np.asarray(se_current, dtype=float)
+    se_prior = np.asarray(se_prior, dtype=float)
+    variance = se_current ** 2 + se_prior ** 2 - 2 * correlation * se_current * se_prior
+    return np.sqrt(np.maximum(variance, 0.0))
+
+
+def find_prior_year_files(directory: str = '.', year: int = PRIOR_RATING_YEAR) -> Optional[Dict[str, str]]:
+    """
+    Locate the prior year's Measure Data (and Measure Stars, if present)
+
+    Returns:
+        {'measure_data': path, 'measure_stars': path or None}, or None if there
+        is no Measure Data table for that year
+    """
+    paths = {}
+    for key, name in (('measure_data', 'Measure Data'), ('measure_stars', 'Measure Stars')):
+        matches = sorted(glob.glob(os.path.join(directory, f"{year} Star Ratings Data Table - {name}*.csv")))
+        paths[key] = matches[-1] if matches else None
+    return paths if paths['measure_data'] else None
+
+
+def align_table(table, index, kind: str = 'values') -> np.ndarray:
+    """A MeasureTable's values reindexed onto the index's contract rows and measure columns"""
+    fill = np.nan if kind == 'values' else 0
+    frame = (pd.DataFrame(table.values, index=table.contract_ids, columns=table.measure_codes)
+             .groupby(level=0).first()
+             .reindex(index=index.contract_ids, columns=index.codes, fill_value=fill))
+    if kind == 'values':
+        return np.round(frame.to_numpy(dtype=np.float64), 6)
+    return frame.to_numpy(dtype=np.int8)
+
+
+class ImprovementEngine:
+    """
+    C30/D04 improvement scores and stars for every contract in a MeasureIndex
+
+    For each included measure scored in both years the change (current - prior,
+    reversed for inverse measures) is tested against its standard error;
+    |z| > 1.96 counts as a significant improvement or decline. A decline on a
+    measure rated 5 stars in both years is held harmless. The score per part
+    is the weighted net improvement over the weighted eligible measures, and
+    stars come from the C30/D04 cut points.
+
+    Measure Data carries no denominators or CAHPS standard errors, so unless
+    standard_errors are supplied a binomial standard error with
+    DEFAULT_DENOMINATOR is used for 0-100 measures; C28/D02 complaint rates
+    then cannot be tested and never count as significant. Published C30/D04
+    stars will therefore not always be reproduced.
+    """
+
+    def __init__(self, index, prior_values: np.ndarray, prior_stars: Optional[np.ndarray] = None,
+                 standard_errors: Optional[Dict[str, np.ndarray]] = None,
+                 denominator: float = DEFAULT_DENOMINATOR):
+        """
+        Args:
+            index: MeasureIndex for the current year
+            prior_values: (contracts, measures) prior-year values aligned to the index (NaN = not scored)
+            prior_stars: Prior-year stars aligned to the index (default: prior values on current cut points)
+            standard_errors: Optional {'current': array, 'prior': array} aligned to the index; NaN
+                cells fall back to the binomial estimate
+            denominator: Denominator for the binomial standard error
+        """
+        self.index = index
+        codes = index.codes
+        self.prior_values = prior_values
+        if prior_stars is None:
+            prior_stars = index.cut_points.assign_stars(prior_values, index.part_d_set)
+        self.prior_stars = prior_stars
+
+        self.included = np.array([code in IMPROVEMENT_CORRELATIONS for code in codes], dtype=bool)
+        self.correlation = np.array([IMPROVEMENT_CORRELATIONS.get(code, 0.0) for code in codes])
+        is_part_c = np.array([MEASURE_CONFIGS[code].part_type == 'C' for code in codes], dtype=bool)
+        self.part_cols = {'part_c': is_part_c & self.included, 'part_d': ~is_part_c & self.included}
+
+        # Newer (current) weights; D02/D03 keep their Part D summary weight
+        weights = current_profile().part_weights(codes)
+        self.weights = np.where(is_part_c, weights['part_c'], weights['part_d']) * self.included
+
+        self.binomial = np.array([MEASURE_CONFIGS[code].format_type in BINOMIAL_FORMATS for code in codes])
+        self.denominator = denominator
+        self.standard_errors = standard_errors or {}
+        self.improvement_cols = {part: index.col_of.get(code) for part, code in IMPROVEMENT_MEASURES.items()}
+
+        self.prior_se = self._standard_error(prior_values, self.standard_errors.get('prior'),
+                                             np.arange(len(index.contract_ids)))
+        self.baseline = self.compute(index.values, index.stars)
+
+        rated = {part: int(np.isfinite(self.baseline['score'][part]).sum()) for part in IMPROVEMENT_MEASURES}
+        print(f"✓ Computed improvement scores: {rated['part_c']} Part C, {rated['part_d']} Part D contracts")
+
+    @classmethod
+    def from_files(cls, index, prior_measure_data: str, prior_measure_stars: Optional[str] = None,
+                   **kwargs) -> 'ImprovementEngine':
+        """Engine from the prior year's Measure Data (and optionally Measure Stars) CSVs"""
+        prior_values = align_table(load_measure_table(prior_measure_data, 'values'), index)
+        prior_stars = None
+        if prior_measure_stars:
+            prior_stars = align_table(load_measure_table(prior_measure_stars, 'stars'), index, 'stars')
+        return cls(index, prior_values, prior_stars, **kwargs)
+
+    def _standard_error(self, values: np.ndarray, supplied: Optional[np.ndarray], rows: np.ndarray) -> np.ndarray:
+        se = np.where(self.binomial, binomial_standard_error(values, self.denominator), np.nan)
+        if supplied is not None:
+            supplied = supplied[rows]
+            se = np.where(np.isnan(supplied), se, supplied)
+        return se
+
+    def compute(self, values: np.ndarray, stars: np.ndarray, rows: Optional[np.ndarray] = None) -> Dict:
+        """
+        Improvement results for current-year values
+
+        Args:
+            values: (k, measures) current values
+            stars: (k, measures) current stars (for the hold harmless)
+            rows: Index rows of those k contracts (default: all contracts, in order)
+
+        Returns:
+            Dictionary with (k, measures) boolean arrays eligible, improved,
+            declined and held_harmless, plus per part: score and star (k,)
+            arrays (NaN / 0 where not rated), eligible_count and required_count
+        """
+        rows = np.arange(len(values)) if rows is None else np.asarray(rows)
+        prior = self.prior_values[rows]
+
+        eligible = self.included & np.isfinite(values) & np.isfinite(prior)
+        change = np.where(self.index.is_inverse, prior - values, values - prior)
+
+        se_current = self._standard_error(values, self.standard_errors.get('current'), rows)
+        se_change = change_standard_error(se_current, self.prior_se[rows], self.correlation)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            z = np.where(eligible & (se_change > 0), change / se_change, 0.0)
+        z = np.nan_to_num(z)
+
+        improved = eligible & (z > SIGNIFICANCE_Z)
+        declined = eligible & (z < -SIGNIFICANCE_Z)
+        held_harmless = declined & (stars == 5) & (self.prior_stars[rows] == 5)
+        declined &= ~held_harmless
+
+        net = (improved.astype(float) - declined) * self.weights
+        scored_either = self.included & (np.isfinite(values) | np.isfinite(prior))
+
+        result = {'eligible': eligible, 'improved': improved, 'declined': declined,
+                  'held_harmless': held_harmless, 'score': {}, 'star': {},
+                  'eligible_count': {}, 'required_count': {}}
+
+        score_matrix = np.full(values.shape, np.nan)
+        for part, cols in self.part_cols.items():
+            eligible_count = eligible[:, cols].sum(axis=1)
+            required_count = scored_either[:, cols].sum(axis=1)
+            eligible_weight = (eligible * self.weights)[:, cols].sum(axis=1)
+            # Scores for both years in at least half of the measures
+            has_rating = (eligible_count > 0) & (eligible_count * 2 >= required_count)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                score = np.where(has_rating, net[:, cols].sum(axis=1) / eligible_weight, np.nan)
+            result['score'][part] = score
+            result['eligible_count'][part] = eligible_count
+            result['required_count'][part] = required_count
+            m = self.improvement_cols[part]
+            if m is not None:
+                score_matrix[:, m] = score
+
+        assigned = self.index.cut_points.assign_stars(score_matrix, self.index.part_d_set[rows])
+        for part in IMPROVEMENT_MEASURES:
+            m = self.improvement_cols[part]
+            result['star'][part] = assigned[:, m] if m is not None else np.zeros(len(values), dtype=np.int8)
+        return result
+
+    def contract_stars(self, row: int, values: np.ndarray, stars: np.ndarray) -> Dict[str, int]:
+        """Modelled improvement star per part for one contract's (edited) values (0 = not rated)"""
+        result = self.compute(values[None, :], stars[None, :], np.array([row]))
+        return {part: int(result['star'][part][0]) for part in IMPROVEMENT_MEASURES}
+
+    def contract_improvement(self, contract_id: str) -> Dict[str, Dict]:
+        """
+        One contract's improvement measures
+
+        Returns:
+            {part: {measure_code, score, star, published_star, eligible_count,
+            required_count, improved, declined, held_harmless}} with measure code lists
+
+        Raises:
+            KeyError: If the contract is unknown
+        """
+        contract_id = str(contract_id).strip().upper()
+        r = self.index.row_of.get(contract_id)
+        if r is None:
+            raise KeyError(f"Contract {contract_id} not found")
+
+        result = {}
+        codes = self.index.codes
+        for part, code in IMPROVEMENT_MEASURES.items():
+            cols = self.part_cols[part]
+            score = float(self.baseline['score'][part][r])
+            m = self.improvement_cols[part]
+            result[part] = {
+                'measure_code': code,
+                'score': round(score, 6) if math.isfinite(score) else None,
+                'star': int(self.baseline['star'][part][r]) or None,
+                'published_star': (int(self.index.stars[r, m]) or None) if m is not None else None,
+                'eligible_count': int(self.baseline['eligible_count'][part][r]),
+                'required_count': int(self.baseline['required_count'][part][r]),
+                **{key: [codes[c] for c in np.flatnonzero(self.baseline[key][r] & cols)]
+                   for key in ('improved', 'declined', 'held_harmless')},
+            }
+        return result
+
+
+# Test cases
+if __name__ == "__main__":
+    import time
+    from contract_report import ContractReportGenerator
+    from measure_index import MeasureIndex
+
+    print("Testing improvement measures...")
+
+    # Tech Notes numerical example: C03, contract A
+    assert round(float(change_standard_error(2.805, 3.000, 0.901)), 3) == 1.305
+    assert round(float(binomial_standard_error(50.0, 100)), 6) == 5.0
+    print("✓ Standard error formulas match Attachment I")
+
+    generator = ContractReportGenerator()
+    index = MeasureIndex(generator)
+
+    # Synthetic prior year: every included measure 10 points lower (higher for inverse
+    # measures), so current scores are significant improvements wherever testable
+    shift = np.where(index.is_inverse, 10.0, -10.0)
+    prior = np.where(np.isfinite(index.values), index.values + shift, np.nan)
+    engine = ImprovementEngine(index, prior)
+
+    c01 = index.get_column('C01')
+    tested = np.isfinite(index.values[:, c01]) & (index.values[:, c01] < 95)
+    assert engine.baseline['improved'][tested, c01].all()
+    assert not engine.baseline['declined'].any()
+    print("✓ Uniform gains test as significant improvements")
+
+    rated = np.isfinite(engine.baseline['score']['part_c'])
+    assert (engine.baseline['score']['part_c'][rated] > 0).all()
+    assert (engine.baseline['star']['part_c'][rated] >= 3).all()
+    print(f"✓ {int(rated.sum())} contracts rated on C30, all at 3+ stars")
+
+    # No change at all scores 0 (centred on 3 stars)
+    flat = ImprovementEngine(index, index.values.copy())
+    rated = np.isfinite(flat.baseline['score']['part_c'])
+    assert (flat.baseline['score']['part_c'][rated] == 0).all()
+    assert (flat.baseline['star']['part_c'][rated] == 3).all()
+    print("✓ No change scores 0 and 3 stars")
+
+    # A 5-star measure that declines in a contract rated 5 stars in both years is held harmless
+    worse = np.where(np.isfinite(index.values), index.values - shift, np.nan)
+    held = ImprovementEngine(index, worse, prior_stars=np.full(index.stars.shape, 5, dtype=np.int8))
+    five = index.stars == 5
+    assert not (held.baseline['declined'] & five).any()
+    assert held.baseline['held_harmless'].any()
+    print("✓ Hold harmless for 5-star measures")
+
+    contract_id = index.contract_ids[int(np.flatnonzero(rated)[0])]
+    detail = engine.contract_improvement(contract_id)
+    assert detail['part_c']['measure_code'] == 'C30' and detail['part_c']['improved']
+    r = index.row_of[contract_id]
+    assert engine.contract_stars(r, index.values[r], index.stars[r])['part_c'] == detail['part_c']['star']
+    print(f"✓ {contract_id}: C30 score {detail['part_c']['score']} -> {detail['part_c']['star']} stars")
+
+    start = time.perf_counter()
+    engine.compute(index.values, index.stars)
+    print(f"✓ Whole market recomputed in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    print("\n✅ All improvement tests passed!")
@@ -0,0 +1,239 @@
+"""
+Top/bottom-K leaderboards
+Contracts ranked by overall / Part C / Part D rating, per measure and per domain, from presorted row arrays
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from cohorts import bitmap_rows
+from domain_rollup import DOMAINS, get_domain_rollup
+from rating_engine import RATING_PARTS, json_value
+from version_cache import VersionCache
+
+ENDS = ('top', 'bottom')
+DEFAULT_K = 10
+
+# Leaderboards kept per dataset version
+_cache: VersionCache['Leaderboards'] = VersionCache()
+
+
+@dataclass
+class Board:
+    """One presorted ranking: ranked contract rows best first, plus the two values shown per row"""
+    kind: str
+    order: np.ndarray
+    primary_name: str
+    primary: np.ndarray
+    secondary_name: str
+    secondary: np.ndarray
+
+
+class Leaderboards:
+    """
+    Presorted contract rankings for every rating part, measure and domain
+
+    Each board is built once at load as an array of contract rows, best
+    first, holding only contracts rated on it. Top K is a slice from the
+    front, bottom K a slice from the back. A cohort filter (org type,
+    parent organization or any other CohortIndex field) becomes a row mask,
+    and the mask is applied along the presorted order, so a request never
+    sorts anything.
+
+    Ties are broken by the unrounded value behind the rating: the
+    CAI-adjusted score for ratings, the performance value (direction-aware)
+    for measures and the mean measure star for domains.
+    """
+
+    def __init__(self, rating_engine, domain_rollup, cohorts=None):
+        self.engine = rating_engine
+        index = rating_engine.index
+        self.index = index
+        self.cohorts = cohorts
+        self.n = len(index.contract_ids)
+        self.boards: Dict[str, Board] = {}
+
+        for part in RATING_PARTS:
+            rating = rating_engine.baseline[part]['rating']
+            adjusted = rating_engine.baseline[part]['adjusted']
+            order = np.lexsort((-np.nan_to_num(adjusted, nan=-np.inf), -np.nan_to_num(rating, nan=-np.inf)))
+            self.boards[part] = Board('rating', order[np.isfinite(rating[order])],
+                                      'rating', rating, 'adjusted', adjusted)
+
+        for m, code in enumerate(index.codes):
+            star = index.stars[:, m]
+            value = index.values[:, m]
+            # Better performance first; star-only cells (no value) last within their star level
+            better = np.nan_to_num(value if index.is_inverse[m] else -value, nan=np.inf)
+            order = np.lexsort((better, -star))
+            self.boards[code] = Board('measure', order[star[order] > 0], 'star', star, 'value', value)
+
+        for j, domain in enumerate(DOMAINS):
+            self.boards[domain] = Board('domain', domain_rollup.order(domain), 'star', domain_rollup.star[:, j],
+                                        'mean', domain_rollup.mean[:, j])
+
+        # Position of every contract on every board (-1 = not ranked)
+        self.rank_of: Dict[str, np.ndarray] = {}
+        for name, board in self.boards.items():
+            rank = np.full(self.n, -1, dtype=np.int32)
+            rank[board.order] = np.arange(len(board.order), dtype=np.int32)
+            self.rank_of[name] = rank
+
+        print(f"✓ Built {len(self.boards)} leaderboards over {self.n} contracts")
+
+    def _key(self, name: str) -> str:
+        """Board key for a name in any case (rating parts are lowercase, measures and domains uppercase)"""
+        name = str(name).strip()
+        for key in (name.lower(), name.upper()):
+            if key in self.boards:
+                return key
+        raise ValueError(f"Unknown leaderboard: {name} (expected a rating part, measure code or domain)")
+
+    def list_boards(self) -> Dict[str, List[str]]:
+        """Board names by kind"""
+        result: Dict[str, List[str]] = {}
+        for name, board in self.boards.items():
+            result.setdefault(board.kind, []).append(name)
+        return result
+
+    def ranked(self, name: str, end: str = 'top', k: int = DEFAULT_K, offset: int = 0,
+            criteria: Optional[Dict[str, List[str]]] = None) -> Dict:
+        """
+        Best or worst K contracts on one board
+
+        Args:
+            name: 'overall', 'part_c', 'part_d', a measure code (C01) or a domain (HD1)
+            end: 'top' (best first) or 'bottom' (worst first)
+            k: Rows to return
+            offset: Rows to skip (paging)
+            criteria: Cohort filter, e.g. {'parent_org': ['Humana Inc.'], 'org_type': ['Local CCP']}
+
+        Returns:
+            Dictionary with board, kind, end, total, offset, k and rows [{rank,
+            market_rank, contract_id, marketing_name, parent_org, org_type,
+            <primary>, <secondary>}]; rank is within the filtered list,
+            market_rank on the whole board
+
+        Raises:
+            ValueError: For unknown boards, ends or cohort fields, or bad paging
+        """
+        key = self._key(name)
+        board = self.boards[key]
+        if end not in ENDS:
+            raise ValueError(f"End must be 'top' or 'bottom', got '{end}'")
+        if k < 1 or offset < 0:
+            raise ValueError("k must be positive and offset non-negative")
+
+        order = board.order
+        if criteria:
+            if self.cohorts is None:
+                raise ValueError("Cohort filters are not available")
+            mask = np.zeros(self.n, dtype=bool)
+            mask[bitmap_rows(self.cohorts.match(criteria), self.n)] = True
+            order = order[mask[order]]
+        total = len(order)
+        if end == 'bottom':
+            order = order[::-1]
+
+        index = self.index
+        rank_of = self.rank_of[key]
+        rows = []
+        for position, r in enumerate(order[offset:offset + k], start=offset):
+            r = int(r)
+            rows.append({
+                'rank': position + 1 if end == 'top' else total - position,
+                'market_rank': int(rank_of[r]) + 1,
+                'contract_id': index.contract_ids[r],
+                'marketing_name': index.marketing_name[r],
+                'parent_org': index.parent_org[r],
+                'org_type': index.org_type[r],
+                board.primary_name: json_value(board.primary[r], 1) if board.kind == 'rating' else int(board.primary[r]),
+                board.secondary_name: json_value(board.secondary[r]),
+            })
+        return {
+            'board': key,
+            'kind': board.kind,
+            'end': end,
+            'total': int(total),
+            'offset': offset,
+            'k': k,
+            'rows': rows,
+        }
+
+
+def get_leaderboards(rating_engine, dataset_version: str, cohorts=None) -> Leaderboards:
+    """Leaderboards for a dataset version, built once per version"""
+    return _cache.get(dataset_version, rating_engine,
+                      lambda: Leaderboards(rating_engine, get_domain_rollup(rating_engine, dataset_version), cohorts))
+
+
+# Test cases
+if __name__ == "__main__":
+    import time
+    from contract_report import ContractReportGenerator
+    from measure_index import MeasureIndex
+    from rating_engine import RatingEngine
+    from cai_calculator import CAICalculator
+    from cohorts import CohortIndex
+
+    print("Testing leaderboards...")
+    generator = ContractReportGenerator()
+    index = MeasureIndex(generator)
+    cai_calculator = CAICalculator('2026 Star Ratings Data Table - CAI (Oct 8 2025).csv')
+    engine = RatingEngine(index, cai_calculator)
+    cohorts = CohortIndex.from_generator(generator, index, cai_calculator)
+    boards = get_leaderboards(engine, 'v1', cohorts)
+    assert get_leaderboards(engine, 'v1', cohorts) is boards
+
+    # Top and bottom K match a full sort of the same data
+    overall = engine.baseline['overall']
+    rated = np.flatnonzero(np.isfinite(overall['rating']))
+    expected = sorted(rated, key=lambda r: (-overall['rating'][r], -overall['adjusted'][r], r))
+    top = boards.ranked('overall', k=10)
+    assert [row['contract_id'] for row in top['rows']] == [index.contract_ids[r] for r in expected[:10]]
+    assert top['total'] == len(rated)
+    bottom = boards.ranked('overall', 'bottom', k=5)
+    assert [row['contract_id'] for row in bottom['rows']] == [index.contract_ids[r] for r in expected[::-1][:5]]
+    assert bottom['rows'][0]['rank'] == len(rated)
+    print(f"✓ Overall top 10 and bottom 5 match a full sort ({len(rated)} rated contracts)")
+
+    # Measures rank inverse measures lowest value first
+    m = int(np.flatnonzero(index.is_inverse)[0])
+    code = index.codes[m]
+    rows = boards.ranked(code, k=20)['rows']
+    stars = [row['star'] for row in rows]
+    assert stars == sorted(stars, reverse=True)
+    for a, b in zip(rows, rows[1:]):
+        if a['star'] == b['star'] and a['value'] is not None and b['value'] is not None:
+            assert a['value'] <= b['value'], (code, a, b)
+    print(f"✓ {code} (inverse) ranks lower values first within a star level")
+
+    # Cohort filters keep the board order
+    org_type = 'PDP'
+    pdp = boards.ranked('part_d', k=1000, criteria={'org_type': [org_type]})
+    assert all(row['org_type'].strip() == org_type for row in pdp['rows'])
+    market_ranks = [row['market_rank'] for row in pdp['rows']]
+    assert market_ranks == sorted(market_ranks) and pdp['total'] == len(pdp['rows'])
+    print(f"✓ Part D leaderboard for {pdp['total']} PDPs keeps market order")
+
+    domain = boards.ranked('hd1', k=3)
+    assert domain['board'] == 'HD1' and domain['kind'] == 'domain'
+    for bad in ({'name': 'X99'}, {'name': 'overall', 'end': 'middle'}, {'name': 'overall', 'k': 0}):
+        try:
+            boards.ranked(**bad)
+            assert False, f"accepted {bad}"
+        except ValueError:
+            pass
+
+    parent_org = index.parent_org[expected[0]]
+    start = time.perf_counter()
+    for _ in range(1000):
+        boards.ranked('overall', k=10, criteria={'parent_org': [parent_org.strip()]})
+    elapsed = (time.perf_counter() - start) / 1000 * 1e6
+    print(f"✓ Filtered top 10 in {elapsed:.0f} µs per request")
+    for row in boards.ranked('overall', k=3)['rows']:
+        print(f"  {row['rank']}. {row['contract_id']} {row['rating']}⭐ ({row['adjusted']})")
+
+    print("\n✅ All leaderboard tests passed!")
@@ -0,0 +1,359 @@
+"""
+Local load test for the API
+Starts api.py under uvicorn with N workers and replays a Zipf-weighted contract / what-if traffic mix
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+# Share of user actions per endpoint (what-if actions are keystroke bursts)
+DEFAULT_MIX = {'contracts': 0.1, 'contract': 0.6, 'whatif': 0.3}
+
+# Zipf exponent for contract popularity (rank r is picked with weight 1 / r**s)
+ZIPF_EXPONENT = 1.1
+
+# Seconds between keystrokes inside one what-if burst
+KEYSTROKE_INTERVAL = 0.08
+
+PERCENTILES = (50, 95, 99)
+
+# Seconds to wait for every worker to load the data and answer
+STARTUP_TIMEOUT = 120
+
+
+def zipf_weights(n: int, exponent: float = ZIPF_EXPONENT) -> List[float]:
+    """Popularity weight for ranks 1..n"""
+    return [1.0 / (rank ** exponent) for rank in range(1, n + 1)]
+
+
+def percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return None
+    rank = max(1, int(-(-pct * len(sorted_values) // 100)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def keystrokes(value: float, format_type: str) -> List[str]:
+    """Successive input box contents while typing a value ("8", "87", "87.5")"""
+    text = str(int(round(value))) if format_type == 'INTEGER' else f"{value:g}"
+    return [text[:i] for i in range(1, len(text) + 1) if not text[:i].endswith(('.', '-'))]
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """'contract=6,whatif=3,contracts=1' -> normalised shares"""
+    mix = {}
+    for part in text.split(','):
+        name, _, share = part.partition('=')
+        if name.strip() not in DEFAULT_MIX:
+            raise ValueError(f"Unknown endpoint in mix: {name.strip()}")
+        mix[name.strip()] = float(share)
+    total = sum(mix.values())
+    if total <= 0:
+        raise ValueError("Mix shares must add up to more than 0")
+    return {name: share / total for name, share in mix.items()}
+
+
+def _rss_kb(pid: int) -> Dict[str, int]:
+    """Current and peak resident set size of a process, in kB"""
+    rss = {}
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith(('VmRSS:', 'VmHWM:')):
+                    rss[line[:5]] = int(line.split()[1])
+    except OSError:
+        pass
+    return {'rss_kb': rss.get('VmRSS', 0), 'peak_kb': rss.get('VmHWM', 0)}
+
+
+def process_tree(pid: int) -> List[int]:
+    """pid and all its descendants (Linux /proc)"""
+    children: Dict[int, List[int]] = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+
+    tree, stack = [], [pid]
+    while stack:
+        current = stack.pop()
+        tree.append(current)
+        stack.extend(children.get(current, []))
+    return tree
+
+
+def _role(pid: int, server_pid: int) -> str:
+    if pid == server_pid:
+        return 'supervisor'
+    try:
+        with open(f'/proc/{pid}/cmdline', 'rb') as f:
+            return 'helper' if b'resource_tracker' in f.read() else 'worker'
+    except OSError:
+        return 'worker'
+
+
+def worker_rss(server_pid: int) -> List[Dict]:
+    """RSS of the uvicorn supervisor, each worker and multiprocessing helpers"""
+    return [{'pid': pid, 'role': _role(pid, server_pid), **_rss_kb(pid)} for pid in process_tree(server_pid)]
+
+
+def start_server(workers: int, port: int, timeout: float = STARTUP_TIMEOUT) -> subprocess.Popen:
+    """
+    Start api:app under uvicorn and wait until it answers
+
+    Raises:
+        RuntimeError: If the server exits or is not ready within timeout seconds
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'api:app', '--host', '127.0.0.1', '--port', str(port),
+         '--workers', str(workers), '--log-level', 'warning'],
+        cwd=here, stdout=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"Server exited with code {server.returncode}")
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            conn.request('GET', '/api/contracts/search?q=&limit=1')
+            if conn.getresponse().status == 200:
+                conn.close()
+                # Workers load the data independently; give the others a moment
+                time.sleep(1.0 if workers > 1 else 0)
+                return server
+        except OSError:
+            pass
+        time.sleep(0.5)
+    stop_server(server)
+    raise RuntimeError(f"Server not ready after {timeout:.0f}s")
+
+
+def stop_server(server: subprocess.Popen):
+    """Terminate the server and its workers"""
+    server.terminate()
+    try:
+        server.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        server.kill()
+        server.wait()
+
+
+class Client:
+    """One simulated user on a keep-alive connection"""
+
+    def __init__(self, host: str, port: int, contract_ids: List[str], weights: List[float],
+                 mix: Dict[str, float], seed: int, think_time: float):
+        self.host, self.port = host, port
+        self.contract_ids = contract_ids
+        self.cum_weights = []
+        total = 0.0
+        for weight in weights:
+            total += weight
+            self.cum_weights.append(total)
+        self.actions = list(mix)
+        self.action_weights = [mix[a] for a in self.actions]
+        self.rng = random.Random(seed)
+        self.think_time = think_time
+        self.conn: Optional[http.client.HTTPConnection] = None
+        self.latencies: Dict[str, List[float]] = {name: [] for name in DEFAULT_MIX}
+        self.errors: Dict[str, int] = {name: 0 for name in DEFAULT_MIX}
+        self.measures: Dict[str, List[Tuple[str, float, str]]] = {}
+
+    def _request(self, endpoint: str, method: str, path: str, body: Optional[dict] = None):
+        payload = json.dumps(body).encode() if body is not None else None
+        headers = {'Content-Type': 'application/json'} if payload else {}
+        start = time.perf_counter()
+        try:
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(self.host, self.port, timeout=30)
+            self.conn.request(method, path, body=payload, headers=headers)
+            response = self.conn.getresponse()
+            data = response.read()
+            ok = response.status < 400
+        except (OSError, http.client.HTTPException):
+            if self.conn is not None:
+                self.conn.close()
+            self.conn, data, ok = None, b'', False
+        self.latencies[endpoint].append(time.perf_counter() - start)
+        if not ok:
+            self.errors[endpoint] += 1
+            return None
+        return json.loads(data) if data else None
+
+    def pick_contract(self) -> str:
+        return self.rng.choices(self.contract_ids, cum_weights=self.cum_weights)[0]
+
+    def view_contract(self, contract_id: str):
+        detail = self._request('contract', 'GET', f'/api/contract/{contract_id}')
+        if detail is not None and contract_id not in self.measures:
+            self.measures[contract_id] = [
+                (m['code'], m['performance_numeric'], m['format_type'])
+                for m in detail['measures']
+                if m['performance_numeric'] is not None and not m['is_special']
+            ]
+
+    def whatif_burst(self, contract_id: str):
+        """Open the contract if not seen yet, then type a new value into one measure"""
+        if contract_id not in self.measures:
+            self.view_contract(contract_id)
+        candidates = self.measures.get(contract_id)
+        if not candidates:
+            return
+        code, value, format_type = self.rng.choice(candidates)
+        target = max(0.0, value + self.rng.uniform(-10, 10))
+        for text in keystrokes(target, format_type):
+            self._request('whatif', 'POST', '/api/whatif',
+                          {'contract_id': contract_id, 'measure_code': code, 'value': text})
+            time.sleep(KEYSTROKE_INTERVAL)
+
+    def run(self, deadline: float):
+        while time.monotonic() < deadline:
+            action = self.rng.choices(self.actions, weights=self.action_weights)[0]
+            if action == 'contracts':
+                self._request('contracts', 'GET', '/api/contracts')
+            elif action == 'contract':
+                self.view_contract(self.pick_contract())
+            else:
+                self.whatif_burst(self.pick_contract())
+            if self.think_time:
+                time.sleep(self.rng.expovariate(1.0 / self.think_time))
+        if self.conn is not None:
+            self.conn.close()
+
+
+def run_load(base_url: str, clients: int = 8, duration: float = 30.0, mix: Optional[Dict[str, float]] = None,
+             seed: int = 0, think_time: float = 0.0, server_pid: Optional[int] = None) -> Dict:
+    """
+    Replay the traffic mix against a running server
+
+    Args:
+        base_url: e.g. http://127.0.0.1:8000
+        clients: Concurrent simulated users
+        duration: Seconds to run
+        mix: Endpoint -> share of actions (defaults to DEFAULT_MIX)
+        seed: Random seed (same seed, same contract popularity and action sequence)
+        think_time: Mean seconds between a user's actions (0 for closed-loop max load)
+        server_pid: uvicorn process to sample worker RSS from
+
+    Returns:
+        Dictionary with clients, seconds, endpoints {name: {requests, errors, rps,
+        p50_ms, p95_ms, p99_ms}}, total_rps and workers [{pid, role, rss_kb, peak_kb}]
+    """
+    url = urlsplit(base_url)
+    host, port = url.hostname, url.port or 80
+    mix = mix or DEFAULT_MIX
+
+    conn = http.client.HTTPConnection(host, port, timeout=60)
+    conn.request('GET', '/api/contracts')
+    contract_ids = [c['id'] for c in json.loads(conn.getresponse().read())['contracts']]
+    conn.close()
+
+    # Popularity rank is a seeded shuffle, so hot contracts differ between seeds
+    ranked = list(contract_ids)
+    random.Random(seed).shuffle(ranked)
+    weights = zipf_weights(len(ranked))
+
+    users = [Client(host, port, ranked, weights, mix, seed * 1000 + i, think_time) for i in range(clients)]
+    start = time.monotonic()
+    deadline = start + duration
+    threads = [threading.Thread(target=user.run, args=(deadline,), daemon=True) for user in users]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.monotonic() - start
+
+    endpoints = {}
+    for name in DEFAULT_MIX:
+        latencies = sorted(lat for user in users for lat in user.latencies[name])
+        stats = {
+            'requests': len(latencies),
+            'errors': sum(user.errors[name] for user in users),
+            'rps': round(len(latencies) / seconds, 1),
+        }
+        for pct in PERCENTILES:
+            value = percentile(latencies, pct)
+            stats[f'p{pct}_ms'] = round(value * 1000, 1) if value is not None else None
+        endpoints[name] = stats
+
+    return {
+        'clients': clients,
+        'seconds': round(seconds, 1),
+        'endpoints': endpoints,
+        'total_rps': round(sum(e['requests'] for e in endpoints.values()) / seconds, 1),
+        'workers': worker_rss(server_pid) if server_pid else [],
+    }
+
+
+def print_results(results: Dict):
+    """Print the load test summary table"""
+    print(f"\n{results['clients']} clients for {results['seconds']}s: {results['total_rps']} req/s")
+    print(f"\n{'Endpoint':<12} {'Requests':>9} {'Errors':>7} {'Req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    print("-" * 66)
+    for name, stats in results['endpoints'].items():
+        cells = [stats[f'p{pct}_ms'] for pct in PERCENTILES]
+        print(f"{name:<12} {stats['requests']:>9} {stats['errors']:>7} {stats['rps']:>8} "
+              + " ".join(f"{'-' if c is None else c:>8}" for c in cells))
+    if results['workers']:
+        print(f"\n{'PID':<8} {'Role':<11} {'RSS MB':>8} {'Peak MB':>8}")
+        for worker in results['workers']:
+            print(f"{worker['pid']:<8} {worker['role']:<11} {worker['rss_kb'] / 1024:>8.1f} "
+                  f"{worker['peak_kb'] / 1024:>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the Medicare Stars API")
+    parser.add_argument('--workers', type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument('--clients', type=int, default=8, help="Concurrent simulated users")
+    parser.add_argument('--duration', type=float, default=30.0, help="Seconds to run")
+    parser.add_argument('--mix', help="e.g. contract=6,whatif=3,contracts=1")
+    parser.add_argument('--think', type=float, default=0.0, help="Mean think time between actions (s)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--url', help="Test an already running server instead of starting one")
+    parser.add_argument('--json', help="Also write the results to this file")
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix) if args.mix else DEFAULT_MIX
+    server = None
+    if args.url:
+        base_url = args.url.rstrip('/')
+    else:
+        print(f"Starting api.py with {args.workers} worker(s) on port {args.port}...")
+        server = start_server(args.workers, args.port)
+        base_url = f'http://127.0.0.1:{args.port}'
+        print("✓ Server ready")
+
+    try:
+        results = run_load(base_url, clients=args.clients, duration=args.duration, mix=mix,
+                           seed=args.seed, think_time=args.think,
+                           server_pid=server.pid if server else None)
+    finally:
+        if server is not None:
+            stop_server(server)
+
+    print_results(results)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✓ Wrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -15,7 +15,6 @@ class MeasureConfig:
     is_inverse: bool  # True if lower values = better
     domain: str       # 'HD1', 'HD2', etc.
     part_type: str    # 'C' or 'D'
-    weight: float = 1.0  # Measure weight (1x, 1.5x, or 3x typically)
 
 
 # All 45 measure configurations
@@ -34,52 +33,52 @@ MEASURE_CONFIGS: Dict[str, MeasureConfig] = {
     'C09': MeasureConfig('C09', 'Care for Older Adults – Pain Assessment', 'PERCENTAGE', False, 'HD2', 'C'),
     'C10': MeasureConfig('C10', 'Osteoporosis Management in Women who had a Fracture', 'PERCENTAGE', False, 'HD2', 'C'),
     'C11': MeasureConfig('C11', 'Diabetes Care – Eye Exam', 'PERCENTAGE', False, 'HD2', 'C'),
-    'C12': MeasureConfig('C12', 'Diabetes Care – Blood Sugar Controlled', 'PERCENTAGE', False, 'HD2', 'C', weight=3.0),
+    'C12': MeasureConfig('C12', 'Diabetes Care – Blood Sugar Controlled', 'PERCENTAGE', False, 'HD2', 'C'),
     'C13': MeasureConfig('C13', 'Kidney Health Evaluation for Patients with Diabetes', 'PERCENTAGE', False, 'HD2', 'C'),
-    'C14': MeasureConfig('C14', 'Controlling High Blood Pressure', 'PERCENTAGE', False, 'HD2', 'C', weight=3.0),
+    'C14': MeasureConfig('C14', 'Controlling High Blood Pressure', 'PERCENTAGE', False, 'HD2', 'C'),
     'C15': MeasureConfig('C15', 'Reducing the Risk of Falling', 'PERCENTAGE', False, 'HD2', 'C'),
     'C16': MeasureConfig('C16', 'Improving Bladder Control', 'PERCENTAGE', False, 'HD2', 'C'),
     'C17': MeasureConfig('C17', 'Medication Reconciliation Post-Discharge', 'PERCENTAGE', False, 'HD2', 'C'),
-    'C18': MeasureConfig('C18', 'Plan All-Cause Readmissions', 'PERCENTAGE', True, 'HD2', 'C', weight=3.0),  # INVERSE!
+    'C18': MeasureConfig('C18', 'Plan All-Cause Readmissions', 'PERCENTAGE', True, 'HD2', 'C'),  # INVERSE!
     'C19': MeasureConfig('C19', 'Statin Therapy for Patients with Cardiovascular Disease', 'PERCENTAGE', False, 'HD2', 'C'),
     'C20': MeasureConfig('C20', 'Transitions of Care', 'PERCENTAGE', False, 'HD2', 'C'),
     'C21': MeasureConfig('C21', 'Follow-up after Emergency Department Visit for People with Multiple High-Risk Chronic Conditions', 'PERCENTAGE', False, 'HD2', 'C'),
     
     # Part C - HD3: Member Experience
-    'C22': MeasureConfig('C22', 'Getting Needed Care', 'INTEGER', False, 'HD3', 'C', weight=2.0),
-    'C23': MeasureConfig('C23', 'Getting Appointments and Care Quickly', 'INTEGER', False, 'HD3', 'C', weight=2.0),
-    'C24': MeasureConfig('C24', 'Customer Service', 'INTEGER', False, 'HD3', 'C', weight=2.0),
-    'C25': MeasureConfig('C25', 'Rating of Health Care Quality', 'INTEGER', False, 'HD3', 'C', weight=2.0),
-    'C26': MeasureConfig('C26', 'Rating of Health Plan', 'INTEGER', False, 'HD3', 'C', weight=2.0),
-    'C27': MeasureConfig('C27', 'Care Coordination', 'INTEGER', False, 'HD3', 'C', weight=2.0),
+    'C22': MeasureConfig('C22', 'Getting Needed Care', 'INTEGER', False, 'HD3', 'C'),
+    'C23': MeasureConfig('C23', 'Getting Appointments and Care Quickly', 'INTEGER', False, 'HD3', 'C'),
+    'C24': MeasureConfig('C24', 'Customer Service', 'INTEGER', False, 'HD3', 'C'),
+    'C25': MeasureConfig('C25', 'Rating of Health Care Quality', 'INTEGER', False, 'HD3', 'C'),
+    'C26': MeasureConfig('C26', 'Rating of Health Plan', 'INTEGER', False, 'HD3', 'C'),
+    'C27': MeasureConfig('C27', 'Care Coordination', 'INTEGER', False, 'HD3', 'C'),
     
     # Part C - HD4: Complaints and Changes
-    'C28': MeasureConfig('C28', 'Complaints about the Health Plan', 'DECIMAL', True, 'HD4', 'C', weight=2.0),  # INVERSE!
-    'C29': MeasureConfig('C29', 'Members Choosing to Leave the Plan', 'PERCENTAGE', True, 'HD4', 'C', weight=2.0),  # INVERSE!
-    'C30': MeasureConfig('C30', 'Health Plan Quality Improvement', 'NO_NUMERIC', False, 'HD4', 'C', weight=5.0),
+    'C28': MeasureConfig('C28', 'Complaints about the Health Plan', 'DECIMAL', True, 'HD4', 'C'),  # INVERSE!
+    'C29': MeasureConfig('C29', 'Members Choosing to Leave the Plan', 'PERCENTAGE', True, 'HD4', 'C'),  # INVERSE!
+    'C30': MeasureConfig('C30', 'Health Plan Quality Improvement', 'NO_NUMERIC', False, 'HD4', 'C'),
     
     # Part C - HD5: Customer Service
-    'C31': MeasureConfig('C31', 'Plan Makes Timely Decisions about Appeals', 'PERCENTAGE', False, 'HD5', 'C', weight=2.0),
-    'C32': MeasureConfig('C32', 'Reviewing Appeals Decisions', 'PERCENTAGE', False, 'HD5', 'C', weight=2.0),
-    'C33': MeasureConfig('C33', 'Call Center – Foreign Language Interpreter and TTY Availability', 'PERCENTAGE', False, 'HD5', 'C', weight=2.0),
+    'C31': MeasureConfig('C31', 'Plan Makes Timely Decisions about Appeals', 'PERCENTAGE', False, 'HD5', 'C'),
+    'C32': MeasureConfig('C32', 'Reviewing Appeals Decisions', 'PERCENTAGE', False, 'HD5', 'C'),
+    'C33': MeasureConfig('C33', 'Call Center – Foreign Language Interpreter and TTY Availability', 'PERCENTAGE', False, 'HD5', 'C'),
     
     # Part D - DD1: Customer Service
-    'D01': MeasureConfig('D01', 'Call Center – Foreign Language Interpreter and TTY Availability', 'PERCENTAGE', False, 'DD1', 'D', weight=2.0),
+    'D01': MeasureConfig('D01', 'Call Center – Foreign Language Interpreter and TTY Availability', 'PERCENTAGE', False, 'DD1', 'D'),
     
     # Part D - DD2: Complaints and Changes
-    'D02': MeasureConfig('D02', 'Complaints about the Drug Plan', 'DECIMAL', True, 'DD2', 'D', weight=0),  # INVERSE! Weight=0 to avoid double counting with C28
-    'D03': MeasureConfig('D03', 'Members Choosing to Leave the Plan', 'PERCENTAGE', True, 'DD2', 'D', weight=0),  # INVERSE! Weight=0 to avoid double counting with C29
-    'D04': MeasureConfig('D04', 'Drug Plan Quality Improvement', 'NO_NUMERIC', False, 'DD2', 'D', weight=5.0),
+    'D02': MeasureConfig('D02', 'Complaints about the Drug Plan', 'DECIMAL', True, 'DD2', 'D'),  # INVERSE!
+    'D03': MeasureConfig('D03', 'Members Choosing to Leave the Plan', 'PERCENTAGE', True, 'DD2', 'D'),  # INVERSE!
+    'D04': MeasureConfig('D04', 'Drug Plan Quality Improvement', 'NO_NUMERIC', False, 'DD2', 'D'),
     
     # Part D - DD3: Member Experience
-    'D05': MeasureConfig('D05', 'Rating of Drug Plan', 'INTEGER', False, 'DD3', 'D', weight=2.0),
-    'D06': MeasureConfig('D06', 'Getting Needed Prescription Drugs', 'INTEGER', False, 'DD3', 'D', weight=2.0),
+    'D05': MeasureConfig('D05', 'Rating of Drug Plan', 'INTEGER', False, 'DD3', 'D'),
+    'D06': MeasureConfig('D06', 'Getting Needed Prescription Drugs', 'INTEGER', False, 'DD3', 'D'),
     
     # Part D - DD4: Drug Safety and Accuracy
     'D07': MeasureConfig('D07', 'MPF Price Accuracy', 'INTEGER', False, 'DD4', 'D'),
-    'D08': MeasureConfig('D08', 'Medication Adherence for Diabetes Medications', 'PERCENTAGE', False, 'DD4', 'D', weight=3.0),
-    'D09': MeasureConfig('D09', 'Medication Adherence for Hypertension (RAS antagonists)', 'PERCENTAGE', False, 'DD4', 'D', weight=3.0),
-    'D10': MeasureConfig('D10', 'Medication Adherence for Cholesterol (Statins)', 'PERCENTAGE', False, 'DD4', 'D', weight=3.0),
+    'D08': MeasureConfig('D08', 'Medication Adherence for Diabetes Medications', 'PERCENTAGE', False, 'DD4', 'D'),
+    'D09': MeasureConfig('D09', 'Medication Adherence for Hypertension (RAS antagonists)', 'PERCENTAGE', False, 'DD4', 'D'),
+    'D10': MeasureConfig('D10', 'Medication Adherence for Cholesterol (Statins)', 'PERCENTAGE', False, 'DD4', 'D'),
     'D11': MeasureConfig('D11', 'MTM Program Completion Rate for CMR', 'PERCENTAGE', False, 'DD4', 'D'),
     'D12': MeasureConfig('D12', 'Statin Use in Persons with Diabetes (SUPD)', 'PERCENTAGE', False, 'DD4', 'D'),
 }
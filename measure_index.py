@@ -0,0 +1,420 @@
+"""
+Columnar measure index
+Precomputes contract x measure arrays from the Measure Data and Measure Stars tables
+so cross-contract queries never scan DataFrames
+"""
+
+import math
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+from threshold_parser import parse_threshold_band, format_band_for_display
+from measure_config import MEASURE_CONFIGS, get_measure_config
+
+
+# Special value categories in code order (code 0 = not special)
+SPECIAL_CATEGORIES = [
+    'INSUFFICIENT_SAMPLE',
+    'HOLD_HARMLESS',
+    'INSUFFICIENT_DATA',
+    'NOT_REQUIRED',
+    'MISSING_DATA',
+    'STAR_ONLY',
+    'DATA_QUALITY_ISSUE',
+    'NOT_OFFERED',
+    'UNKNOWN',
+]
+SPECIAL_CODES = {category: i + 1 for i, category in enumerate(SPECIAL_CATEGORIES)}
+
+# Histogram bins allowed in measure_distribution
+MAX_HISTOGRAM_BINS = 200
+
+# Part D threshold sets (index 0 is also used for every Part C measure)
+PART_D_SETS = ['MA-PD', 'PDP']
+
+
+def _to_json_float(value) -> Optional[float]:
+    """Convert numpy scalar to float, mapping NaN/inf to None"""
+    value = float(value)
+    return value if math.isfinite(value) else None
+
+
+class CompiledCutPoints:
+    """
+    Cut point bands for every measure as typed arrays
+
+    Arrays are shaped (set, star - 1, measure) where set 0 is MA-PD (and
+    Part C) and set 1 is PDP. Missing bounds are NaN.
+    """
+
+    def __init__(self, codes: List[str]):
+        self.codes = list(codes)
+        shape = (len(PART_D_SETS), 5, len(self.codes))
+        self.lower = np.full(shape, np.nan)
+        self.upper = np.full(shape, np.nan)
+        self.lower_inclusive = np.zeros(shape, dtype=bool)
+        self.upper_inclusive = np.zeros(shape, dtype=bool)
+        self.band_text = np.full(shape, None, dtype=object)
+
+    @classmethod
+    def from_frames(cls, df_cutpoints_c, df_cutpoints_d, codes: List[str]) -> 'CompiledCutPoints':
+        """Compile the Part C / Part D cut point tables (same layout ContractReportGenerator reads)"""
+        compiled = cls(codes)
+
+        for m, code in enumerate(compiled.codes):
+            config = get_measure_config(code)
+
+            if config.part_type == 'C':
+                df, first_col = df_cutpoints_c, 1
+                set_rows = {0: 3, 1: 3}  # Part C thresholds apply to both sets
+            else:
+                df, first_col = df_cutpoints_d, 2
+                set_rows = {0: 3, 1: 8}
+
+            col_idx = None
+            for i, col in enumerate(df.iloc[1, first_col:]):
+                col_str = str(col).strip()
+                if config.code in col_str or config.name in col_str:
+                    col_idx = first_col + i
+                    break
+            if col_idx is None:
+                continue
+
+            for set_idx, first_row in set_rows.items():
+                for star in range(1, 6):
+                    row_idx = first_row + (star - 1)
+                    if row_idx >= len(df):
+                        continue
+                    try:
+                        band = parse_threshold_band(str(df.iloc[row_idx, col_idx]))
+                    except ValueError:
+                        continue
+                    compiled._set_band(set_idx, star, m, band, config.format_type)
+
+        return compiled
+
+    def _set_band(self, set_idx: int, star: int, m: int, band, format_type: str):
+        """Store one parsed ThresholdBand"""
+        lower, upper, lower_op, upper_op = band
+        s = star - 1
+        if lower is not None:
+            self.lower[set_idx, s, m] = lower
+            self.lower_inclusive[set_idx, s, m] = lower_op in ('>=', '=')
+        if upper is not None:
+            self.upper[set_idx, s, m] = upper
+            self.upper_inclusive[set_idx, s, m] = upper_op in ('<=', '=')
+        self.band_text[set_idx, s, m] = format_band_for_display(band, format_type)
+
+    def in_band(self, values: np.ndarray, star: int, set_idx) -> np.ndarray:
+        """
+        Vectorised band membership for one star level
+
+        Args:
+            values: (contracts, measures) float array
+            star: Star level 1-5
+            set_idx: Scalar set index or (contracts,) int array
+
+        Returns:
+            Boolean array shaped like values (False where value is NaN)
+        """
+        s = star - 1
+        set_idx = np.asarray(set_idx)
+        lower = self.lower[set_idx, s]
+        upper = self.upper[set_idx, s]
+        lower_inc = self.lower_inclusive[set_idx, s]
+        upper_inc = self.upper_inclusive[set_idx, s]
+
+        with np.errstate(invalid='ignore'):
+            lower_ok = np.isnan(lower) | (values > lower) | (lower_inc & (values == lower))
+            upper_ok = np.isnan(upper) | (values < upper) | (upper_inc & (values == upper))
+        has_band = ~(np.isnan(lower) & np.isnan(upper))
+        return lower_ok & upper_ok & has_band & ~np.isnan(values)
+
+    def assign_stars(self, values: np.ndarray, set_idx) -> np.ndarray:
+        """
+        Assign stars to every value at once (0 where no band matches)
+
+        Checks 5 stars down to 1 like calculate_star_from_performance, but honours
+        each band's operators so exact-value bands (e.g. "100%") resolve correctly.
+        """
+        stars = np.zeros(values.shape, dtype=np.int8)
+        for star in range(5, 0, -1):
+            stars[(stars == 0) & self.in_band(values, star, set_idx)] = star
+        return stars
+
+    def entry_edges(self, is_inverse: np.ndarray, set_idx) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Threshold to enter stars 2-5 (lower bound, or upper bound for inverse measures)
+
+        Args:
+            is_inverse: (measures,) bool array
+            set_idx: Scalar set index or int array of set indices
+
+        Returns:
+            (edges, inclusive) shaped set_idx.shape + (measures, 4), NaN where a band is missing
+        """
+        set_idx = np.asarray(set_idx, dtype=np.intp)
+        axes = tuple(range(set_idx.ndim)) + (set_idx.ndim + 1, set_idx.ndim)
+        inverse = np.asarray(is_inverse)[:, None]
+        lower = self.lower[set_idx][..., 1:, :].transpose(axes)
+        upper = self.upper[set_idx][..., 1:, :].transpose(axes)
+        lower_inc = self.lower_inclusive[set_idx][..., 1:, :].transpose(axes)
+        upper_inc = self.upper_inclusive[set_idx][..., 1:, :].transpose(axes)
+        return np.where(inverse, upper, lower), np.where(inverse, upper_inc, lower_inc)
+
+    @staticmethod
+    def stars_from_edges(values: np.ndarray, edges: np.ndarray, inclusive: np.ndarray,
+                         is_inverse: np.ndarray) -> np.ndarray:
+        """
+        Stars from entry thresholds: 1 + the number of star 2-5 edges a value passes
+
+        Args:
+            values: (..., measures) float array
+            edges: values.shape + (4,) entry thresholds (broadcastable)
+            inclusive: Whether meeting an edge exactly passes it (same shape as edges)
+            is_inverse: (measures,) bool array
+
+        Returns:
+            int8 array shaped like values (1 for NaN values)
+        """
+        v = values[..., None]
+        inverse = np.asarray(is_inverse)[:, None]
+        with np.errstate(invalid='ignore'):
+            passes = np.where(inverse, v < edges, v > edges) | (inclusive & (v == edges))
+        return (1 + passes.sum(axis=-1)).astype(np.int8)
+
+    def band_edges(self, stars: np.ndarray, set_idx) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Lower and upper edges of each cell's current star band
+
+        Args:
+            stars: (contracts, measures) int array, 0 where not rated
+            set_idx: (contracts,) int array
+
+        Returns:
+            (lower, upper) float arrays shaped like stars, NaN for open edges or no rating
+        """
+        cols = np.arange(stars.shape[1])[None, :]
+        sets = np.asarray(set_idx, dtype=np.intp)[:, None]
+        star_idx = np.clip(stars.astype(np.intp) - 1, 0, 4)
+        rated = stars > 0
+        lower = np.where(rated, self.lower[sets, star_idx, cols], np.nan)
+        upper = np.where(rated, self.upper[sets, star_idx, cols], np.nan)
+        return lower, upper
+
+    def band_inclusive(self, stars: np.ndarray, set_idx) -> Tuple[np.ndarray, np.ndarray]:
+        """Whether each cell's band edges are inclusive (same shapes and rules as band_edges)"""
+        cols = np.arange(stars.shape[1])[None, :]
+        sets = np.asarray(set_idx, dtype=np.intp)[:, None]
+        star_idx = np.clip(stars.astype(np.intp) - 1, 0, 4)
+        rated = stars > 0
+        lower = rated & self.lower_inclusive[sets, star_idx, cols]
+        upper = rated & self.upper_inclusive[sets, star_idx, cols]
+        return lower, upper
+
+    def assign_star(self, m: int, value: float, set_idx: int = 0) -> Optional[int]:
+        """Scalar star lookup for one measure column (same rules as assign_stars)"""
+        if value is None or math.isnan(value):
+            return None
+        for star in range(5, 0, -1):
+            s = star - 1
+            lower = self.lower[set_idx, s, m]
+            upper = self.upper[set_idx, s, m]
+            if math.isnan(lower) and math.isnan(upper):
+                continue
+            if not math.isnan(lower):
+                if value < lower or (value == lower and not self.lower_inclusive[set_idx, s, m]):
+                    continue
+            if not math.isnan(upper):
+                if value > upper or (value == upper and not self.upper_inclusive[set_idx, s, m]):
+                    continue
+            return star
+        return None
+
+    def bands(self, m: int, set_idx: int = 0) -> List[Dict]:
+        """Band list (1-5 stars) for one measure column"""
+        result = []
+        for star in range(1, 6):
+            s = star - 1
+            result.append({
+                'star': star,
+                'band': self.band_text[set_idx, s, m],
+                'lower': _to_json_float(self.lower[set_idx, s, m]),
+                'upper': _to_json_float(self.upper[set_idx, s, m]),
+            })
+        return result
+
+
+class MeasureIndex:
+    """
+    Contract x measure arrays built once from a loaded ContractReportGenerator
+
+    Attributes:
+        contract_ids: Contract IDs in Measure Data row order
+        codes: Measure codes in column order
+        values: float64 (contracts, measures), NaN where not numeric
+        stars: int8 (contracts, measures), 0 where not rated
+        special: int8 (contracts, measures), SPECIAL_CODES value or 0
+        part_d_set: int8 (contracts,), index into PART_D_SETS
+        cut_points: CompiledCutPoints for the same measure columns
+    """
+
+    def __init__(self, generator):
+        data = generator.measure_data_table
+        stars = generator.measure_stars_table
+
+        # Measure columns we know about, in Measure Data order
+        self.codes: List[str] = list(data.measure_codes)
+        self.col_of: Dict[str, int] = {code: m for m, code in enumerate(self.codes)}
+
+        self.contract_ids = data.contract_ids
+        self.row_of: Dict[str, int] = {cid: r for r, cid in enumerate(self.contract_ids)}
+        self.org_type = data.metadata['org_type'].astype(str).to_numpy(dtype=object)
+        self.marketing_name = data.metadata['marketing_name'].astype(str).to_numpy(dtype=object)
+        self.parent_org = data.metadata['parent_org'].astype(str).to_numpy(dtype=object)
+        self.part_d_set = np.array([
+            PART_D_SETS.index(generator.determine_part_d_threshold_set(cid, org))
+            for cid, org in zip(self.contract_ids, self.org_type)
+        ], dtype=np.int8)
+
+        n, m_count = len(self.contract_ids), len(self.codes)
+
+        # float32 storage upcast and rounded back to the reported decimals, so
+        # values compare exactly against the float64 cut points
+        self.values = np.round(data.values.astype(np.float64), 6)
+        self.special = data.special
+
+        # Star rows and columns may be ordered differently; align them by contract ID and code
+        self.stars = np.zeros((n, m_count), dtype=np.int8)
+        star_row_of = {cid: r for r, cid in enumerate(stars.contract_ids)}
+        star_col_of = {code: m for m, code in enumerate(stars.measure_codes)}
+        rows = np.array([star_row_of.get(cid, -1) for cid in self.contract_ids])
+        cols = np.array([star_col_of.get(code, -1) for code in self.codes])
+        found = (rows >= 0)[:, None] & (cols >= 0)[None, :]
+        self.stars[found] = stars.values[np.ix_(rows, cols)][found]
+
+        self.is_inverse = np.array([MEASURE_CONFIGS[c].is_inverse for c in self.codes], dtype=bool)
+
+        self.cut_points = CompiledCutPoints.from_frames(
+            generator.df_cutpoints_c, generator.df_cutpoints_d, self.codes
+        )
+
+        # Sorted numeric values per measure for percentile lookups
+        self._sorted_values = [np.sort(col[~np.isnan(col)]) for col in self.values.T]
+
+        print(f"✓ Built measure index: {n} contracts x {m_count} measures")
+
+    def get_column(self, measure_code: str) -> int:
+        """Column index for a measure code"""
+        measure_code = str(measure_code).strip().upper()
+        if measure_code not in self.col_of:
+            raise ValueError(f"Unknown measure code: {measure_code}")
+        return self.col_of[measure_code]
+
+    def measure_spread(self) -> np.ndarray:
+        """Standard deviation of each measure across contracts (NaN if fewer than 2 values or constant)"""
+        spread = np.array([col.std() if len(col) > 1 else np.nan for col in self._sorted_values])
+        spread[~(spread > 0)] = np.nan
+        return spread
+
+    def percentile_of(self, m: int, value: float) -> Optional[float]:
+        """Share of numeric values strictly below value (0-100)"""
+        sorted_values = self._sorted_values[m]
+        if np.isnan(value) or len(sorted_values) == 0:
+            return None
+        below = np.searchsorted(sorted_values, value, side='left')
+        return round(100.0 * below / len(sorted_values), 2)
+
+    def measure_distribution(self, measure_code: str, bins: int = 20) -> Dict:
+        """
+        Full cross-contract distribution for one measure
+
+        Returns:
+            Dictionary with per-contract values, star counts, special-status
+            counts, histogram and cut point positions
+
+        Raises:
+            ValueError: For unknown measures or bins outside 1..MAX_HISTOGRAM_BINS
+        """
+        m = self.get_column(measure_code)
+        bins = int(bins)
+        if not 1 <= bins <= MAX_HISTOGRAM_BINS:
+            raise ValueError(f"bins must be between 1 and {MAX_HISTOGRAM_BINS}, got {bins}")
+        config = MEASURE_CONFIGS[self.codes[m]]
+        values = self.values[:, m]
+        stars = self.stars[:, m]
+        special = self.special[:, m]
+        numeric_mask = ~np.isnan(values)
+        numeric = values[numeric_mask]
+
+        order = np.argsort(values[numeric_mask], kind='stable')
+        numeric_rows = np.flatnonzero(numeric_mask)[order]
+        contract_values = [
+            {
+                'contract_id': self.contract_ids[r],
+                'value': float(values[r]),
+                'star': int(stars[r]) or None,
+                'part_d_set': PART_D_SETS[self.part_d_set[r]],
+            }
+            for r in numeric_rows
+        ]
+
+        star_counts = np.bincount(stars, minlength=6)
+        special_counts = np.bincount(special, minlength=len(SPECIAL_CATEGORIES) + 1)
+
+        stats = None
+        histogram = {'edges': [], 'counts': []}
+        if len(numeric):
+            p25, median, p75 = np.percentile(numeric, [25, 50, 75])
+            stats = {
+                'min': float(numeric.min()),
+                'max': float(numeric.max()),
+                'mean': round(float(numeric.mean()), 4),
+                'std': round(float(numeric.std()), 4),
+                'p25': float(p25),
+                'median': float(median),
+                'p75': float(p75),
+            }
+            counts, edges = np.histogram(numeric, bins=bins)
+            histogram = {'edges': [float(e) for e in edges], 'counts': counts.tolist()}
+
+        # Part C measures share one cut point table; Part D has MA-PD and PDP
+        set_indices = [0] if config.part_type == 'C' else [0, 1]
+        cut_points = []
+        for set_idx in set_indices:
+            for band in self.cut_points.bands(m, set_idx):
+                for edge in ('lower', 'upper'):
+                    if band[edge] is not None:
+                        band[f'{edge}_percentile'] = self.percentile_of(m, band[edge])
+                        band[f'{edge}_bin'] = (
+                            int(np.clip(np.searchsorted(histogram['edges'], band[edge], side='right') - 1,
+                                        0, len(histogram['counts']) - 1))
+                            if histogram['counts'] else None
+                        )
+                band['set'] = 'Part C' if config.part_type == 'C' else PART_D_SETS[set_idx]
+                cut_points.append(band)
+
+        return {
+            'code': config.code,
+            'name': config.name,
+            'format_type': config.format_type,
+            'is_inverse': config.is_inverse,
+            'part_type': config.part_type,
+            'domain': config.domain,
+            'counts': {
+                'contracts': len(values),
+                'numeric': int(numeric_mask.sum()),
+                'special': int((special > 0).sum()),
+                'rated': int((stars > 0).sum()),
+            },
+            'stats': stats,
+            'star_counts': {str(star): int(star_counts[star]) for star in range(1, 6)},
+            'special_counts': {
+                category: int(special_counts[i + 1])
+                for i, category in enumerate(SPECIAL_CATEGORIES)
+                if special_counts[i + 1]
+            },
+            'histogram': histogram,
+            'cut_points': cut_points,
+            'values': contract_values,
+        }
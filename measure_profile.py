@@ -0,0 +1,248 @@
+"""
+Measure data profiling
+Per-measure formats, special values, distributions and star consistency, cached per dataset hash
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from contract_report import (
+    part_d_threshold_set,
+    MEASURE_DATA_PATH, MEASURE_STARS_PATH, PART_C_CUT_POINTS_PATH, PART_D_CUT_POINTS_PATH,
+)
+from ingest import detect_header_layout, read_chunks, load_measure_table
+from measure_config import MEASURE_CONFIGS
+from measure_index import CompiledCutPoints, PART_D_SETS
+
+# Profiles are written here as <dataset hash>.json
+PROFILE_CACHE_DIR = '.profile_cache'
+
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+# Contracts listed per measure when the published star disagrees with the cut points
+MAX_MISMATCH_EXAMPLES = 5
+
+_NUMERIC_RE = r'^-?\d+\.?\d*%?$'
+
+DEFAULT_PATHS = {
+    'measure_data': MEASURE_DATA_PATH,
+    'measure_stars': MEASURE_STARS_PATH,
+    'part_c_cut_points': PART_C_CUT_POINTS_PATH,
+    'part_d_cut_points': PART_D_CUT_POINTS_PATH,
+}
+
+_memory_cache: Dict[str, Dict] = {}
+# get_profile runs in worker threads; one profile is built (and its cache file written) at a time
+_memory_lock = threading.Lock()
+
+
+def dataset_hash(paths: Dict[str, str]) -> str:
+    """SHA-256 over the profiled files' bytes (in key order)"""
+    digest = hashlib.sha256()
+    for key in sorted(paths):
+        with open(paths[key], 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def detect_format(numeric: int, percent: int, decimal: int) -> str:
+    """Format from counts of numeric, percent-suffixed and decimal-point cells"""
+    if numeric == 0:
+        return 'NO_NUMERIC'
+    if percent:
+        return 'PERCENTAGE'
+    if decimal:
+        return 'DECIMAL'
+    return 'INTEGER'
+
+
+def _scan_cells(path: str) -> Dict[str, Dict]:
+    """One chunked pass over raw Measure Data cells: format counts and special values per measure"""
+    layout = detect_header_layout(path)
+    columns = {col: code for col, code in layout.measure_codes.items() if code in MEASURE_CONFIGS}
+    scan = {code: {'cells': 0, 'numeric': 0, 'percent': 0, 'decimal': 0, 'special': Counter()}
+            for code in columns.values()}
+
+    for chunk in read_chunks(path, layout):
+        for col, code in columns.items():
+            if col not in chunk:
+                continue
+            cells = chunk[col].str.strip()
+            numeric = cells.str.match(_NUMERIC_RE)
+            stats = scan[code]
+            stats['cells'] += len(cells)
+            stats['numeric'] += int(numeric.sum())
+            stats['percent'] += int((numeric & cells.str.endswith('%')).sum())
+            stats['decimal'] += int((numeric & cells.str.contains('.', regex=False)).sum())
+            stats['special'].update(cells[~numeric].replace('', '(blank)').value_counts().to_dict())
+    return scan
+
+
+def _json_float(value, digits: int = 4) -> Optional[float]:
+    value = float(value)
+    return round(value, digits) if np.isfinite(value) else None
+
+
+def profile_measures(paths: Optional[Dict[str, str]] = None) -> Dict:
+    """
+    Profile every configured measure in a Measure Data / Measure Stars release
+
+    star_check compares each published star with the star the cut points give
+    the displayed value. Some disagreement is expected (case-mix adjustment,
+    CAHPS significance testing); a jump between releases points at a parsing
+    or cut point problem.
+
+    Args:
+        paths: DEFAULT_PATHS keys -> files (defaults to the tables contract_report loads)
+
+    Returns:
+        Dictionary with dataset_hash, seconds, summary and measures [{code, name,
+        configured_format, detected_format, format_matches, is_inverse, contracts,
+        numeric_count, special_count, special_values, stats, star_counts,
+        star_check}]
+    """
+    paths = dict(DEFAULT_PATHS, **(paths or {}))
+    start = time.perf_counter()
+
+    scan = _scan_cells(paths['measure_data'])
+    data = load_measure_table(paths['measure_data'], 'values')
+    stars_table = load_measure_table(paths['measure_stars'], 'stars')
+    codes = list(data.measure_codes)
+
+    # Values as MeasureIndex stores them; stars aligned by contract ID and code
+    values = np.round(data.values.astype(np.float64), 6)
+    stars = (pd.DataFrame(stars_table.values, index=stars_table.contract_ids, columns=stars_table.measure_codes)
+             .reindex(index=data.contract_ids, columns=codes, fill_value=0)
+             .to_numpy(dtype=np.int8))
+
+    org_types = data.metadata['org_type'].astype(str).to_numpy(dtype=object)
+    set_idx = np.array([PART_D_SETS.index(part_d_threshold_set(cid, org))
+                        for cid, org in zip(data.contract_ids, org_types)], dtype=np.int8)
+    cut_points = CompiledCutPoints.from_frames(
+        pd.read_csv(paths['part_c_cut_points']), pd.read_csv(paths['part_d_cut_points']), codes
+    )
+    expected = cut_points.assign_stars(values, set_idx)
+    checked = (stars > 0) & (expected > 0)
+    mismatch = checked & (stars != expected)
+
+    finite = ~np.isnan(values)
+
+    measures: List[Dict] = []
+    for m, code in enumerate(codes):
+        config = MEASURE_CONFIGS[code]
+        cells = scan.get(code, {'cells': 0, 'numeric': 0, 'percent': 0, 'decimal': 0, 'special': Counter()})
+        detected = detect_format(cells['numeric'], cells['percent'], cells['decimal'])
+        column = values[finite[:, m], m]
+        quantiles = np.quantile(column, QUANTILES) if len(column) else np.full(len(QUANTILES), np.nan)
+        star_counts = np.bincount(stars[:, m].clip(0, 5), minlength=6)
+        mismatch_rows = np.flatnonzero(mismatch[:, m])
+
+        measures.append({
+            'code': code,
+            'name': config.name,
+            'configured_format': config.format_type,
+            'detected_format': detected,
+            'format_matches': detected in (config.format_type, 'NO_NUMERIC'),
+            'is_inverse': config.is_inverse,
+            'contracts': cells['cells'],
+            'numeric_count': cells['numeric'],
+            'special_count': cells['cells'] - cells['numeric'],
+            'special_values': dict(cells['special'].most_common()),
+            'stats': {
+                'min': _json_float(column.min()) if len(column) else None,
+                'max': _json_float(column.max()) if len(column) else None,
+                'mean': _json_float(column.mean()) if len(column) else None,
+                **{f"p{int(q * 100):02d}": _json_float(quantiles[i]) for i, q in enumerate(QUANTILES)},
+            },
+            'star_counts': {str(star): int(star_counts[star]) for star in range(1, 6)},
+            'star_check': {
+                'checked': int(checked[:, m].sum()),
+                'mismatches': int(len(mismatch_rows)),
+                'examples': [
+                    {'contract_id': data.contract_ids[r], 'value': _json_float(values[r, m]),
+                     'published_star': int(stars[r, m]), 'cut_point_star': int(expected[r, m])}
+                    for r in mismatch_rows[:MAX_MISMATCH_EXAMPLES]
+                ],
+            },
+        })
+
+    return {
+        'dataset_hash': dataset_hash(paths),
+        'files': {key: os.path.basename(path) for key, path in paths.items()},
+        'seconds': round(time.perf_counter() - start, 3),
+        'summary': {
+            'contracts': len(data.contract_ids),
+            'measures': len(codes),
+            'format_mismatches': [p['code'] for p in measures if not p['format_matches']],
+            'mostly_special': [p['code'] for p in measures if p['special_count'] > p['numeric_count']],
+            'star_checked': int(checked.sum()),
+            'star_mismatches': int(mismatch.sum()),
+        },
+        'measures': measures,
+    }
+
+
+def get_profile(paths: Optional[Dict[str, str]] = None, cache_dir: Optional[str] = PROFILE_CACHE_DIR) -> Dict:
+    """
+    Profile for a dataset, from memory or cache_dir when its hash was seen before
+
+    Args:
+        paths: DEFAULT_PATHS keys -> files
+        cache_dir: Directory for <hash>.json files (None keeps the cache in memory only)
+
+    Returns:
+        The profile_measures result
+    """
+    paths = dict(DEFAULT_PATHS, **(paths or {}))
+    key = dataset_hash(paths)
+    with _memory_lock:
+        if key in _memory_cache:
+            return _memory_cache[key]
+
+        cache_path = os.path.join(cache_dir, f"{key}.json") if cache_dir else None
+        if cache_path and os.path.exists(cache_path):
+            with open(cache_path, encoding='utf-8') as f:
+                profile = json.load(f)
+        else:
+            profile = profile_measures(paths)
+            if cache_path:
+                os.makedirs(cache_dir, exist_ok=True)
+                with open(cache_path, 'w', encoding='utf-8') as f:
+                    json.dump(profile, f)
+
+        _memory_cache[key] = profile
+        return profile
+
+
+# Test cases
+if __name__ == "__main__":
+    print("Testing measure profile...")
+
+    assert detect_format(10, 10, 0) == 'PERCENTAGE'
+    assert detect_format(10, 0, 3) == 'DECIMAL'
+    assert detect_format(10, 0, 0) == 'INTEGER'
+    assert detect_format(0, 0, 0) == 'NO_NUMERIC'
+    print("✓ Format detection works")
+
+    profile = profile_measures()
+    print(f"✓ Profiled {profile['summary']['measures']} measures in {profile['seconds']}s")
+    assert profile['seconds'] < 1.0
+    assert not profile['summary']['format_mismatches'], profile['summary']['format_mismatches']
+    c01 = next(p for p in profile['measures'] if p['code'] == 'C01')
+    assert c01['numeric_count'] + c01['special_count'] == profile['summary']['contracts']
+    assert c01['stats']['min'] <= c01['stats']['p50'] <= c01['stats']['max']
+    print("✓ Formats match measure_config and stats are consistent")
+
+    assert get_profile(cache_dir=None) is get_profile(cache_dir=None)
+    print("✓ Profile is cached by dataset hash")
+
+    print("\n✅ All measure profile tests passed!")
@@ -0,0 +1,361 @@
+"""
+Memory accounting for loaded datasets
+Deep sizes per table, column, index and cache, object-dtype conversion hints, and tracemalloc top allocators
+"""
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from collections import deque
+from types import BuiltinFunctionType, FunctionType, MethodType, ModuleType
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Object columns with at most this share of distinct values are worth a 'category' dtype
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+
+# Frames kept per tracemalloc trace
+TRACE_FRAMES = 10
+
+_OPAQUE = (type, ModuleType, FunctionType, BuiltinFunctionType, MethodType)
+
+
+def process_memory() -> Dict[str, Optional[int]]:
+    """Resident and peak resident memory of this process in KB (None off Linux)"""
+    memory = {'rss_kb': None, 'peak_rss_kb': None}
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    memory['rss_kb'] = int(line.split()[1])
+                elif line.startswith('VmHWM:'):
+                    memory['peak_rss_kb'] = int(line.split()[1])
+    except OSError:
+        pass
+    return memory
+
+
+def _snapshot(container) -> list:
+    """
+    Copy of a container's items (key/value pairs for dicts)
+
+    deep_size runs in a worker thread while requests keep filling the caches
+    it walks, so containers are copied before they are iterated; a copy that
+    races with a resize is simply taken again.
+    """
+    while True:
+        try:
+            return list(container.items()) if isinstance(container, dict) else list(container)
+        except RuntimeError:
+            continue
+
+
+def deep_size(obj: Any, seen: Optional[set] = None) -> int:
+    """
+    Bytes reachable from obj, counting every object once
+
+    DataFrames and Series use pandas' deep memory_usage, numpy arrays their
+    buffer (plus elements for object arrays); containers and plain objects are
+    walked through their items and attributes. Classes, modules and functions
+    are not followed. Pass the same seen set to several calls to avoid counting
+    shared objects twice.
+    """
+    seen = set() if seen is None else seen
+    total = 0
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+
+        if isinstance(item, pd.DataFrame):
+            total += int(item.memory_usage(index=True, deep=True).sum())
+        elif isinstance(item, (pd.Series, pd.Index)):
+            total += int(item.memory_usage(deep=True))
+        elif isinstance(item, np.ndarray):
+            total += sys.getsizeof(item) if item.base is None else sys.getsizeof(item) + item.nbytes
+            if item.dtype == object:
+                stack.extend(item.ravel().tolist())
+        elif isinstance(item, _OPAQUE):
+            total += sys.getsizeof(item)
+        elif isinstance(item, dict):
+            total += sys.getsizeof(item)
+            for key, value in _snapshot(item):
+                stack.append(key)
+                stack.append(value)
+        elif isinstance(item, (list, tuple, set, frozenset, deque)):
+            total += sys.getsizeof(item)
+            stack.extend(_snapshot(item))
+        else:
+            total += sys.getsizeof(item)
+            if hasattr(item, '__dict__'):
+                stack.append(vars(item))
+            for slot in getattr(type(item), '__slots__', ()):
+                if hasattr(item, slot):
+                    stack.append(getattr(item, slot))
+    return total
+
+
+def _kind(value: Any) -> str:
+    if isinstance(value, pd.DataFrame):
+        return 'table'
+    if isinstance(value, np.ndarray):
+        return 'array'
+    if isinstance(value, (dict, list, set, deque)):
+        return 'cache'
+    return 'object'
+
+
+def column_suggestion(series: pd.Series) -> Optional[Dict]:
+    """Cheaper dtype for an object column, or None"""
+    if series.dtype != object or not len(series):
+        return None
+    current = int(series.memory_usage(index=False, deep=True))
+    non_null = series.dropna()
+    if len(non_null) and pd.to_numeric(non_null, errors='coerce').notna().all():
+        return {'suggested': 'float64', 'bytes': current, 'estimated_bytes': len(series) * 8}
+    if series.nunique(dropna=True) <= CATEGORY_MAX_UNIQUE_RATIO * len(series):
+        estimated = int(series.astype('category').memory_usage(index=False, deep=True))
+        return {'suggested': 'category', 'bytes': current, 'estimated_bytes': estimated}
+    return None
+
+
+def table_report(name: str, df: pd.DataFrame, columns: bool = False) -> Dict:
+    """
+    Size of one DataFrame
+
+    Args:
+        name: Dotted path to the table (e.g. generator.summary_table)
+        df: The table
+        columns: Include a per-column breakdown
+
+    Returns:
+        Dictionary with name, rows, columns, bytes, object_bytes, suggestions and
+        (when columns=True) column_detail [{column, dtype, bytes}]
+    """
+    usage = df.memory_usage(index=False, deep=True)
+    is_object = (df.dtypes == object).to_numpy()
+    report = {
+        'name': name,
+        'rows': len(df),
+        'columns': df.shape[1],
+        'bytes': int(df.memory_usage(index=True, deep=True).sum()),
+        'object_bytes': int(usage[is_object].sum()),
+        'suggestions': [],
+    }
+    for i, column in enumerate(df.columns):
+        if is_object[i]:
+            suggestion = column_suggestion(df.iloc[:, i])
+            if suggestion:
+                report['suggestions'].append({'column': str(column), **suggestion})
+    if columns:
+        report['column_detail'] = [{'column': str(column), 'dtype': str(df.dtypes.iloc[i]), 'bytes': int(usage.iloc[i])}
+                                   for i, column in enumerate(df.columns)]
+    return report
+
+
+def _find_tables(obj: Any, prefix: str, depth: int = 2) -> List[Tuple[str, pd.DataFrame]]:
+    """DataFrames among an object's attributes (and its attributes' attributes, to depth)"""
+    if isinstance(obj, pd.DataFrame):
+        return [(prefix, obj)]
+    if depth == 0 or not hasattr(obj, '__dict__') or isinstance(obj, _OPAQUE):
+        return []
+    tables = []
+    for attr, value in vars(obj).items():
+        tables.extend(_find_tables(value, f"{prefix}.{attr}", depth - 1))
+    return tables
+
+
+def memory_report(components: Dict[str, Any], columns: bool = False) -> Dict:
+    """
+    Memory used by each loaded component
+
+    Components are measured in the order given; an object reachable from an
+    earlier component (e.g. the MeasureIndex every engine holds) is counted
+    there once and listed as shared afterwards, so component sizes add up.
+
+    Args:
+        components: Name -> object (engines, indexes, loaders, module-level cache dicts)
+        columns: Include per-column sizes for every table
+
+    Returns:
+        Dictionary with process, total_bytes, components [{name, type, bytes,
+        attributes}], tables, caches and suggestions (largest first)
+    """
+    start = time.perf_counter()
+    seen: set = set()
+    owner: Dict[int, str] = {}
+    result_components, caches, tables = [], [], []
+
+    for name, obj in components.items():
+        if obj is None:
+            continue
+        owner.setdefault(id(obj), name)
+        attributes = []
+        if hasattr(obj, '__dict__') and not isinstance(obj, _OPAQUE):
+            seen.update((id(obj), id(vars(obj))))
+            items = vars(obj).items()
+        else:
+            items = [('', obj)]
+        for attr, value in items:
+            path = f"{name}.{attr}" if attr else name
+            if isinstance(value, (int, float, str, bool, type(None))):
+                continue
+            if id(value) in owner and value is not obj:
+                attributes.append({'name': attr, 'kind': _kind(value), 'type': type(value).__name__,
+                                   'bytes': 0, 'shared_with': owner[id(value)]})
+                continue
+            owner[id(value)] = path
+            size = deep_size(value, seen)
+            entry = {'name': attr, 'kind': _kind(value), 'type': type(value).__name__, 'bytes': size}
+            if isinstance(value, np.ndarray):
+                entry.update(dtype=str(value.dtype), shape=list(value.shape))
+            elif entry['kind'] == 'cache':
+                entry['entries'] = len(value)
+                caches.append({'name': path, 'entries': len(value), 'bytes': size})
+            attributes.append(entry)
+
+        attributes.sort(key=lambda a: -a['bytes'])
+        result_components.append({
+            'name': name,
+            'type': type(obj).__name__,
+            'bytes': sum(a['bytes'] for a in attributes),
+            'attributes': attributes,
+        })
+        tables.extend(table_report(path, df, columns) for path, df in _find_tables(obj, name))
+
+    suggestions = sorted(
+        ({'table': t['name'], **s} for t in tables for s in t['suggestions']),
+        key=lambda s: s['estimated_bytes'] - s['bytes'],
+    )
+    return {
+        'process': process_memory(),
+        'total_bytes': sum(c['bytes'] for c in result_components),
+        'components': sorted(result_components, key=lambda c: -c['bytes']),
+        'tables': sorted(tables, key=lambda t: -t['bytes']),
+        'caches': sorted(caches, key=lambda c: -c['bytes']),
+        'suggestions': suggestions,
+        'seconds': round(time.perf_counter() - start, 3),
+    }
+
+
+def trace_allocations(fn: Callable, *args, top: int = 10, **kwargs) -> Tuple[Any, Dict]:
+    """
+    Run fn under tracemalloc and report its top allocating lines
+
+    tracemalloc is process-wide, so allocations by other threads running at the
+    same time are included.
+
+    Returns:
+        (fn's result, {seconds, peak_bytes, allocated_bytes, top [{location,
+        size_bytes, count}]})
+    """
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start(TRACE_FRAMES)
+    tracemalloc.reset_peak()
+    exclude = (tracemalloc.Filter(False, tracemalloc.__file__),)
+    before = tracemalloc.take_snapshot().filter_traces(exclude)
+    start = time.perf_counter()
+    try:
+        result = fn(*args, **kwargs)
+    finally:
+        seconds = time.perf_counter() - start
+        after = tracemalloc.take_snapshot().filter_traces(exclude)
+        peak = tracemalloc.get_traced_memory()[1]
+        if not was_tracing:
+            tracemalloc.stop()
+
+    diff = after.compare_to(before, 'lineno')
+    return result, {
+        'seconds': round(seconds, 4),
+        'peak_bytes': peak,
+        'allocated_bytes': sum(stat.size_diff for stat in diff if stat.size_diff > 0),
+        'top': [{
+            'location': f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+            'size_bytes': stat.size_diff,
+            'count': stat.count_diff,
+        } for stat in diff[:top]],
+    }
+
+
+def _mb(size: int) -> str:
+    return f"{size / 1024 / 1024:8.2f} MB"
+
+
+def print_report(report: Dict, top: int = 8):
+    """Print a memory report"""
+    process = report['process']
+    print(f"\nProcess RSS: {process['rss_kb'] or 0} KB (peak {process['peak_rss_kb'] or 0} KB)")
+    print(f"Accounted:   {_mb(report['total_bytes']).strip()} in {report['seconds']} s")
+
+    print("\nComponents")
+    for component in report['components']:
+        print(f"  {_mb(component['bytes'])}  {component['name']} ({component['type']})")
+        for attr in component['attributes'][:top]:
+            if attr.get('shared_with'):
+                continue
+            detail = f" {attr['dtype']} {attr['shape']}" if 'dtype' in attr else \
+                f" {attr['entries']} entries" if 'entries' in attr else ''
+            print(f"      {_mb(attr['bytes'])}  .{attr['name']} [{attr['kind']}{detail}]")
+
+    print("\nTables")
+    for table in report['tables']:
+        print(f"  {_mb(table['bytes'])}  {table['name']} ({table['rows']} x {table['columns']}, "
+              f"{_mb(table['object_bytes']).strip()} object)")
+        for column in sorted(table.get('column_detail', []), key=lambda c: -c['bytes'])[:top]:
+            print(f"      {_mb(column['bytes'])}  {column['column'][:50]} [{column['dtype']}]")
+
+    if report['caches']:
+        print("\nCaches")
+        for cache in report['caches'][:top * 2]:
+            print(f"  {_mb(cache['bytes'])}  {cache['name']} ({cache['entries']} entries)")
+
+    if report['suggestions']:
+        saving = sum(s['bytes'] - s['estimated_bytes'] for s in report['suggestions'])
+        print(f"\nObject columns worth converting (saves ~{_mb(saving).strip()})")
+        for s in report['suggestions'][:top * 2]:
+            print(f"  {_mb(s['bytes'] - s['estimated_bytes'])}  {s['table']}[{s['column'][:40]}] -> {s['suggested']}")
+
+
+def print_trace(trace: Dict):
+    """Print a tracemalloc trace"""
+    print(f"\nTraced request: {trace['seconds']} s, peak {_mb(trace['peak_bytes']).strip()}, "
+          f"net {_mb(trace['allocated_bytes']).strip()}")
+    for stat in trace['top']:
+        print(f"  {stat['size_bytes'] / 1024:10.1f} KB  {stat['count']:7d}  {stat['location']}")
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description="Report memory used by the loaded datasets, indexes and caches")
+    parser.add_argument('--columns', action='store_true', help="per-column sizes for every table")
+    parser.add_argument('--trace', metavar='CONTRACT_ID', help="tracemalloc a contract detail request")
+    parser.add_argument('--top', type=int, default=8, help="rows per section (default %(default)s)")
+    parser.add_argument('--json', action='store_true', help="print JSON instead of tables")
+    args = parser.parse_args()
+
+    try:
+        import api
+        trace = None
+        if args.trace:
+            _, trace = trace_allocations(api.build_contract_detail, args.trace, top=args.top)
+        report = memory_report(api.memory_components(), columns=args.columns)
+        if args.json:
+            print(json.dumps({**report, 'trace': trace}, indent=2, default=str))
+            return
+        print_report(report, top=args.top)
+        if trace:
+            print_trace(trace)
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Summary and overall rating calculations
+Weighted averages of measure stars for every contract at once, with CAI and half-star rounding
+"""
+
+import math
+import numpy as np
+from typing import Dict, Optional
+
+from measure_config import MEASURE_CONFIGS
+from weight_profile import WeightProfile, current_profile
+
+# Rating parts in display order
+RATING_PARTS = ('part_c', 'part_d', 'overall')
+
+
+def round_to_half_star(raw):
+    """
+    Round raw summary/overall scores to the nearest half star (Tech Notes Table 22)
+
+    3.749999 -> 3.5 and 3.75 -> 4.0. Scores are first rounded to six decimals
+    (CMS precision) so float noise cannot flip a boundary. Works on scalars and arrays.
+    """
+    rounded = np.floor(np.round(np.asarray(raw, dtype=float), 6) * 2 + 0.5) / 2
+    rounded = np.clip(rounded, 0.0, 5.0)
+    return float(rounded) if np.ndim(rounded) == 0 else rounded
+
+
+def part_masks(codes) -> Dict[str, np.ndarray]:
+    """Boolean column masks selecting the measures in each rating part"""
+    is_part_c = np.array([MEASURE_CONFIGS[c].part_type == 'C' for c in codes], dtype=bool)
+    return {
+        'part_c': is_part_c,
+        'part_d': ~is_part_c,
+        'overall': np.ones(len(codes), dtype=bool),
+    }
+
+
+def json_value(value, digits: int = 6) -> Optional[float]:
+    """A number for a JSON response: rounded to digits, None for NaN/inf (JSON has no NaN)"""
+    value = float(value)
+    return round(value, digits) if math.isfinite(value) else None
+
+
+class RatingEngine:
+    """
+    Part C, Part D and Overall ratings for every contract in a MeasureIndex
+
+    Each part is the weighted average of the contract's rated measure stars
+    (weight profile weights, the current profile by default; D02/D03 count in
+    Part D but not Overall), plus the
+    contract's CAI, rounded to the nearest half star. The overall rating needs both parts.
+    Reward factor and the improvement-measure hold harmless are not modelled.
+    """
+
+    def __init__(self, index, cai_calculator=None, profile: Optional[WeightProfile] = None):
+        self.index = index
+        self.profile = profile or current_profile()
+        # {part: weights aligned to index.codes}
+        self.weights = self.profile.part_weights(index.codes)
+        self.masks = part_masks(index.codes)
+
+        if cai_calculator is not None:
+            self.cai = cai_calculator.aligned_cai(index.contract_ids)
+        else:
+            self.cai = {part: np.zeros(len(index.contract_ids)) for part in RATING_PARTS}
+
+        self.baseline = self.compute(index.stars)
+
+    def compute(self, stars: np.ndarray, weights: Optional[Dict[str, np.ndarray]] = None,
+                cai: Optional[Dict[str, np.ndarray]] = None) -> Dict[str, Dict[str, np.ndarray]]:
+        """
+        Ratings for a (contracts, measures) star matrix (0 = not rated)
+
+        weights defaults to the engine's per-part weights (WeightProfile.part_weights).
+
+        Returns:
+            {part: {'weighted_sum', 'total_weight', 'raw', 'adjusted', 'rating'}}
+            with NaN where a contract has no rating for that part
+        """
+        weights = self.weights if weights is None else weights
+        cai = self.cai if cai is None else cai
+        rated = stars > 0
+
+        result = {}
+        for part in RATING_PARTS:
+            w = np.where(rated & self.masks[part], weights[part], 0.0)
+            weighted_sum = (stars * w).sum(axis=1)
+            total_weight = w.sum(axis=1)
+            result[part] = {'weighted_sum': weighted_sum, 'total_weight': total_weight}
+
+        # Overall rating only exists when both summaries do
+        has_both = (result['part_c']['total_weight'] > 0) & (result['part_d']['total_weight'] > 0)
+        result['overall']['total_weight'] = np.where(has_both, result['overall']['total_weight'], 0.0)
+
+        for part in RATING_PARTS:
+            values = result[part]
+            with np.errstate(invalid='ignore', divide='ignore'):
+                raw = np.where(values['total_weight'] > 0,
+                               values['weighted_sum'] / values['total_weight'], np.nan)
+            values['raw'] = raw
+            values['adjusted'] = raw + cai[part]
+            values['rating'] = round_to_half_star(values['adjusted'])
+        return result
+
+    def contract_ratings(self, contract_id: str, ratings: Optional[Dict] = None) -> Dict[str, Dict]:
+        """
+        One contract's ratings as plain floats
+
+        Returns:
+            {part: {'raw', 'cai', 'adjusted', 'rating'}} (None where unrated)
+        """
+        ratings = self.baseline if ratings is None else ratings
+        r = self.index.row_of.get(str(contract_id).strip())
+        if r is None:
+            raise ValueError(f"Contract {contract_id} not found")
+
+        return {
+            part: {
+                'raw': json_value(ratings[part]['raw'][r]),
+                'cai': json_value(self.cai[part][r]),
+                'adjusted': json_value(ratings[part]['adjusted'][r]),
+                'rating': json_value(ratings[part]['rating'][r], 1),
+            }
+            for part in RATING_PARTS
+        }
+
+
+# Test cases
+if __name__ == "__main__":
+    print("Testing rating engine...")
+
+    assert round_to_half_star(3.749999) == 3.5
+    assert round_to_half_star(3.75) == 4.0
+    assert round_to_half_star(4.249999) == 4.0
+    assert round_to_half_star(4.75) == 5.0
+    assert round_to_half_star(5.1) == 5.0
+    assert round_to_half_star(0.2) == 0.0
+    assert np.isnan(round_to_half_star(float('nan')))
+    print("✓ Half-star rounding follows Table 22")
+
+    masks = part_masks(['C01', 'C12', 'D08'])
+    assert masks['part_c'].tolist() == [True, True, False]
+    assert masks['part_d'].tolist() == [False, False, True]
+    print("✓ Part masks work")
+
+    w = current_profile().part_weights(['C28', 'D02'])
+    assert w['part_d'].tolist() == [2.0, 2.0] and w['overall'].tolist() == [2.0, 0.0]
+    print("✓ D02/D03 weighted in Part D only")
+
+    print("\n✅ All rating engine tests passed!")
@@ -0,0 +1,355 @@
+"""
+HTML / PDF contract report renderer
+Precompiled templates for single reports and a parallel batch mode for whole-market packets
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from html import escape
+from string import Template
+from typing import Dict, List, Optional
+
+from measure_config import DOMAIN_NAMES
+
+try:
+    from weasyprint import HTML as WeasyHTML
+except ImportError:  # PDF output is optional
+    WeasyHTML = None
+
+FORMATS = ('html', 'pdf')
+
+# Reports in flight per worker; bounds batch memory to a few reports per process
+QUEUE_DEPTH_PER_WORKER = 2
+
+PART_C_DOMAINS = ['HD1', 'HD2', 'HD3', 'HD4', 'HD5']
+PART_D_DOMAINS = ['DD1', 'DD2', 'DD3', 'DD4']
+
+STYLE = """
+body { font-family: -apple-system, "Segoe UI", Helvetica, Arial, sans-serif; color: #1f2937; margin: 24px; font-size: 12px; }
+h1 { font-size: 20px; margin: 0 0 4px; }
+h2 { font-size: 15px; border-bottom: 2px solid #1d4ed8; padding-bottom: 4px; margin-top: 24px; }
+h3 { font-size: 13px; color: #374151; margin: 16px 0 6px; }
+.meta { color: #4b5563; margin: 2px 0; }
+.ratings { display: flex; gap: 12px; margin: 12px 0; }
+.rating { border: 1px solid #d1d5db; border-radius: 6px; padding: 8px 14px; text-align: center; }
+.rating .value { font-size: 18px; font-weight: 600; }
+table { width: 100%; border-collapse: collapse; page-break-inside: auto; }
+tr { page-break-inside: avoid; }
+th, td { border-bottom: 1px solid #e5e7eb; padding: 4px 6px; text-align: left; }
+th { background: #f3f4f6; font-weight: 600; }
+td.num { text-align: right; }
+.star-5 { color: #15803d; font-weight: 600; } .star-4 { color: #65a30d; }
+.star-3 { color: #ca8a04; } .star-2 { color: #ea580c; } .star-1 { color: #dc2626; font-weight: 600; }
+.special { color: #9ca3af; font-style: italic; }
+@page { size: letter; margin: 14mm; }
+"""
+
+# Templates are compiled once at import; rendering is substitution only
+PAGE_TEMPLATE = Template("""<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8"><title>$title</title><style>$style</style></head>
+<body>
+$body
+</body></html>
+""")
+
+REPORT_TEMPLATE = Template("""<h1>$contract_id &ndash; $marketing_name</h1>
+<p class="meta">$contract_name &middot; Parent: $parent_org</p>
+<p class="meta">Type: $org_type &middot; SNP: $is_snp &middot; Part D thresholds: $part_d_set</p>
+<div class="ratings">
+  <div class="rating"><div>Overall</div><div class="value">$overall_rating</div></div>
+  <div class="rating"><div>Part C</div><div class="value">$part_c_rating</div></div>
+  <div class="rating"><div>Part D</div><div class="value">$part_d_rating</div></div>
+</div>
+$sections
+<h2>Summary</h2>
+<p>Measures with ratings: $rated_count &middot; $star_counts &middot; Special status: $special_count</p>
+""")
+
+SECTION_TEMPLATE = Template("""<h2>$title</h2>
+$domains""")
+
+DOMAIN_TEMPLATE = Template("""<h3>$domain: $domain_name</h3>
+<table>
+<tr><th>Measure</th><th>Star</th><th class="num">Performance</th><th>Cut Point Band</th></tr>
+$rows
+</table>""")
+
+ROW_TEMPLATE = Template(
+    '<tr><td>$code: $name</td><td class="$star_class">$star</td>'
+    '<td class="num $perf_class">$performance</td><td>$band</td></tr>'
+)
+
+INDEX_TEMPLATE = Template("""<h1>$title</h1>
+<p class="meta">$count contracts</p>
+<table>
+<tr><th>Contract</th><th>Marketing Name</th><th>Parent Organization</th><th>Overall</th></tr>
+$rows
+</table>""")
+
+INDEX_ROW_TEMPLATE = Template(
+    '<tr><td><a href="$href">$contract_id</a></td><td>$marketing_name</td>'
+    '<td>$parent_org</td><td>$overall_rating</td></tr>'
+)
+
+
+def _text(value) -> str:
+    """Escaped, stripped cell text"""
+    return escape(str(value).strip()) if value is not None else ''
+
+
+def _rating(value) -> str:
+    text = _text(value)
+    try:
+        float(text)
+        return f"{text}⭐"
+    except ValueError:
+        return text or 'N/A'
+
+
+def render_report_body(report: Dict) -> str:
+    """
+    Report body (no page wrapper) for one generate_report result
+
+    Args:
+        report: Dictionary from ContractReportGenerator.generate_report
+
+    Returns:
+        HTML fragment
+    """
+    info = report['contract_info']
+    lines = report['measure_lines']
+
+    sections = []
+    for title, domains in (('Part C Measures', PART_C_DOMAINS), ('Part D Measures', PART_D_DOMAINS)):
+        domain_html = []
+        for domain in domains:
+            domain_lines = [l for l in lines if l.domain == domain]
+            if not domain_lines:
+                continue
+            rows = '\n'.join(ROW_TEMPLATE.substitute(
+                code=_text(line.measure_code),
+                name=_text(line.measure_name),
+                star=f"{line.star_rating}⭐" if line.star_rating else 'N/A',
+                star_class=f"star-{line.star_rating}" if line.star_rating else 'special',
+                performance=_text(line.performance_value),
+                perf_class='special' if line.is_special else '',
+                band=_text(line.threshold_band),
+            ) for line in domain_lines)
+            domain_html.append(DOMAIN_TEMPLATE.substitute(
+                domain=domain, domain_name=_text(DOMAIN_NAMES.get(domain, domain)), rows=rows
+            ))
+        if domain_html:
+            sections.append(SECTION_TEMPLATE.substitute(title=title, domains='\n'.join(domain_html)))
+
+    rated = [l for l in lines if not l.is_special and l.star_rating is not None]
+    star_counts = ' · '.join(
+        f"{star}⭐: {sum(1 for l in rated if l.star_rating == star)}" for star in range(5, 0, -1)
+    )
+
+    return REPORT_TEMPLATE.substitute(
+        contract_id=_text(info['contract_id']),
+        marketing_name=_text(info['marketing_name']),
+        contract_name=_text(info['contract_name']),
+        parent_org=_text(info['parent_org']),
+        org_type=_text(info['org_type']),
+        is_snp=_text(info['is_snp']),
+        part_d_set=_text(report['part_d_set']),
+        overall_rating=_rating(info['overall_rating']),
+        part_c_rating=_rating(info['part_c_rating']),
+        part_d_rating=_rating(info['part_d_rating']),
+        sections='\n'.join(sections),
+        rated_count=len(rated),
+        star_counts=star_counts,
+        special_count=sum(1 for l in lines if l.is_special),
+    )
+
+
+def render_html(report: Dict) -> str:
+    """Complete HTML page for one contract report"""
+    title = f"{_text(report['contract_info']['contract_id'])} Star Ratings Report"
+    return PAGE_TEMPLATE.substitute(title=title, style=STYLE, body=render_report_body(report))
+
+
+def write_report(report: Dict, path: str, fmt: str = 'html') -> str:
+    """
+    Render one report to a file
+
+    Args:
+        report: Dictionary from generate_report
+        path: Output file
+        fmt: 'html' or 'pdf'
+
+    Returns:
+        The path written
+
+    Raises:
+        RuntimeError: If PDF output is requested without weasyprint installed
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format: {fmt} (use one of {', '.join(FORMATS)})")
+    html = render_html(report)
+    if fmt == 'pdf':
+        if WeasyHTML is None:
+            raise RuntimeError("PDF output needs weasyprint (pip install weasyprint)")
+        WeasyHTML(string=html).write_pdf(path)
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(html)
+    return path
+
+
+def _render_task(report: Dict, path: str, fmt: str) -> str:
+    """Worker entry point (module level so it pickles)"""
+    return write_report(report, path, fmt)
+
+
+def render_index(entries: List[Dict], title: str) -> str:
+    """Index page linking every rendered report"""
+    rows = '\n'.join(INDEX_ROW_TEMPLATE.substitute(
+        href=escape(os.path.basename(entry['path'])),
+        contract_id=_text(entry['contract_id']),
+        marketing_name=_text(entry['marketing_name']),
+        parent_org=_text(entry['parent_org']),
+        overall_rating=_rating(entry['overall_rating']),
+    ) for entry in entries)
+    body = INDEX_TEMPLATE.substitute(title=escape(title), count=len(entries), rows=rows)
+    return PAGE_TEMPLATE.substitute(title=escape(title), style=STYLE, body=body)
+
+
+def render_batch(generator, contract_ids: List[str], out_dir: str, fmt: str = 'html',
+                 workers: Optional[int] = None, title: str = 'Star Ratings Reports') -> Dict:
+    """
+    Render many contract reports into a directory, plus an index.html
+
+    Reports are built in this process (generate_report is a lookup) and
+    rendered in worker processes. At most QUEUE_DEPTH_PER_WORKER reports per
+    worker are in flight, so memory stays flat however many contracts are
+    rendered.
+
+    Args:
+        generator: ContractReportGenerator or DatabaseReportGenerator
+        contract_ids: Contracts to render
+        out_dir: Output directory (created if missing)
+        fmt: 'html' or 'pdf'
+        workers: Worker processes (default: CPU count; 0 renders in this process)
+        title: Index page title
+
+    Returns:
+        Dictionary with rendered count, failures {contract_id: error}, index path and seconds
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format: {fmt} (use one of {', '.join(FORMATS)})")
+    if fmt == 'pdf' and WeasyHTML is None:
+        raise RuntimeError("PDF output needs weasyprint (pip install weasyprint)")
+    os.makedirs(out_dir, exist_ok=True)
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    start = time.perf_counter()
+
+    entries, failures = [], {}
+
+    def jobs():
+        for contract_id in contract_ids:
+            try:
+                report = generator.generate_report(contract_id)
+            except ValueError as e:
+                failures[contract_id] = str(e)
+                continue
+            info = report['contract_info']
+            path = os.path.join(out_dir, f"{info['contract_id']}.{fmt}")
+            entries.append({
+                'contract_id': info['contract_id'],
+                'marketing_name': info['marketing_name'],
+                'parent_org': info['parent_org'],
+                'overall_rating': info['overall_rating'],
+                'path': path,
+            })
+            yield info['contract_id'], report, path
+
+    if workers <= 0:
+        for contract_id, report, path in jobs():
+            try:
+                write_report(report, path, fmt)
+            except Exception as e:
+                failures[contract_id] = str(e)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = {}
+            for contract_id, report, path in jobs():
+                if len(pending) >= workers * QUEUE_DEPTH_PER_WORKER:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        _collect(future, pending.pop(future), failures)
+                pending[pool.submit(_render_task, report, path, fmt)] = contract_id
+            for future in list(pending):
+                _collect(future, pending.pop(future), failures)
+
+    entries = [entry for entry in entries if entry['contract_id'] not in failures]
+    index_path = os.path.join(out_dir, 'index.html')
+    with open(index_path, 'w', encoding='utf-8') as f:
+        f.write(render_index(entries, title))
+
+    return {
+        'rendered': len(entries),
+        'failures': failures,
+        'index': index_path,
+        'seconds': round(time.perf_counter() - start, 2),
+    }
+
+
+def _collect(future, contract_id: str, failures: Dict[str, str]):
+    try:
+        future.result()
+    except Exception as e:
+        failures[contract_id] = str(e)
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description="Render contract reports as HTML or PDF")
+    parser.add_argument('contract_ids', nargs='*', help="contracts to render")
+    parser.add_argument('--all', action='store_true', help="render every contract")
+    parser.add_argument('--parent', help="render every contract under this parent organization")
+    parser.add_argument('--format', choices=FORMATS, default='html')
+    parser.add_argument('--out', default='reports', help="output directory (default %(default)s)")
+    parser.add_argument('--workers', type=int, help="worker processes (default: CPU count, 0 = in process)")
+    parser.add_argument('--db', help="read reports from a stars_db.py SQLite store instead of the CSVs")
+    args = parser.parse_args()
+
+    if not (args.contract_ids or args.all or args.parent):
+        parser.error("give contract IDs, --all or --parent")
+
+    try:
+        if args.db:
+            from stars_db import DatabaseReportGenerator
+            generator = DatabaseReportGenerator(args.db)
+        else:
+            from contract_report import ContractReportGenerator
+            generator = ContractReportGenerator()
+
+        if args.contract_ids:
+            contract_ids = [cid.strip().upper() for cid in args.contract_ids]
+            title = 'Star Ratings Reports'
+        elif args.parent:
+            contract_ids = generator.list_contracts(args.parent)
+            if not contract_ids:
+                raise ValueError(f"No contracts under parent organization {args.parent}")
+            title = f"{args.parent} Star Ratings Reports"
+        else:
+            contract_ids = generator.list_contracts()
+            title = 'Star Ratings Reports (all contracts)'
+
+        result = render_batch(generator, contract_ids, args.out, args.format, args.workers, title)
+        print(f"✓ Rendered {result['rendered']} {args.format.upper()} reports in {result['seconds']}s "
+              f"({result['index']})")
+        for contract_id, error in result['failures'].items():
+            print(f"  {contract_id}: {error}")
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Market re-weighting
+Re-scores every contract under any weight profile (weight_profile.py) and diffs against the current one
+"""
+
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from rating_engine import RATING_PARTS, json_value, round_to_half_star
+from weight_profile import WeightProfile, current_profile
+
+
+class ReweightEngine:
+    """
+    Re-scores every contract under any number of weight profiles
+
+    With stars S (contracts x measures, 0 = unrated) and a weight matrix W
+    holding one column per (profile, part), the weighted sums are S @ W and
+    the total weights (S > 0) @ W, so a batch of profiles is two matrix
+    products followed by the usual CAI and half-star rounding.
+    """
+
+    def __init__(self, rating_engine, current: Optional[WeightProfile] = None):
+        self.engine = rating_engine
+        self.index = rating_engine.index
+        self.current = current or current_profile()
+        self.stars = self.index.stars.astype(float)
+        self.rated = (self.index.stars > 0).astype(float)
+        self.baseline = self.score([self.current])[0]
+
+    def weight_matrix(self, profiles: List[WeightProfile]) -> np.ndarray:
+        """(measures, profiles * parts) weights, zero outside each part's measures"""
+        codes = self.index.codes
+        columns = []
+        for profile in profiles:
+            weights = profile.part_weights(codes)
+            columns.extend(np.where(self.engine.masks[part], weights[part], 0.0) for part in RATING_PARTS)
+        return np.column_stack(columns)
+
+    def score(self, profiles: List[WeightProfile]) -> List[Dict[str, np.ndarray]]:
+        """
+        Ratings for every contract under each profile
+
+        Returns:
+            Per profile {part: {'raw', 'rating'}} arrays over contracts (NaN where unrated)
+        """
+        w = self.weight_matrix(profiles)
+        weighted_sum = self.stars @ w
+        total_weight = self.rated @ w
+
+        results = []
+        for k in range(len(profiles)):
+            cols = {part: k * len(RATING_PARTS) + p for p, part in enumerate(RATING_PARTS)}
+            has_both = (total_weight[:, cols['part_c']] > 0) & (total_weight[:, cols['part_d']] > 0)
+            result = {}
+            for part, col in cols.items():
+                total = total_weight[:, col] if part != 'overall' else np.where(has_both, total_weight[:, col], 0.0)
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    raw = np.where(total > 0, weighted_sum[:, col] / total, np.nan)
+                result[part] = {'raw': raw, 'rating': round_to_half_star(raw + self.engine.cai[part])}
+            results.append(result)
+        return results
+
+    def compare(self, profile: WeightProfile, limit: Optional[int] = None) -> Dict:
+        """
+        Diff every contract's ratings under a profile against the current profile
+
+        Returns:
+            Dictionary with profile, current, weight_changes {code: {before, after,
+            overall_before, overall_after}} (summary and overall weights),
+            summary {part: {moved_up, moved_down, mean_change}}, distribution
+            {part: {rating: {before, after}}} and changed [{contract_id, part_c,
+            part_d, overall}] ordered by largest overall change
+        """
+        start = time.perf_counter()
+        result = self.score([profile])[0]
+
+        codes = self.index.codes
+        before_w, after_w = self.current.part_weights(codes), profile.part_weights(codes)
+        weight_changes = {
+            code: {'before': float(before_w['part_c'][m]), 'after': float(after_w['part_c'][m]),
+                   'overall_before': float(before_w['overall'][m]), 'overall_after': float(after_w['overall'][m])}
+            for m, code in enumerate(codes)
+            if before_w['part_c'][m] != after_w['part_c'][m] or before_w['overall'][m] != after_w['overall'][m]
+        }
+
+        summary, distribution = {}, {}
+        changed = np.zeros(len(self.index.contract_ids), dtype=bool)
+        for part in RATING_PARTS:
+            before, after = self.baseline[part]['rating'], result[part]['rating']
+            delta = after - before
+            delta = delta[np.isfinite(delta)]
+            with np.errstate(invalid='ignore'):
+                summary[part] = {
+                    'moved_up': int((after > before).sum()),
+                    'moved_down': int((after < before).sum()),
+                    'mean_change': round(float(delta.mean()), 4) if len(delta) else 0.0,
+                }
+            changed |= ~((before == after) | (np.isnan(before) & np.isnan(after)))
+            levels = np.union1d(before[np.isfinite(before)], after[np.isfinite(after)])
+            distribution[part] = {str(level): {'before': int((before == level).sum()), 'after': int((after == level).sum())}
+                                  for level in levels}
+
+        delta = np.abs(np.nan_to_num(result['overall']['rating'] - self.baseline['overall']['rating'], nan=0.0))
+        rows = np.flatnonzero(changed)
+        rows = rows[np.lexsort((rows, -delta[rows]))][:limit]
+
+        return {
+            'profile': profile.name,
+            'current': self.current.name,
+            'weight_changes': weight_changes,
+            'summary': summary,
+            'distribution': distribution,
+            'changed': [{
+                'contract_id': self.index.contract_ids[r],
+                **{part: {'before': json_value(self.baseline[part]['rating'][r], 1),
+                          'after': json_value(result[part]['rating'][r], 1)} for part in RATING_PARTS},
+            } for r in rows],
+            'seconds': round(time.perf_counter() - start, 4),
+        }
+
+
+# Test cases
+if __name__ == "__main__":
+    from contract_report import ContractReportGenerator
+    from measure_index import MeasureIndex
+    from rating_engine import RatingEngine
+    from cai_calculator import CAICalculator
+    from weight_profile import load_profile, profile_from_dict
+
+    print("Testing market re-weighting...")
+
+    current = current_profile()
+    next_year = load_profile('2027')
+    generator = ContractReportGenerator()
+    index = MeasureIndex(generator)
+    engine = RatingEngine(index, CAICalculator('2026 Star Ratings Data Table - CAI (Oct 8 2025).csv'))
+    reweight = ReweightEngine(engine)
+
+    for part in RATING_PARTS:
+        assert np.array_equal(reweight.baseline[part]['rating'], engine.baseline[part]['rating'], equal_nan=True)
+    print("✓ Matrix re-scoring under the current profile reproduces RatingEngine")
+
+    diff = reweight.compare(next_year)
+    assert set(diff['weight_changes']) == {'C04', 'C05'}
+    print(f"✓ 2027 weights: {len(diff['changed'])} contracts change, overall "
+          f"{diff['summary']['overall']['moved_up']} up / {diff['summary']['overall']['moved_down']} down "
+          f"({diff['seconds'] * 1000:.1f} ms)")
+
+    # A profile that only changes overall_duplicates reports the overall weight change
+    no_duplicates = profile_from_dict({'name': 'no-duplicates', 'extends': '2026'})
+    no_duplicates.overall_duplicates = {}
+    changes = reweight.compare(no_duplicates)['weight_changes']
+    assert set(changes) == {'D02', 'D03'}
+    assert changes['D02'] == {'before': 2.0, 'after': 2.0, 'overall_before': 0.0, 'overall_after': 2.0}
+    print("✓ Overall-only weight changes are reported")
+
+    # Check the matrix pass against RatingEngine with the same weights
+    expected = engine.compute(index.stars, weights=next_year.part_weights(index.codes))
+    assert np.array_equal(reweight.score([next_year])[0]['overall']['rating'], expected['overall']['rating'], equal_nan=True)
+    print("✓ Matches RatingEngine.compute with the profile's weights")
+
+    custom = profile_from_dict({'name': 'no-cahps', 'extends': '2026',
+                                'weights': {code: 0 for code in ('C22', 'C23', 'C24', 'C25', 'C26', 'C27')}})
+    start = time.perf_counter()
+    reweight.score([current, next_year, custom] * 10)
+    print(f"✓ 30 profiles scored in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    print("\n✅ All re-weighting tests passed!")
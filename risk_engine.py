@@ -0,0 +1,221 @@
+"""
+Risk status engine
+Classifies every contract x measure as At Risk, Neutral or Upside within its current star band
+"""
+
+import numpy as np
+from typing import Dict, List
+
+from rating_engine import json_value
+from weight_profile import current_profile
+
+# Risk label codes (index into RISK_LABELS)
+RISK_NA, RISK_AT_RISK, RISK_NEUTRAL, RISK_UPSIDE = 0, 1, 2, 3
+RISK_LABELS = ('N/A', 'At Risk', 'Neutral', 'Upside')
+
+# Contribution of each label to the weighted risk score
+RISK_SCORE_SIGN = np.array([0, -1, 0, 1], dtype=float)
+
+
+def classify_risk(perf, lower, upper, star, is_inverse) -> Dict[str, np.ndarray]:
+    """
+    Vectorised risk classification (port of the frontend's calculateRiskStatus)
+
+    All arguments broadcast together. NaN marks a missing performance value or
+    an open band edge; star 0 means not rated.
+
+    Within the band the position is split into thirds. Bands spanning more than
+    0.5 are treated as discrete integer values (inclusive/exclusive edges by
+    measure direction); narrower bands are continuous with ties going to the
+    middle third. Open lower edges are taken as 0 and open upper edges as 100
+    (2x the lower edge for inverse measures). 5-star measures have no upside.
+
+    Returns:
+        Dictionary with 'label' (int8 RISK_* codes) and 'outside' (True where
+        the value sits outside its band, shown with a "!" in the UI)
+    """
+    perf, lower, upper, star, is_inverse = np.broadcast_arrays(
+        np.asarray(perf, dtype=float), np.asarray(lower, dtype=float),
+        np.asarray(upper, dtype=float), np.asarray(star), np.asarray(is_inverse, dtype=bool)
+    )
+    inv = is_inverse
+    is5 = star == 5
+    has_perf = ~np.isnan(perf)
+
+    # Open edges
+    lower = np.where(np.isnan(lower) & ~np.isnan(upper), 0.0, lower)
+    open_upper = ~np.isnan(lower) & np.isnan(upper)
+    at_open_threshold = open_upper & (perf == lower)
+    upper = np.where(open_upper, np.where(inv, lower * 2, 100.0), upper)
+    no_band = np.isnan(upper)
+
+    upside_unless_5 = np.where(is5, RISK_NEUTRAL, RISK_UPSIDE)
+    band_range = upper - lower
+
+    with np.errstate(invalid='ignore'):
+        # One-value discrete bands ("88 to <89", ">9 to <=10")
+        one_value = (band_range > 0.5) & (band_range <= 1)
+        inside_one = np.where(inv, (perf > lower) & (perf <= upper), (perf >= lower) & (perf < upper))
+
+        # Inverse upper edges are inclusive ("<=12"), normal ones exclusive ("<84")
+        above = np.where(inv, perf > upper, perf >= upper)
+        below = perf < lower
+
+        # Discrete positions
+        special_decimal = inv & (lower == 0) & (band_range < 1) & is5
+        discrete = (band_range > 0.5) | special_decimal
+        floor_lower, floor_upper = np.floor(lower), np.floor(upper)
+        lower_int = np.where(inv, np.where(special_decimal, 1, np.where(lower == 0, 0, floor_lower + 1)),
+                             floor_lower)
+        upper_int = np.where(inv, np.where(special_decimal, np.floor(upper * 100 + 0.5), floor_upper),
+                             np.where(open_upper, floor_upper, floor_upper - 1))
+        perf_int = np.floor(np.where(special_decimal, perf * 100, perf) + 0.5)
+        total = upper_int - lower_int + 1
+        outer = np.floor(total / 3)
+        d_lower = np.where(total == 2, perf_int == lower_int, perf_int <= lower_int + outer - 1)
+        d_upper = np.where(total == 2, perf_int != lower_int, perf_int >= upper_int - outer + 1)
+        d_single = total <= 1
+
+        # Continuous positions (strict, so boundaries go to the middle)
+        third = band_range / 3.0
+        c_lower = perf < lower + third
+        c_upper = perf > upper - third
+
+    pos_lower = np.where(discrete, d_lower & ~d_single, c_lower)
+    pos_upper = np.where(discrete, d_upper & ~d_single, c_upper) & ~pos_lower
+    inside_label = np.select(
+        [pos_lower & inv, pos_lower, pos_upper & inv, pos_upper],
+        [upside_unless_5, RISK_AT_RISK, RISK_AT_RISK, upside_unless_5],
+        default=RISK_NEUTRAL,
+    )
+
+    conditions = [
+        ~has_perf,
+        at_open_threshold,
+        no_band,
+        lower == upper,
+        one_value & inside_one,
+        above,
+        below,
+    ]
+    choices = [
+        RISK_NA,
+        np.where(is5 | inv, RISK_AT_RISK, RISK_UPSIDE),
+        RISK_NA,
+        RISK_NEUTRAL,
+        RISK_NEUTRAL,
+        np.where(inv, RISK_AT_RISK, upside_unless_5),
+        np.where(inv, upside_unless_5, RISK_AT_RISK),
+    ]
+    label = np.select(conditions, choices, default=inside_label).astype(np.int8)
+
+    first_match = np.select(conditions, np.arange(len(conditions)), default=len(conditions))
+    outside = (first_match == 5) | (first_match == 6)
+    return {'label': label, 'outside': outside}
+
+
+class RiskEngine:
+    """
+    Risk status for every contract x measure in a MeasureIndex
+
+    Computed once from the contract's current star band and cached. Distances
+    are performance minus the band's lower edge and the band's upper edge minus
+    performance (NaN for open edges). The risk score adds the measure weight for
+    each Upside and subtracts it for each At Risk.
+    """
+
+    def __init__(self, index):
+        self.index = index
+        self.lower, self.upper = index.cut_points.band_edges(index.stars, index.part_d_set)
+
+        result = classify_risk(index.values, self.lower, self.upper, index.stars, index.is_inverse[None, :])
+        self.label = result['label']
+        self.outside = result['outside']
+        self.distance_to_lower = index.values - self.lower
+        self.distance_to_upper = self.upper - index.values
+        weights = current_profile().part_weights(index.codes)['overall']
+        self.score = (RISK_SCORE_SIGN[self.label] * weights[None, :]).sum(axis=1)
+        self.label_counts = np.stack(
+            [(self.label == code).sum(axis=1) for code in range(len(RISK_LABELS))], axis=1
+        )
+
+        print(f"✓ Computed risk status: {self.label.size} contract-measures")
+
+    def _row(self, contract_id: str) -> int:
+        r = self.index.row_of.get(str(contract_id).strip())
+        if r is None:
+            raise ValueError(f"Contract {contract_id} not found")
+        return r
+
+    def contract_risk(self, contract_id: str) -> Dict:
+        """
+        One contract's risk by measure code
+
+        Returns:
+            Dictionary with risk_score and measures {code: {status, outside,
+            distance_to_lower, distance_to_upper}}
+        """
+        r = self._row(contract_id)
+        measures = {}
+        for m, code in enumerate(self.index.codes):
+            measures[code] = {
+                'status': RISK_LABELS[self.label[r, m]],
+                'outside': bool(self.outside[r, m]),
+                'distance_to_lower': json_value(self.distance_to_lower[r, m]),
+                'distance_to_upper': json_value(self.distance_to_upper[r, m]),
+            }
+        return {'risk_score': float(self.score[r]), 'measures': measures}
+
+    def market_risk(self, sort: str = 'score', limit: int = 100, offset: int = 0) -> Dict:
+        """
+        Risk score and label counts for every contract
+
+        Args:
+            sort: 'score' (most at risk first), '-score' (most upside first) or 'id'
+            limit: Maximum contracts returned
+            offset: Contracts to skip
+
+        Returns:
+            Dictionary with total and contracts [{contract_id, risk_score, at_risk, neutral, upside}]
+
+        Raises:
+            ValueError: For unknown sorts or a negative offset
+        """
+        if offset < 0:
+            raise ValueError("offset must be non-negative")
+        if sort == 'score':
+            order = np.lexsort((self.index.contract_ids, self.score))
+        elif sort == '-score':
+            order = np.lexsort((self.index.contract_ids, -self.score))
+        elif sort == 'id':
+            order = np.argsort(self.index.contract_ids)
+        else:
+            raise ValueError(f"Unknown sort: {sort}")
+
+        page = order[offset:offset + max(1, min(int(limit), 1000))]
+        contracts: List[Dict] = [{
+            'contract_id': self.index.contract_ids[r],
+            'risk_score': float(self.score[r]),
+            'at_risk': int(self.label_counts[r, RISK_AT_RISK]),
+            'neutral': int(self.label_counts[r, RISK_NEUTRAL]),
+            'upside': int(self.label_counts[r, RISK_UPSIDE]),
+        } for r in page]
+        return {'total': int(len(order)), 'contracts': contracts}
+
+
+# Test cases
+if __name__ == "__main__":
+    print("Testing risk engine...")
+
+    result = classify_risk([95, 99, 101], [95, 95, 95], [100, 100, 100], [5, 5, 5], [False] * 3)
+    assert [RISK_LABELS[c] for c in result['label']] == ['At Risk', 'Neutral', 'Neutral']
+    assert result['outside'].tolist() == [False, False, True]
+    print("✓ Vectorised classification works")
+
+    result = classify_risk(0.0, 0.0, 0.11, 5, True)
+    assert RISK_LABELS[result['label']] == 'Neutral'
+    result = classify_risk(np.nan, 1, 2, 3, False)
+    assert RISK_LABELS[result['label']] == 'N/A'
+    print("✓ Zero is a valid value, NaN is N/A")
+
+    print("\n✅ All risk engine tests passed!")
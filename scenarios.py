@@ -0,0 +1,409 @@
+"""
+Named what-if scenarios
+SQLite-backed contract scenarios (measure values, optional cut point overrides), re-scored in one vectorised batch
+"""
+
+import json
+import math
+import sqlite3
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from rating_engine import RATING_PARTS
+from stars_db import ConnectionPool
+
+DEFAULT_SCENARIO_DB_PATH = 'scenarios.db'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scenarios (
+    scenario_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL UNIQUE,
+    contract_id TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    outcome TEXT,                -- JSON {part_c, part_d, overall} ratings at the last evaluation
+    dataset_hash TEXT,           -- dataset the outcome was computed on
+    evaluated_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_scenarios_contract ON scenarios(contract_id);
+
+CREATE TABLE IF NOT EXISTS scenario_values (
+    scenario_id INTEGER NOT NULL REFERENCES scenarios(scenario_id) ON DELETE CASCADE,
+    measure_code TEXT NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (scenario_id, measure_code)
+);
+
+-- Entry threshold of a star level (inclusive: >= for normal, <= for inverse measures)
+CREATE TABLE IF NOT EXISTS scenario_cut_points (
+    scenario_id INTEGER NOT NULL REFERENCES scenarios(scenario_id) ON DELETE CASCADE,
+    measure_code TEXT NOT NULL,
+    star INTEGER NOT NULL CHECK (star BETWEEN 2 AND 5),
+    threshold REAL NOT NULL,
+    PRIMARY KEY (scenario_id, measure_code, star)
+);
+
+CREATE TABLE IF NOT EXISTS scenario_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class ScenarioEvaluator:
+    """
+    Scores many scenarios at once
+
+    Scenarios become (scenarios, measures) value and star matrices taken from
+    the index rows of their contracts. Overridden values are re-starred with
+    the compiled cut points, cut point overrides re-star their measure from
+    per-scenario entry thresholds, C30/D04 are re-derived when an
+    ImprovementEngine is given, and the rating engine computes every
+    scenario's ratings in one call.
+    """
+
+    def __init__(self, rating_engine, improvement=None):
+        self.rating_engine = rating_engine
+        self.index = rating_engine.index
+        self.improvement = improvement
+
+    def validate(self, contract_id: str, values: Dict[str, float],
+                 cut_points: Dict[str, Dict[int, float]]):
+        """
+        Check a scenario against the index
+
+        Raises:
+            KeyError: If the contract is unknown
+            ValueError: For unknown measure codes, star levels or non-numeric values
+        """
+        if contract_id not in self.index.row_of:
+            raise KeyError(f"Contract {contract_id} not found")
+        for code, value in values.items():
+            self.index.get_column(code)
+            if not math.isfinite(float(value)):
+                raise ValueError(f"{code}: value must be a finite number")
+        for code, thresholds in cut_points.items():
+            self.index.get_column(code)
+            for star, threshold in thresholds.items():
+                if int(star) not in (2, 3, 4, 5):
+                    raise ValueError(f"{code}: cut point overrides are for stars 2-5, got {star}")
+                if not math.isfinite(float(threshold)):
+                    raise ValueError(f"{code}: cut point must be a finite number")
+
+    def evaluate(self, scenarios: List[Dict]) -> List[Optional[Dict[str, Optional[float]]]]:
+        """
+        Ratings for each scenario
+
+        Args:
+            scenarios: [{contract_id, values: {code: value}, cut_points: {code: {star: threshold}}}]
+
+        Returns:
+            Per scenario {part_c, part_d, overall} half-star ratings (None where
+            unrated), or None if the contract is no longer in the dataset
+        """
+        index = self.index
+        found = [i for i, s in enumerate(scenarios) if s['contract_id'] in index.row_of]
+        outcomes: List[Optional[Dict]] = [None] * len(scenarios)
+        if not found:
+            return outcomes
+
+        rows = np.array([index.row_of[scenarios[i]['contract_id']] for i in found])
+        set_idx = index.part_d_set[rows]
+        values = index.values[rows].copy()
+        stars = index.stars[rows].astype(np.int8)
+        overridden = np.zeros(values.shape, dtype=bool)
+        edges, edge_inclusive = None, None
+        cut_overridden = np.zeros(values.shape, dtype=bool)
+
+        for k, i in enumerate(found):
+            for code, value in scenarios[i]['values'].items():
+                m = index.col_of.get(code)
+                if m is not None:
+                    values[k, m] = value
+                    overridden[k, m] = True
+            for code, thresholds in scenarios[i].get('cut_points', {}).items():
+                m = index.col_of.get(code)
+                if m is None or not thresholds:
+                    continue
+                if edges is None:
+                    edges, edge_inclusive = index.cut_points.entry_edges(index.is_inverse, set_idx)
+                for star, threshold in thresholds.items():
+                    edges[k, m, int(star) - 2] = threshold
+                    edge_inclusive[k, m, int(star) - 2] = True
+                cut_overridden[k, m] = True
+
+        assigned = index.cut_points.assign_stars(values, set_idx)
+        stars = np.where(overridden, assigned, stars)
+
+        if edges is not None:
+            edge_stars = index.cut_points.stars_from_edges(values, edges, edge_inclusive, index.is_inverse)
+            stars = np.where(cut_overridden & np.isfinite(values), edge_stars, stars)
+
+        if self.improvement is not None:
+            modelled = self.improvement.compute(values, stars, rows)
+            for part, m in self.improvement.improvement_cols.items():
+                if m is None:
+                    continue
+                moved = modelled['star'][part] != self.improvement.baseline['star'][part][rows]
+                stars[:, m] = np.where(moved & ~overridden[:, m], modelled['star'][part], stars[:, m])
+
+        cai = {part: self.rating_engine.cai[part][rows] for part in RATING_PARTS}
+        ratings = self.rating_engine.compute(stars, cai=cai)
+        for k, i in enumerate(found):
+            outcomes[i] = {
+                part: (float(ratings[part]['rating'][k]) if np.isfinite(ratings[part]['rating'][k]) else None)
+                for part in RATING_PARTS
+            }
+        return outcomes
+
+
+class ScenarioStore:
+    """Named scenarios in an embedded SQLite database"""
+
+    def __init__(self, db_path: str = DEFAULT_SCENARIO_DB_PATH):
+        self.db_path = db_path
+        conn = sqlite3.connect(db_path)
+        conn.executescript(SCHEMA)
+        conn.close()
+        # One connection: writes are serialised and SQLite enforces the cascades
+        self.pool = ConnectionPool(db_path, size=1, read_only=False)
+        with self.pool.connection() as conn:
+            conn.execute("PRAGMA foreign_keys = ON")
+
+    def close(self):
+        self.pool.close()
+
+    def _load(self, conn, where: str = '', params: tuple = ()) -> List[Dict]:
+        scenarios = {
+            row['scenario_id']: {
+                'scenario_id': row['scenario_id'],
+                'name': row['name'],
+                'contract_id': row['contract_id'],
+                'values': {},
+                'cut_points': {},
+                'outcome': json.loads(row['outcome']) if row['outcome'] else None,
+                'dataset_hash': row['dataset_hash'],
+                'created_at': row['created_at'],
+                'updated_at': row['updated_at'],
+                'evaluated_at': row['evaluated_at'],
+            }
+            for row in conn.execute(f"SELECT * FROM scenarios {where} ORDER BY scenario_id", params)
+        }
+        if not scenarios:
+            return []
+        ids = tuple(scenarios)
+        marks = ','.join('?' * len(ids))
+        for row in conn.execute(f"SELECT * FROM scenario_values WHERE scenario_id IN ({marks})", ids):
+            scenarios[row['scenario_id']]['values'][row['measure_code']] = row['value']
+        for row in conn.execute(f"SELECT * FROM scenario_cut_points WHERE scenario_id IN ({marks})", ids):
+            scenarios[row['scenario_id']]['cut_points'].setdefault(row['measure_code'], {})[row['star']] = row['threshold']
+        return list(scenarios.values())
+
+    def list(self, contract_id: Optional[str] = None) -> List[Dict]:
+        """All scenarios, or one contract's"""
+        with self.pool.connection() as conn:
+            if contract_id:
+                return self._load(conn, "WHERE contract_id = ?", (contract_id.strip().upper(),))
+            return self._load(conn)
+
+    def get(self, scenario_id: int) -> Dict:
+        """One scenario (KeyError if unknown)"""
+        with self.pool.connection() as conn:
+            found = self._load(conn, "WHERE scenario_id = ?", (int(scenario_id),))
+        if not found:
+            raise KeyError(f"Scenario {scenario_id} not found")
+        return found[0]
+
+    def save(self, evaluator: ScenarioEvaluator, name: str, contract_id: str,
+             values: Dict[str, float], cut_points: Optional[Dict[str, Dict[int, float]]] = None,
+             dataset_hash: Optional[str] = None) -> Dict:
+        """
+        Create a scenario, or replace the one with the same name, and score it
+
+        Args:
+            evaluator: ScenarioEvaluator for validation and the first outcome
+            name: Unique scenario name
+            contract_id: Contract the overrides apply to
+            values: Measure code -> what-if value
+            cut_points: Measure code -> {star (2-5): entry threshold}
+            dataset_hash: Dataset the outcome is computed on
+
+        Returns:
+            The stored scenario
+
+        Raises:
+            KeyError: If the contract is unknown
+            ValueError: For a blank name or invalid overrides
+        """
+        name = str(name or '').strip()
+        if not name:
+            raise ValueError("Scenario name is required")
+        contract_id = str(contract_id or '').strip().upper()
+        index = evaluator.index
+        values = {index.codes[index.get_column(c)]: float(v) for c, v in (values or {}).items()}
+        cut_points = {
+            index.codes[index.get_column(c)]: {int(star): float(t) for star, t in thresholds.items()}
+            for c, thresholds in (cut_points or {}).items()
+        }
+        evaluator.validate(contract_id, values, cut_points)
+        outcome = evaluator.evaluate([{'contract_id': contract_id, 'values': values, 'cut_points': cut_points}])[0]
+
+        now = time.time()
+        with self.pool.connection() as conn, conn:
+            existing = conn.execute("SELECT scenario_id, created_at FROM scenarios WHERE name = ?", (name,)).fetchone()
+            if existing:
+                scenario_id = existing['scenario_id']
+                conn.execute(
+                    "UPDATE scenarios SET contract_id = ?, updated_at = ?, outcome = ?, dataset_hash = ?, "
+                    "evaluated_at = ? WHERE scenario_id = ?",
+                    (contract_id, now, json.dumps(outcome), dataset_hash, now, scenario_id),
+                )
+                conn.execute("DELETE FROM scenario_values WHERE scenario_id = ?", (scenario_id,))
+                conn.execute("DELETE FROM scenario_cut_points WHERE scenario_id = ?", (scenario_id,))
+            else:
+                scenario_id = conn.execute(
+                    "INSERT INTO scenarios (name, contract_id, created_at, updated_at, outcome, dataset_hash, "
+                    "evaluated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (name, contract_id, now, now, json.dumps(outcome), dataset_hash, now),
+                ).lastrowid
+            conn.executemany("INSERT INTO scenario_values VALUES (?, ?, ?)",
+                             [(scenario_id, code, value) for code, value in values.items()])
+            conn.executemany("INSERT INTO scenario_cut_points VALUES (?, ?, ?, ?)",
+                             [(scenario_id, code, star, t)
+                              for code, thresholds in cut_points.items() for star, t in thresholds.items()])
+        return self.get(scenario_id)
+
+    def delete(self, scenario_id: int):
+        """Delete a scenario (KeyError if unknown)"""
+        with self.pool.connection() as conn, conn:
+            if conn.execute("DELETE FROM scenarios WHERE scenario_id = ?", (int(scenario_id),)).rowcount == 0:
+                raise KeyError(f"Scenario {scenario_id} not found")
+
+    def evaluate_all(self, evaluator: ScenarioEvaluator, dataset_hash: Optional[str] = None) -> Dict:
+        """
+        Re-score every saved scenario in one batch and store the outcomes
+
+        Returns:
+            Dictionary with evaluated, changed [{scenario_id, name, contract_id,
+            before, after}], dataset_hash and seconds
+        """
+        start = time.perf_counter()
+        with self.pool.connection() as conn:
+            scenarios = self._load(conn)
+        outcomes = evaluator.evaluate(scenarios)
+
+        changed = [{
+            'scenario_id': s['scenario_id'],
+            'name': s['name'],
+            'contract_id': s['contract_id'],
+            'before': s['outcome'],
+            'after': outcome,
+        } for s, outcome in zip(scenarios, outcomes) if outcome != s['outcome']]
+
+        now = time.time()
+        with self.pool.connection() as conn, conn:
+            conn.executemany(
+                "UPDATE scenarios SET outcome = ?, dataset_hash = ?, evaluated_at = ? WHERE scenario_id = ?",
+                [(json.dumps(outcome), dataset_hash, now, s['scenario_id']) for s, outcome in zip(scenarios, outcomes)],
+            )
+            conn.execute("INSERT OR REPLACE INTO scenario_meta VALUES ('dataset_hash', ?)", (dataset_hash,))
+
+        return {
+            'evaluated': len(scenarios),
+            'changed': changed,
+            'dataset_hash': dataset_hash,
+            'seconds': round(time.perf_counter() - start, 4),
+        }
+
+    def evaluate_if_stale(self, evaluator: ScenarioEvaluator, dataset_hash: str) -> Optional[Dict]:
+        """Re-score everything when the dataset differs from the last evaluation (None if up to date)"""
+        with self.pool.connection() as conn:
+            row = conn.execute("SELECT value FROM scenario_meta WHERE key = 'dataset_hash'").fetchone()
+        if row is not None and row['value'] == dataset_hash:
+            return None
+        return self.evaluate_all(evaluator, dataset_hash)
+
+
+# Test cases
+if __name__ == "__main__":
+    import os
+    import tempfile
+    from contract_report import ContractReportGenerator
+    from measure_index import MeasureIndex
+    from rating_engine import RatingEngine
+    from whatif_session import WhatIfSession
+
+    print("Testing scenarios...")
+
+    generator = ContractReportGenerator()
+    index = MeasureIndex(generator)
+    engine = RatingEngine(index)
+    evaluator = ScenarioEvaluator(engine)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ScenarioStore(os.path.join(tmp, 'scenarios.db'))
+
+        # A saved scenario scores the same as a what-if session with the same edits
+        edits = {'C01': 95.0, 'C12': 20.0, 'D08': 99.0}
+        saved = store.save(evaluator, 'H0028 stretch', 'h0028', edits, dataset_hash='v1')
+        session = WhatIfSession('test', engine, 'H0028')
+        session.apply_many(edits)
+        assert saved['outcome'] == {part: r['rating'] for part, r in session.ratings().items()}
+        print(f"✓ Scenario outcome matches the what-if session: {saved['outcome']}")
+
+        # Cut point override: raising every C01 threshold out of reach gives 1 star
+        m = index.get_column('C01')
+        raised = evaluator.evaluate([{'contract_id': 'H0028', 'values': {},
+                                      'cut_points': {'C01': {2: 101.0, 3: 102.0, 4: 103.0, 5: 104.0}}}])[0]
+        stars = index.stars.copy()
+        stars[index.row_of['H0028'], m] = 1
+        expected = engine.compute(stars)['overall']['rating'][index.row_of['H0028']]
+        assert raised['overall'] == expected
+        print("✓ Cut point overrides re-star the measure")
+
+        store.save(evaluator, 'H0028 stretch', 'H0028', {'C01': 50.0}, dataset_hash='v1')
+        assert len(store.list('H0028')) == 1 and store.list('H0028')[0]['values'] == {'C01': 50.0}
+        print("✓ Saving under an existing name replaces the scenario")
+
+        for bad in (('', 'H0028', {}), ('x', 'ZZZZZ', {}), ('x', 'H0028', {'X99': 1.0})):
+            try:
+                store.save(evaluator, *bad)
+                assert False, bad
+            except (KeyError, ValueError):
+                pass
+        print("✓ Bad scenarios are rejected")
+
+        rng = np.random.default_rng(0)
+        ids = index.contract_ids
+        with store.pool.connection() as conn, conn:
+            for i in range(500):
+                sid = conn.execute(
+                    "INSERT INTO scenarios (name, contract_id, created_at, updated_at) VALUES (?, ?, 0, 0)",
+                    (f"bulk {i}", ids[rng.integers(len(ids))]),
+                ).lastrowid
+                for code in rng.choice(index.codes, 3, replace=False):
+                    conn.execute("INSERT INTO scenario_values VALUES (?, ?, ?)", (sid, code, float(rng.uniform(0, 100))))
+        result = store.evaluate_all(evaluator, 'v2')
+        assert result['evaluated'] == 501 and len(result['changed']) >= 500
+        print(f"✓ Re-scored {result['evaluated']} scenarios in {result['seconds'] * 1000:.1f} ms")
+
+        assert store.evaluate_if_stale(evaluator, 'v2') is None
+        again = store.evaluate_if_stale(evaluator, 'v3')
+        assert again is not None and not again['changed']
+        print("✓ Re-evaluation only reports changed outcomes")
+
+        store.delete(saved['scenario_id'])
+        try:
+            store.get(saved['scenario_id'])
+            assert False
+        except KeyError:
+            pass
+        with store.pool.connection() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM scenario_values WHERE scenario_id = ?",
+                                (saved['scenario_id'],)).fetchone()[0] == 0
+        print("✓ Delete cascades to overrides")
+        store.close()
+
+    print("\n✅ All scenario tests passed!")
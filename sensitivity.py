@@ -0,0 +1,192 @@
+"""
+Rating sensitivity matrix
+Change in Part C, Part D and Overall rating from moving each measure one star up or down, for every contract
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+
+from rating_engine import RATING_PARTS, json_value, round_to_half_star
+from version_cache import VersionCache
+
+DIRECTIONS = {'up': 1, 'down': -1}
+
+# Matrices kept per dataset version
+_cache: VersionCache['SensitivityMatrix'] = VersionCache()
+
+
+class SensitivityMatrix:
+    """
+    Marginal rating impact of every contract x measure star
+
+    Moving one star changes only that part's weighted sum (by +/- the
+    measure's weight); the total weight is unchanged. So every part's new
+    raw score is (weighted_sum + d * weight) / total_weight for the whole
+    (contracts, measures) grid at once, then CAI and half-star rounding are
+    applied and the baseline rating subtracted. Moves off the 1-5 scale and
+    unrated cells are NaN.
+
+    Attributes:
+        rating_delta: {direction: {part: float32 (contracts, measures)}}
+        raw_delta: {direction: {part: float32 (contracts, measures)}} before rounding
+    """
+
+    def __init__(self, rating_engine):
+        self.engine = rating_engine
+        index = rating_engine.index
+        self.index = index
+        baseline = rating_engine.baseline
+        weights = rating_engine.weights
+        stars = index.stars.astype(np.int16)
+
+        self.rating_delta: Dict[str, Dict[str, np.ndarray]] = {}
+        self.raw_delta: Dict[str, Dict[str, np.ndarray]] = {}
+        for direction, d in DIRECTIONS.items():
+            movable = (stars > 0) & (stars + d >= 1) & (stars + d <= 5)
+            self.rating_delta[direction], self.raw_delta[direction] = {}, {}
+            for part in RATING_PARTS:
+                total = baseline[part]['total_weight'][:, None]
+                w = np.where(rating_engine.masks[part], weights[part], 0.0)[None, :]
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    raw = (baseline[part]['weighted_sum'][:, None] + d * w) / total
+                rating = round_to_half_star(raw + rating_engine.cai[part][:, None])
+                valid = movable & (total > 0)
+                self.raw_delta[direction][part] = np.where(
+                    valid, raw - baseline[part]['raw'][:, None], np.nan).astype(np.float32)
+                self.rating_delta[direction][part] = np.where(
+                    valid, rating - baseline[part]['rating'][:, None], np.nan).astype(np.float32)
+
+        # Cell order per (direction, part): biggest rating change first, then biggest raw change
+        self._order: Dict[tuple, np.ndarray] = {}
+        for direction, d in DIRECTIONS.items():
+            for part in RATING_PARTS:
+                rating = np.nan_to_num(d * self.rating_delta[direction][part].ravel(), nan=-np.inf)
+                raw = np.nan_to_num(d * self.raw_delta[direction][part].ravel(), nan=-np.inf)
+                self._order[direction, part] = np.lexsort((-raw, -rating))
+
+        moves = int(np.isfinite(self.rating_delta['up']['overall']).sum())
+        flips = int((self.rating_delta['up']['overall'] > 0).sum())
+        print(f"✓ Computed sensitivity matrix: {flips} of {moves} one-star gains move the overall rating")
+
+    def _cell(self, r: int, m: int, direction: str) -> Dict:
+        index = self.index
+        return {
+            'contract_id': index.contract_ids[r],
+            'measure_code': index.codes[m],
+            'star': int(index.stars[r, m]),
+            'direction': direction,
+            **{part: json_value(self.rating_delta[direction][part][r, m], 2) for part in RATING_PARTS},
+            **{f'{part}_raw': json_value(self.raw_delta[direction][part][r, m], 6) for part in RATING_PARTS},
+        }
+
+    def ranked(self, part: str = 'overall', direction: str = 'up', contract_id: Optional[str] = None,
+               measure_code: Optional[str] = None, limit: int = 100, offset: int = 0) -> Dict:
+        """
+        Contract x measure moves ranked by impact on one rating
+
+        'up' ranks the biggest gains first, 'down' the biggest losses; ties are
+        broken by the unrounded change.
+
+        Args:
+            part: 'part_c', 'part_d' or 'overall'
+            direction: 'up' or 'down'
+            contract_id: Only this contract's measures
+            measure_code: Only this measure across contracts
+            limit: Page size
+            offset: Rows to skip
+
+        Returns:
+            Dictionary with part, direction, total, offset, limit and rows
+            [{contract_id, measure_code, star, direction, part_c, part_d,
+            overall, part_c_raw, part_d_raw, overall_raw}]
+
+        Raises:
+            ValueError: For unknown parts, directions, measures or bad paging
+            KeyError: If the contract is unknown
+        """
+        if part not in RATING_PARTS:
+            raise ValueError(f"Unknown rating part: {part}")
+        if direction not in DIRECTIONS:
+            raise ValueError(f"Direction must be 'up' or 'down', got '{direction}'")
+        if limit < 1 or offset < 0:
+            raise ValueError("limit must be positive and offset non-negative")
+
+        n_measures = len(self.index.codes)
+        order = self._order[direction, part]
+        keep = np.isfinite(self.rating_delta[direction][part].ravel()[order])
+        if contract_id:
+            r = self.index.row_of.get(contract_id.strip().upper())
+            if r is None:
+                raise KeyError(f"Contract {contract_id} not found")
+            keep &= order // n_measures == r
+        if measure_code:
+            keep &= order % n_measures == self.index.get_column(measure_code)
+        cells = order[keep]
+
+        return {
+            'part': part,
+            'direction': direction,
+            'total': int(len(cells)),
+            'offset': offset,
+            'limit': limit,
+            'rows': [self._cell(int(c // n_measures), int(c % n_measures), direction)
+                     for c in cells[offset:offset + limit]],
+        }
+
+
+def get_sensitivity(rating_engine, dataset_version: str) -> SensitivityMatrix:
+    """Sensitivity matrix for a dataset version, computed once per version"""
+    return _cache.get(dataset_version, rating_engine, lambda: SensitivityMatrix(rating_engine))
+
+
+# Test cases
+if __name__ == "__main__":
+    import time
+    from contract_report import ContractReportGenerator
+    from measure_index import MeasureIndex
+    from rating_engine import RatingEngine
+    from cai_calculator import CAICalculator
+
+    print("Testing sensitivity matrix...")
+
+    generator = ContractReportGenerator()
+    index = MeasureIndex(generator)
+    engine = RatingEngine(index, CAICalculator('2026 Star Ratings Data Table - CAI (Oct 8 2025).csv'))
+
+    start = time.perf_counter()
+    sensitivity = SensitivityMatrix(engine)
+    print(f"✓ Built in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    # Spot-check against full recomputes
+    rng = np.random.default_rng(1)
+    rated = np.argwhere(index.stars > 0)
+    for r, m in rated[rng.choice(len(rated), 200, replace=False)]:
+        for direction, d in DIRECTIONS.items():
+            new_star = index.stars[r, m] + d
+            if not 1 <= new_star <= 5:
+                assert np.isnan(sensitivity.rating_delta[direction]['overall'][r, m])
+                continue
+            stars = index.stars.copy()
+            stars[r, m] = new_star
+            ratings = engine.compute(stars)
+            for part in RATING_PARTS:
+                expected = ratings[part]['rating'][r] - engine.baseline[part]['rating'][r]
+                got = sensitivity.rating_delta[direction][part][r, m]
+                assert (np.isnan(expected) and np.isnan(got)) or abs(expected - got) < 1e-6, (r, m, part)
+    print("✓ Matches full recomputes (weights, CAI, half-star rounding)")
+
+    top = sensitivity.ranked('overall', 'up', limit=5)
+    deltas = [row['overall'] for row in top['rows']]
+    assert deltas == sorted(deltas, reverse=True) and deltas[0] > 0
+    down = sensitivity.ranked('part_c', 'down', contract_id='H0028')
+    assert all(row['contract_id'] == 'H0028' for row in down['rows'])
+    assert down['rows'][0]['part_c'] <= down['rows'][-1]['part_c']
+    print(f"✓ Ranked: {top['rows'][0]['contract_id']} {top['rows'][0]['measure_code']} "
+          f"+1 star -> overall {top['rows'][0]['overall']:+}")
+
+    assert get_sensitivity(engine, 'v1') is get_sensitivity(engine, 'v1')
+    assert get_sensitivity(engine, 'v2') is not get_sensitivity(engine, 'v1')
+    print("✓ Cached per dataset version")
+
+    print("\n✅ All sensitivity tests passed!")
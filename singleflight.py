@@ -0,0 +1,161 @@
+"""
+Single-flight request coalescing
+Concurrent identical computations (same endpoint, params and dataset version) share one in-flight run
+"""
+
+import asyncio
+import json
+import time
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+def flight_key(endpoint: str, params: Optional[Dict] = None, version: Optional[str] = None) -> Hashable:
+    """Key for one computation: endpoint, canonical JSON params and dataset version"""
+    return endpoint, json.dumps(params or {}, sort_keys=True, default=str), version
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key into one computation
+
+    The first caller for a key starts the work in a worker thread (so the event
+    loop keeps serving other requests); callers arriving while it runs await the
+    same result, or the same exception. Nothing is cached: once the computation
+    finishes the key is forgotten and the next call computes again.
+    """
+
+    def __init__(self, version: Optional[str] = None):
+        self.version = version
+        self._flights: Dict[Hashable, asyncio.Future] = {}
+        self._waiters: Dict[Hashable, int] = {}
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.peak_waiters = 0
+        self.by_endpoint: Dict[str, Dict[str, int]] = {}
+        self.started_at = time.time()
+
+    async def do(self, endpoint: str, params: Optional[Dict], fn: Callable, *args, **kwargs) -> Any:
+        """
+        Run fn(*args, **kwargs) once for every concurrent call with the same endpoint and params
+
+        Args:
+            endpoint: Name used in the key and the per-endpoint counters
+            params: JSON-serialisable request parameters
+            fn: Blocking function computing the response
+
+        Returns:
+            fn's result (the same object for every coalesced caller)
+        """
+        key = flight_key(endpoint, params, self.version)
+        counters = self.by_endpoint.setdefault(endpoint, {'calls': 0, 'executions': 0, 'coalesced': 0})
+        self.calls += 1
+        counters['calls'] += 1
+
+        future = self._flights.get(key)
+        if future is None:
+            self.executions += 1
+            counters['executions'] += 1
+            future = asyncio.ensure_future(asyncio.to_thread(fn, *args, **kwargs))
+            self._flights[key] = future
+            self._waiters[key] = 0
+            future.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.coalesced += 1
+            counters['coalesced'] += 1
+
+        self._waiters[key] += 1
+        self.peak_waiters = max(self.peak_waiters, self._waiters[key])
+        # Shield so one client disconnecting does not cancel the shared computation
+        return await asyncio.shield(future)
+
+    def _finish(self, key: Hashable, future: asyncio.Future):
+        self._flights.pop(key, None)
+        self._waiters.pop(key, None)
+        if not future.cancelled() and future.exception() is not None:
+            self.errors += 1
+
+    def stats(self) -> Dict:
+        """Coalescing counters since startup"""
+        return {
+            'calls': self.calls,
+            'executions': self.executions,
+            'coalesced': self.coalesced,
+            'coalesced_ratio': round(self.coalesced / self.calls, 4) if self.calls else 0.0,
+            'errors': self.errors,
+            'in_flight': len(self._flights),
+            'peak_waiters': self.peak_waiters,
+            'dataset_version': self.version,
+            'uptime_seconds': round(time.time() - self.started_at, 1),
+            'endpoints': {name: dict(counts) for name, counts in sorted(self.by_endpoint.items())},
+        }
+
+
+# Test cases
+if __name__ == "__main__":
+    import threading
+
+    print("Testing single-flight coalescing...")
+
+    runs = []
+    release = threading.Event()
+
+    def slow_square(x):
+        runs.append(x)
+        release.wait(5)
+        return {'square': x * x}
+
+    def failing():
+        release.wait(5)
+        raise ValueError("bad input")
+
+    async def main():
+        flight = SingleFlight(version='v1')
+
+        # 50 identical requests share one run; a different param gets its own
+        tasks = [asyncio.create_task(flight.do('square', {'x': 3}, slow_square, 3)) for _ in range(50)]
+        other = asyncio.create_task(flight.do('square', {'x': 4}, slow_square, 4))
+        await asyncio.sleep(0.05)
+        assert flight.stats()['in_flight'] == 2
+        release.set()
+        results = await asyncio.gather(*tasks)
+        assert all(r is results[0] for r in results) and results[0] == {'square': 9}
+        assert (await other) == {'square': 16}
+        assert sorted(runs) == [3, 4]
+        stats = flight.stats()
+        assert stats['executions'] == 2 and stats['coalesced'] == 49 and stats['in_flight'] == 0
+        assert stats['peak_waiters'] == 50
+        print(f"✓ 51 calls -> {stats['executions']} executions ({stats['coalesced']} coalesced)")
+
+        # Finished flights are not cached
+        await flight.do('square', {'x': 3}, slow_square, 3)
+        assert runs.count(3) == 2
+        print("✓ Completed results are not reused")
+
+        # Every waiter sees the exception
+        release.clear()
+        tasks = [asyncio.create_task(flight.do('fail', None, failing)) for _ in range(5)]
+        await asyncio.sleep(0.05)
+        release.set()
+        outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+        assert all(isinstance(e, ValueError) for e in outcomes)
+        assert flight.stats()['errors'] == 1
+        print("✓ Errors propagate to every coalesced caller")
+
+        # A cancelled caller does not cancel the shared run
+        release.clear()
+        first = asyncio.create_task(flight.do('square', {'x': 5}, slow_square, 5))
+        second = asyncio.create_task(flight.do('square', {'x': 5}, slow_square, 5))
+        await asyncio.sleep(0.05)
+        first.cancel()
+        release.set()
+        assert (await second) == {'square': 25}
+        print("✓ Cancelling one caller leaves the others running")
+
+        assert flight_key('a', {'x': 1, 'y': 2}, 'v') == flight_key('a', {'y': 2, 'x': 1}, 'v')
+        assert flight_key('a', {'x': 1}, 'v1') != flight_key('a', {'x': 1}, 'v2')
+        print("✓ Keys ignore param order and include the dataset version")
+
+    asyncio.run(main())
+    print("\n✅ All single-flight tests passed!")
@@ -0,0 +1,162 @@
+"""
+Distance-to-next-star matrix
+Gap to the next star and margin above the current band floor for every contract x measure
+"""
+
+import numpy as np
+from typing import Dict, List, Optional
+
+from rating_engine import json_value
+
+
+class StarGaps:
+    """
+    Precomputed improvement gaps for a MeasureIndex
+
+    gap_to_next is how far performance must improve to reach the next star,
+    measured to that band's own entry edge (its lower edge, or upper edge for
+    inverse measures) rather than the current band's far edge, so exact-value
+    bands ("100%") and open-ended bands resolve correctly. next_inclusive says
+    whether reaching the edge is enough or it must be passed. margin_above_floor
+    is how far performance can worsen before leaving the current band. Both
+    are float32 in measure units, positive in the improving / worsening
+    direction, and NaN where there is no next star or no floor. A gap that is
+    negative (or zero on an inclusive edge) means the displayed value already
+    qualifies but the published star does not follow it (case-mix adjustment,
+    CAHPS significance testing); those cells are excluded from market rankings.
+    """
+
+    def __init__(self, index):
+        self.index = index
+        cut_points = index.cut_points
+        values = index.values
+        stars = index.stars
+        inverse = index.is_inverse[None, :]
+
+        lower, upper = cut_points.band_edges(stars, index.part_d_set)
+        has_next = (stars > 0) & (stars < 5)
+        next_stars = np.where(has_next, stars + 1, 0).astype(np.int8)
+        next_lower, next_upper = cut_points.band_edges(next_stars, index.part_d_set)
+        next_lower_inc, next_upper_inc = cut_points.band_inclusive(next_stars, index.part_d_set)
+
+        # Entry edge of the next band, falling back to the current band's far edge
+        next_edge = np.where(inverse, next_upper, next_lower)
+        next_edge = np.where(np.isnan(next_edge), np.where(inverse, lower, upper), next_edge)
+        next_edge[~has_next] = np.nan
+        self.next_threshold = next_edge.astype(np.float32)
+        self.next_inclusive = np.where(inverse, next_upper_inc, next_lower_inc) & ~np.isnan(next_edge)
+
+        self.gap_to_next = np.where(inverse, values - next_edge, next_edge - values).astype(np.float32)
+        self.margin_above_floor = np.where(inverse, upper - values, values - lower).astype(np.float32)
+
+        # Gaps in standard deviations of each measure, for ranking across measures
+        with np.errstate(invalid='ignore'):
+            self.scaled_gap = (self.gap_to_next / index.measure_spread()[None, :]).astype(np.float32)
+            rankable = (self.gap_to_next > 0) | ((self.gap_to_next == 0) & ~self.next_inclusive)
+
+        # Presorted (row, column) order: all cells by scaled gap, and per measure by gap
+        rows, cols = np.nonzero(rankable)
+        order = np.lexsort((index.contract_ids[rows], self.scaled_gap[rows, cols]))
+        self._market_order = (rows[order], cols[order])
+        self._measure_order = []
+        for m in range(len(index.codes)):
+            col_rows = np.flatnonzero(rankable[:, m])
+            self._measure_order.append(
+                col_rows[np.lexsort((index.contract_ids[col_rows], self.gap_to_next[col_rows, m]))]
+            )
+
+        print(f"✓ Computed star gaps: {int(rankable.sum())} of {stars.size} contract-measures below their next star")
+
+    def _row(self, contract_id: str) -> int:
+        r = self.index.row_of.get(str(contract_id).strip())
+        if r is None:
+            raise ValueError(f"Contract {contract_id} not found")
+        return r
+
+    def _cell(self, r: int, m: int) -> Dict:
+        return {
+            'gap_to_next': json_value(self.gap_to_next[r, m]),
+            'next_threshold': json_value(self.next_threshold[r, m]),
+            'next_inclusive': bool(self.next_inclusive[r, m]),
+            'margin_above_floor': json_value(self.margin_above_floor[r, m]),
+        }
+
+    def contract_gaps(self, contract_id: str) -> Dict[str, Dict]:
+        """
+        One contract's gaps by measure code
+
+        Returns:
+            Dictionary {code: {gap_to_next, next_threshold, next_inclusive, margin_above_floor}}
+        """
+        r = self._row(contract_id)
+        return {code: self._cell(r, m) for m, code in enumerate(self.index.codes)}
+
+    def smallest_gaps(self, measure_code: Optional[str] = None, limit: int = 100, offset: int = 0) -> Dict:
+        """
+        Contract-measures closest to their next star, across the market
+
+        Args:
+            measure_code: Rank one measure by gap in measure units (default: all
+                measures, ranked by gap in standard deviations)
+            limit: Maximum rows returned
+            offset: Rows to skip
+
+        Returns:
+            Dictionary with total and gaps [{contract_id, measure_code, star,
+            performance, gap_to_next, scaled_gap, next_threshold, next_inclusive,
+            margin_above_floor}]
+
+        Raises:
+            ValueError: For unknown measures or a negative offset
+        """
+        if offset < 0:
+            raise ValueError("offset must be non-negative")
+        if measure_code is None:
+            rows, cols = self._market_order
+        else:
+            m = self.index.get_column(measure_code)
+            rows = self._measure_order[m]
+            cols = np.full(len(rows), m)
+
+        page = slice(offset, offset + max(1, min(int(limit), 1000)))
+        gaps: List[Dict] = []
+        for r, m in zip(rows[page], cols[page]):
+            gaps.append({
+                'contract_id': self.index.contract_ids[r],
+                'measure_code': self.index.codes[m],
+                'star': int(self.index.stars[r, m]),
+                'performance': json_value(self.index.values[r, m]),
+                'scaled_gap': json_value(self.scaled_gap[r, m], 4),
+                **self._cell(r, m),
+            })
+        return {'measure_code': measure_code, 'total': int(len(rows)), 'gaps': gaps}
+
+
+# Test cases
+if __name__ == "__main__":
+    from contract_report import ContractReportGenerator
+    from measure_index import MeasureIndex
+
+    print("Testing star gaps...")
+    index = MeasureIndex(ContractReportGenerator())
+    gaps = StarGaps(index)
+
+    # Moving by exactly the gap reaches the next star (or sits on its edge if exclusive)
+    rows, cols = np.nonzero(gaps.gap_to_next > 0)
+    for r, m in zip(rows, cols):
+        target = round(float(gaps.next_threshold[r, m]), 6)
+        star = index.cut_points.assign_star(m, target, index.part_d_set[r])
+        if gaps.next_inclusive[r, m]:
+            assert star == index.stars[r, m] + 1, (index.contract_ids[r], index.codes[m], target, star)
+    print(f"✓ Next thresholds land in the next band ({len(rows)} cells)")
+
+    assert np.isnan(gaps.gap_to_next[index.stars == 5]).all()
+    assert np.isnan(gaps.gap_to_next[index.stars == 0]).all()
+    assert np.isnan(gaps.margin_above_floor[index.stars == 1]).all()
+    print("✓ No gap at 5⭐ or unrated, no floor at 1⭐")
+
+    first = gaps.smallest_gaps('C01', limit=5)['gaps']
+    assert [g['gap_to_next'] for g in first] == sorted(g['gap_to_next'] for g in first)
+    print("✓ Market ranking is sorted")
+
+    print("\n✅ All star gap tests passed!")
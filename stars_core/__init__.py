@@ -0,0 +1,24 @@
+"""
+Lightweight stars core
+Star lookups, what-ifs and single-contract reports from a precompiled dataset, without pandas or numpy
+"""
+
+from stars_core.dataset import (
+    CoreDataset,
+    MeasureLine,
+    DEFAULT_CORE_PATH,
+    PART_D_SETS,
+    RATING_PARTS,
+    load_core,
+    round_half_star,
+)
+
+__all__ = [
+    'CoreDataset',
+    'MeasureLine',
+    'DEFAULT_CORE_PATH',
+    'PART_D_SETS',
+    'RATING_PARTS',
+    'load_core',
+    'round_half_star',
+]
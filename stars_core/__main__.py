@@ -0,0 +1,140 @@
+"""
+Stars core command line
+python -m stars_core {build,star,report,whatif,check} without importing pandas (except build and check)
+"""
+
+import argparse
+import json
+import sys
+import time
+from dataclasses import asdict
+
+from measure_config import DOMAIN_NAMES
+from stars_core.dataset import DEFAULT_CORE_PATH, PART_D_SETS, RATING_PARTS, load_core
+
+
+def print_report(report):
+    """Print a contract report"""
+    info = report['contract_info']
+    print(f"\n{info['contract_id']} - {str(info['marketing_name']).strip()} ({str(info['org_type']).strip()})")
+    print(f"Parent Organization: {str(info['parent_org']).strip()} | Part D thresholds: {report['part_d_set']}")
+    ratings = report['cai_adjusted_ratings']
+    print("Ratings: " + " | ".join(f"{part}: {ratings[part]['rating']} (CAI {ratings[part]['cai']:+.6f})"
+                                   for part in RATING_PARTS if ratings[part]['cai'] is not None))
+
+    domain = None
+    for line in report['measure_lines']:
+        if line.domain != domain:
+            domain = line.domain
+            print(f"\n{domain}: {DOMAIN_NAMES.get(domain, domain)}")
+        star = f"{line.star_rating}⭐" if line.star_rating else '-'
+        print(f"  {line.measure_code} {line.measure_name[:44]:<44} {star:<4} {line.performance_value:<32.32} "
+              f"{line.threshold_band}")
+
+
+def check(core) -> int:
+    """Compare every contract against the pandas path; returns the number of mismatches"""
+    from contract_report import ContractReportGenerator
+    from measure_index import MeasureIndex
+    from rating_engine import RatingEngine
+    from cai_calculator import CAICalculator
+    from stars_core.build import CAI_PATH
+
+    generator = ContractReportGenerator()
+    index = MeasureIndex(generator)
+    cai_calculator = CAICalculator(CAI_PATH)
+    engine = RatingEngine(index, cai_calculator)
+
+    mismatches = 0
+    for contract_id in core.contract_ids():
+        expected, got = generator.generate_report(contract_id), core.report(contract_id)
+        if (got['measure_lines'] != expected['measure_lines'] or got['contract_info'] != expected['contract_info']
+                or got['part_d_set'] != expected['part_d_set']
+                or got['cai_adjusted_ratings'] != engine.contract_ratings(contract_id)
+                or got['cai'] != cai_calculator.get_cai_for_contract(contract_id)):
+            mismatches += 1
+            print(f"✗ {contract_id} differs")
+
+    for m, code in enumerate(index.codes):
+        for set_idx, part_d_set in enumerate(PART_D_SETS):
+            for value in index.values[:, m]:
+                if core.assign_star(code, float(value), part_d_set) != index.cut_points.assign_star(m, float(value), set_idx):
+                    mismatches += 1
+                    print(f"✗ {code} {part_d_set} star for {value} differs")
+                    break
+    return mismatches
+
+
+def main():
+    """Main entry point"""
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--core', default=DEFAULT_CORE_PATH, help="compiled dataset (default %(default)s)")
+    common.add_argument('--json', action='store_true', help="print JSON")
+    parser = argparse.ArgumentParser(prog='python -m stars_core',
+                                     description="Star lookups, what-ifs and reports without pandas")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    commands.add_parser('build', parents=[common], help="compile the CSVs (imports pandas)")
+    star = commands.add_parser('star', parents=[common], help="star for a performance value")
+    star.add_argument('measure_code')
+    star.add_argument('value', type=float)
+    star.add_argument('--set', choices=PART_D_SETS, default='MA-PD', help="Part D threshold set")
+    report = commands.add_parser('report', parents=[common], help="single-contract report")
+    report.add_argument('contract_id')
+    whatif = commands.add_parser('whatif', parents=[common], help="ratings after changing measure values (C12=80 D08=90)")
+    whatif.add_argument('contract_id')
+    whatif.add_argument('changes', nargs='+', metavar='CODE=VALUE')
+    commands.add_parser('check', parents=[common], help="verify the compiled dataset against the pandas path")
+    args = parser.parse_args()
+
+    try:
+        if args.command == 'build':
+            from stars_core.build import build_core_dataset
+            build_core_dataset(args.core)
+            return
+
+        start = time.perf_counter()
+        core = load_core(args.core)
+
+        if args.command == 'star':
+            result = core.assign_star(args.measure_code, args.value, args.set)
+            print(json.dumps({'measure_code': args.measure_code.upper(), 'value': args.value, 'star': result})
+                  if args.json else f"{args.measure_code.upper()} {args.value} ({args.set}): {result or 'no'}⭐")
+        elif args.command == 'report':
+            result = core.report(args.contract_id)
+            if args.json:
+                print(json.dumps({**result, 'measure_lines': [asdict(line) for line in result['measure_lines']]},
+                                 indent=2, default=str))
+            else:
+                print_report(result)
+        elif args.command == 'whatif':
+            changes = {}
+            for change in args.changes:
+                code, sep, value = change.partition('=')
+                if not sep:
+                    raise ValueError(f"Changes must look like C12=80, got '{change}'")
+                changes[code] = float(value) if value.strip() else None
+            result = core.whatif(args.contract_id, changes)
+            if args.json:
+                print(json.dumps(result, indent=2))
+            else:
+                for code, change in result['measures'].items():
+                    print(f"{code} = {change['value']}: {change['star_before'] or '-'}⭐ -> {change['star_after'] or '-'}⭐")
+                for part, rating in result['ratings'].items():
+                    print(f"{part:<8} {rating['before']} -> {rating['after']}")
+        elif args.command == 'check':
+            mismatches = check(core)
+            if mismatches:
+                print(f"✗ {mismatches} mismatches")
+                sys.exit(1)
+            print(f"✓ {len(core.contracts)} contracts and every measure's star lookup match the pandas path")
+
+        if not args.json and args.command != 'check':
+            print(f"\n({(time.perf_counter() - start) * 1000:.0f} ms, pandas imported: {'pandas' in sys.modules})")
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
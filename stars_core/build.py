@@ -0,0 +1,113 @@
+"""
+Precompiled dataset builder
+Runs the pandas loaders once and writes everything the core reader needs to stars_core.json
+"""
+
+import json
+import math
+import os
+import time
+from typing import Dict, Optional
+
+from contract_report import CAI_PATH
+from stars_core.dataset import CORE_FORMAT, DEFAULT_CORE_PATH, PART_D_SETS, RATING_PARTS
+
+
+def _plain(value):
+    """numpy scalars -> Python, NaN -> None (JSON has no NaN)"""
+    if hasattr(value, 'item'):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def build_core_dataset(path: str = DEFAULT_CORE_PATH, cai_path: str = CAI_PATH) -> Dict:
+    """
+    Compile the Star Ratings CSVs into the core JSON format
+
+    Imports pandas (through contract_report); nothing else in stars_core does.
+
+    Args:
+        path: Output path
+        cai_path: CAI Data Table CSV
+
+    Returns:
+        Dictionary with path, contracts, bytes and seconds
+    """
+    from contract_report import ContractReportGenerator
+    from cai_calculator import CAICalculator
+    from dataset_version import dataset_inputs, dataset_version
+    from measure_index import MeasureIndex
+    from rating_engine import RatingEngine
+
+    start = time.perf_counter()
+    # Same inputs and version hash as the API (dataset_version.py)
+    inputs = dataset_inputs(cai_path=cai_path)
+    stats = {source: os.stat(source) for source in inputs.values()}
+
+    generator = ContractReportGenerator()
+    index = MeasureIndex(generator)
+    cai_calculator = CAICalculator(cai_path)
+    engine = RatingEngine(index, cai_calculator)
+    weights = engine.weights
+    cut_points = index.cut_points
+
+    contracts: Dict[str, Dict] = {}
+    errors: Dict[str, str] = {}
+    for contract_id in generator.list_contracts():
+        try:
+            report = generator.generate_report(contract_id)
+        except ValueError as e:
+            errors[contract_id] = str(e)
+            continue
+        r: Optional[int] = index.row_of.get(contract_id)
+        cai = {part: float(engine.cai[part][r]) if r is not None else 0.0 for part in RATING_PARTS}
+        stars = [0] * len(index.codes)
+        lines = []
+        for line in report['measure_lines']:
+            m = index.col_of[line.measure_code]
+            stars[m] = line.star_rating or 0
+            lines.append([m, line.performance_value, _plain(line.performance_numeric), line.star_rating,
+                          line.special_category if line.is_special else None])
+        contracts[contract_id] = {
+            'info': {key: _plain(value) for key, value in report['contract_info'].items()},
+            'part_d_set': PART_D_SETS.index(report['part_d_set']),
+            'lines': lines,
+            'stars': stars,
+            'cai': cai,
+            'cai_detail': {key: _plain(value) for key, value in cai_calculator.get_cai_for_contract(contract_id).items()},
+        }
+
+    data = {
+        'format': CORE_FORMAT,
+        'built_at': time.time(),
+        'dataset_hash': dataset_version(inputs),
+        'sources': {source: {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns} for source, stat in stats.items()},
+        'codes': list(index.codes),
+        'weights': {part: [float(w) for w in weights[part]] for part in RATING_PARTS},
+        'masks': {part: [bool(x) for x in engine.masks[part]] for part in RATING_PARTS},
+        'cut_points': {
+            'lower': [[[_plain(v) for v in row] for row in s] for s in cut_points.lower],
+            'upper': [[[_plain(v) for v in row] for row in s] for s in cut_points.upper],
+            'lower_inclusive': cut_points.lower_inclusive.tolist(),
+            'upper_inclusive': cut_points.upper_inclusive.tolist(),
+            'band_text': cut_points.band_text.tolist(),
+        },
+        'contracts': contracts,
+        'errors': errors,
+    }
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+    result = {
+        'path': path,
+        'contracts': len(contracts),
+        'bytes': os.path.getsize(path),
+        'seconds': round(time.perf_counter() - start, 2),
+    }
+    print(f"✓ Compiled {result['contracts']} contracts to {path} ({result['bytes'] / 1024:.0f} KB)")
+    return result
@@ -0,0 +1,299 @@
+"""
+Precompiled dataset reader
+Standard-library-only star lookups, ratings, what-ifs and contract reports over stars_core.json
+"""
+
+import json
+import math
+import os
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from measure_config import MEASURE_CONFIGS
+
+DEFAULT_CORE_PATH = 'stars_core.json'
+
+# Bumped whenever the compiled layout changes (older files are rebuilt)
+CORE_FORMAT = 3
+
+RATING_PARTS = ('part_c', 'part_d', 'overall')
+PART_D_SETS = ['MA-PD', 'PDP']
+
+
+@dataclass
+class MeasureLine:
+    """Data for one measure in the report"""
+    measure_code: str
+    measure_name: str
+    star_rating: Optional[int]
+    performance_value: str
+    performance_numeric: Optional[float]
+    threshold_band: Optional[str]
+    threshold_lower: Optional[float]
+    threshold_upper: Optional[float]
+    is_special: bool
+    special_category: Optional[str]
+    domain: str
+
+
+def round_half_star(raw: Optional[float]) -> Optional[float]:
+    """Scalar half-star rounding (same rule as rating_engine.round_to_half_star; None stays None)"""
+    if raw is None or math.isnan(raw):
+        return None
+    return min(max(math.floor(round(raw, 6) * 2 + 0.5) / 2, 0.0), 5.0)
+
+
+def _rounded(value: Optional[float], digits: int = 6) -> Optional[float]:
+    return None if value is None else round(value, digits)
+
+
+class CoreDataset:
+    """
+    Star Ratings data compiled to plain lists and dicts
+
+    Holds, per contract, the Summary Ratings fields, Part D threshold set,
+    per-measure display value, numeric value, star and special category, and
+    the CAI per part; plus the compiled cut point bands and per-part weights.
+    Everything a single-contract report or what-if needs, without pandas or numpy.
+    """
+
+    def __init__(self, data: Dict, path: Optional[str] = None):
+        self.path = path
+        self.sources: Dict[str, Dict] = data['sources']
+        self.dataset_hash: str = data['dataset_hash']
+        self.codes: List[str] = data['codes']
+        self.col_of = {code: m for m, code in enumerate(self.codes)}
+        self.weights: Dict[str, List[float]] = data['weights']
+        self.masks: Dict[str, List[bool]] = data['masks']
+        self.cut_points: Dict[str, List] = data['cut_points']
+        self.contracts: Dict[str, Dict] = data['contracts']
+        self.errors: Dict[str, str] = data.get('errors', {})
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_CORE_PATH) -> 'CoreDataset':
+        """Read a compiled dataset (does not check it against the source CSVs)"""
+        with open(path) as f:
+            data = json.load(f)
+        if data.get('format') != CORE_FORMAT:
+            raise ValueError(f"{path} is core format {data.get('format')}, expected {CORE_FORMAT}")
+        return cls(data, path)
+
+    def is_stale(self) -> bool:
+        """Whether any source CSV changed size or modification time since the build"""
+        for path, stat in self.sources.items():
+            try:
+                current = os.stat(path)
+            except OSError:
+                return True
+            if current.st_size != stat['size'] or current.st_mtime_ns != stat['mtime_ns']:
+                return True
+        return False
+
+    def contract_ids(self) -> List[str]:
+        """Contract IDs in Summary Ratings order"""
+        return list(self.contracts)
+
+    def _contract(self, contract_id: str) -> Dict:
+        contract_id = str(contract_id).strip()
+        contract = self.contracts.get(contract_id)
+        if contract is None:
+            raise ValueError(self.errors.get(contract_id, f"Contract {contract_id} not found"))
+        return contract
+
+    def _column(self, measure_code: str) -> int:
+        m = self.col_of.get(str(measure_code).strip().upper())
+        if m is None:
+            raise ValueError(f"Unknown measure code: {measure_code}")
+        return m
+
+    def _band(self, set_idx: int, star: int, m: int) -> Dict:
+        s = star - 1
+        return {key: self.cut_points[key][set_idx][s][m]
+                for key in ('lower', 'upper', 'lower_inclusive', 'upper_inclusive', 'band_text')}
+
+    def assign_star(self, measure_code: str, value: Optional[float], part_d_set: str = 'MA-PD') -> Optional[int]:
+        """
+        Star for a performance value (same band rules as CompiledCutPoints.assign_star)
+
+        Raises:
+            ValueError: For unknown measure codes or threshold sets
+        """
+        m = self._column(measure_code)
+        if part_d_set not in PART_D_SETS:
+            raise ValueError(f"Threshold set must be one of {PART_D_SETS}, got '{part_d_set}'")
+        if value is None or math.isnan(value):
+            return None
+        set_idx = PART_D_SETS.index(part_d_set)
+        for star in range(5, 0, -1):
+            band = self._band(set_idx, star, m)
+            lower, upper = band['lower'], band['upper']
+            if lower is None and upper is None:
+                continue
+            if lower is not None and (value < lower or (value == lower and not band['lower_inclusive'])):
+                continue
+            if upper is not None and (value > upper or (value == upper and not band['upper_inclusive'])):
+                continue
+            return star
+        return None
+
+    def bands(self, measure_code: str, part_d_set: str = 'MA-PD') -> List[Dict]:
+        """Band list (1-5 stars) for one measure"""
+        m = self._column(measure_code)
+        set_idx = PART_D_SETS.index(part_d_set)
+        result = []
+        for star in range(1, 6):
+            band = self._band(set_idx, star, m)
+            result.append({'star': star, 'band': band['band_text'], 'lower': band['lower'], 'upper': band['upper']})
+        return result
+
+    def ratings(self, contract_id: str, stars: Optional[List[int]] = None) -> Dict[str, Dict]:
+        """
+        Part C, Part D and Overall ratings (same rules and output as RatingEngine.contract_ratings)
+
+        Args:
+            contract_id: Contract to rate
+            stars: Star per measure column (0 = not rated); defaults to the published stars
+
+        Returns:
+            {part: {'raw', 'cai', 'adjusted', 'rating'}} (None where unrated)
+        """
+        contract = self._contract(contract_id)
+        stars = contract['stars'] if stars is None else stars
+
+        sums = {}
+        for part in RATING_PARTS:
+            weighted_sum = total = 0.0
+            for m, star in enumerate(stars):
+                if star > 0 and self.masks[part][m]:
+                    weighted_sum += star * self.weights[part][m]
+                    total += self.weights[part][m]
+            sums[part] = (weighted_sum, total)
+
+        # Overall rating only exists when both summaries do
+        if sums['part_c'][1] == 0 or sums['part_d'][1] == 0:
+            sums['overall'] = (0.0, 0.0)
+
+        result = {}
+        for part in RATING_PARTS:
+            weighted_sum, total = sums[part]
+            cai = contract['cai'][part]
+            raw = weighted_sum / total if total > 0 else None
+            adjusted = None if raw is None else raw + cai
+            result[part] = {
+                'raw': _rounded(raw),
+                'cai': _rounded(cai),
+                'adjusted': _rounded(adjusted),
+                'rating': round_half_star(adjusted),
+            }
+        return result
+
+    def whatif(self, contract_id: str, changes: Dict[str, Optional[float]]) -> Dict:
+        """
+        Ratings after replacing some measure values
+
+        Args:
+            contract_id: Contract to change
+            changes: Measure code -> new performance value (None clears the measure)
+
+        Returns:
+            Dictionary with contract_id, measures {code: {value, star_before,
+            star_after}} and ratings {part: {before, after}}
+
+        Raises:
+            ValueError: For unknown contracts or measure codes
+        """
+        contract = self._contract(contract_id)
+        part_d_set = PART_D_SETS[contract['part_d_set']]
+        stars = list(contract['stars'])
+        measures = {}
+        for code, value in changes.items():
+            m = self._column(code)
+            value = None if value is None else float(value)
+            star = self.assign_star(code, value, part_d_set)
+            measures[self.codes[m]] = {'value': value, 'star_before': stars[m] or None, 'star_after': star}
+            stars[m] = star or 0
+
+        before, after = self.ratings(contract_id), self.ratings(contract_id, stars)
+        return {
+            'contract_id': str(contract_id).strip(),
+            'measures': measures,
+            'ratings': {part: {'before': before[part]['rating'], 'after': after[part]['rating']}
+                        for part in RATING_PARTS},
+        }
+
+    def report(self, contract_id: str) -> Dict:
+        """
+        Contract report (same contract_info, part_d_set and measure_lines as
+        ContractReportGenerator.generate_report) plus CAI and CAI-adjusted ratings
+
+        Raises:
+            ValueError: If the contract is unknown or has no measure data
+        """
+        contract = self._contract(contract_id)
+        set_idx = contract['part_d_set']
+        lines = []
+        for m, display, numeric, star, special in contract['lines']:
+            code = self.codes[m]
+            config = MEASURE_CONFIGS[code]
+            band_text, lower, upper = 'N/A', None, None
+            if special is None and star:
+                band = self._band(set_idx, star, m)
+                band_text, lower, upper = band['band_text'] or 'N/A', band['lower'], band['upper']
+            lines.append(MeasureLine(
+                measure_code=code,
+                measure_name=config.name,
+                star_rating=star,
+                performance_value=display,
+                performance_numeric=numeric,
+                threshold_band=band_text,
+                threshold_lower=lower,
+                threshold_upper=upper,
+                is_special=special is not None,
+                special_category=special,
+                domain=config.domain,
+            ))
+        return {
+            'contract_info': dict(contract['info']),
+            'part_d_set': PART_D_SETS[set_idx],
+            'measure_lines': lines,
+            'cai': dict(contract['cai_detail']),
+            'cai_adjusted_ratings': self.ratings(contract_id),
+        }
+
+
+_loaded: Dict[str, CoreDataset] = {}
+
+
+def load_core(path: str = DEFAULT_CORE_PATH, rebuild: bool = True) -> CoreDataset:
+    """
+    The compiled dataset, building it first if it is missing, outdated or stale
+
+    Only a (re)build imports pandas; a current compiled file is read with the
+    standard library alone. Loaded datasets are kept per path.
+
+    Args:
+        path: Compiled dataset path
+        rebuild: Build when missing or stale (otherwise raise)
+
+    Raises:
+        FileNotFoundError: If missing and rebuild is False
+        ValueError: If stale or an older format and rebuild is False
+    """
+    dataset = _loaded.get(path)
+    if dataset is not None and not dataset.is_stale():
+        return dataset
+
+    try:
+        dataset = CoreDataset.load(path)
+        if dataset.is_stale():
+            raise ValueError(f"{path} is older than its source CSVs")
+    except (FileNotFoundError, ValueError):
+        if not rebuild:
+            raise
+        from stars_core.build import build_core_dataset
+        build_core_dataset(path)
+        dataset = CoreDataset.load(path)
+
+    _loaded[path] = dataset
+    return dataset
+
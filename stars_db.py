@@ -0,0 +1,726 @@
+"""
+Embedded SQLite store for Star Ratings data
+Schema follows db_structure.md; built from the CMS tables and queried through a connection pool
+"""
+
+import argparse
+import glob
+import os
+import queue
+import sqlite3
+import sys
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from contract_report import (
+    ContractReportGenerator, MeasureLine, threshold_from_cut_points,
+    SUMMARY_PATH, MEASURE_DATA_PATH, MEASURE_STARS_PATH,
+    PART_C_CUT_POINTS_PATH, PART_D_CUT_POINTS_PATH,
+)
+from data_parsers import format_value_for_display
+from ingest import (
+    detect_header_layout, read_chunks, special_codes, parse_measure_values, parse_star_values,
+)
+from measure_config import MEASURE_CONFIGS, DOMAIN_NAMES, get_measure_config
+from measure_index import SPECIAL_CODES
+from weight_profile import current_profile
+
+DEFAULT_DB_PATH = 'stars.db'
+DEFAULT_YEAR = 2026
+DEFAULT_POOL_SIZE = 4
+
+# Cut point categories (Part C measures use 'Part C', Part D measures one row set each)
+PART_D_CATEGORIES = ('MA-PD', 'PDP')
+
+# Source tables by key, matched as "<year> Star Ratings Data Table - <name>*.csv"
+SOURCE_TABLES = {
+    'summary': 'Summary Ratings',
+    'measure_data': 'Measure Data',
+    'measure_stars': 'Measure Stars',
+    'part_c_cut_points': 'Part C Cut Points',
+    'part_d_cut_points': 'Part D Cut Points',
+}
+
+SPECIAL_CATEGORIES = {code: name for name, code in SPECIAL_CODES.items()}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS contracts (
+    contract_id TEXT PRIMARY KEY,
+    organization_type TEXT NOT NULL,
+    contract_name TEXT NOT NULL,
+    organization_marketing_name TEXT,
+    parent_organization TEXT,
+    is_snp INTEGER DEFAULT 0,
+    disaster_pct_prior REAL,
+    disaster_pct REAL,
+    rating_year INTEGER NOT NULL,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_parent_org ON contracts (parent_organization);
+CREATE INDEX IF NOT EXISTS idx_org_type ON contracts (organization_type);
+CREATE INDEX IF NOT EXISTS idx_snp ON contracts (is_snp);
+
+CREATE TABLE IF NOT EXISTS measures (
+    measure_code TEXT PRIMARY KEY,
+    measure_name TEXT NOT NULL,
+    measure_domain TEXT NOT NULL,
+    domain_name TEXT,
+    part_type TEXT NOT NULL CHECK (part_type IN ('C', 'D')),
+    measurement_period TEXT,
+    higher_is_better INTEGER DEFAULT 1,
+    format_type TEXT NOT NULL,
+    weight REAL,
+    display_order INTEGER,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_part_type ON measures (part_type);
+CREATE INDEX IF NOT EXISTS idx_domain ON measures (measure_domain);
+
+CREATE TABLE IF NOT EXISTS cut_points (
+    cut_point_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    measure_code TEXT NOT NULL REFERENCES measures (measure_code),
+    org_type_category TEXT NOT NULL,
+    star_rating INTEGER NOT NULL CHECK (star_rating BETWEEN 1 AND 5),
+    threshold_min REAL,
+    threshold_max REAL,
+    threshold_operator TEXT,
+    rating_year INTEGER NOT NULL,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (measure_code, org_type_category, star_rating, rating_year)
+);
+CREATE INDEX IF NOT EXISTS idx_cut_points_measure_year ON cut_points (measure_code, rating_year);
+
+CREATE TABLE IF NOT EXISTS measure_performance (
+    performance_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    contract_id TEXT NOT NULL REFERENCES contracts (contract_id),
+    measure_code TEXT NOT NULL REFERENCES measures (measure_code),
+    rating_year INTEGER NOT NULL,
+    raw_value REAL,
+    raw_value_display TEXT,
+    star_rating INTEGER CHECK (star_rating IS NULL OR star_rating BETWEEN 1 AND 5),
+    data_status TEXT,
+    special_category TEXT,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (contract_id, measure_code, rating_year)
+);
+CREATE INDEX IF NOT EXISTS idx_contract_year ON measure_performance (contract_id, rating_year);
+CREATE INDEX IF NOT EXISTS idx_measure_year ON measure_performance (measure_code, rating_year);
+CREATE INDEX IF NOT EXISTS idx_star_rating ON measure_performance (star_rating);
+
+CREATE TABLE IF NOT EXISTS summary_ratings (
+    summary_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    contract_id TEXT NOT NULL REFERENCES contracts (contract_id),
+    rating_year INTEGER NOT NULL,
+    part_c_summary REAL CHECK (part_c_summary IS NULL OR part_c_summary BETWEEN 1.0 AND 5.0),
+    part_d_summary REAL CHECK (part_d_summary IS NULL OR part_d_summary BETWEEN 1.0 AND 5.0),
+    overall_rating REAL CHECK (overall_rating IS NULL OR overall_rating BETWEEN 1.0 AND 5.0),
+    part_c_status TEXT,
+    part_d_status TEXT,
+    overall_status TEXT,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (contract_id, rating_year)
+);
+CREATE INDEX IF NOT EXISTS idx_overall_rating ON summary_ratings (overall_rating);
+CREATE INDEX IF NOT EXISTS idx_year ON summary_ratings (rating_year);
+
+CREATE VIEW IF NOT EXISTS view_contract_summary AS
+SELECT
+    c.contract_id,
+    c.organization_type,
+    c.organization_marketing_name,
+    c.parent_organization,
+    c.is_snp,
+    sr.part_c_summary,
+    sr.part_d_summary,
+    sr.overall_rating,
+    sr.rating_year
+FROM contracts c
+LEFT JOIN summary_ratings sr ON c.contract_id = sr.contract_id
+WHERE sr.rating_year = (SELECT MAX(rating_year) FROM summary_ratings);
+
+CREATE VIEW IF NOT EXISTS view_parent_org_performance AS
+SELECT
+    c.parent_organization,
+    sr.rating_year,
+    COUNT(DISTINCT c.contract_id) AS contract_count,
+    AVG(sr.overall_rating) AS avg_overall_rating,
+    AVG(sr.part_c_summary) AS avg_part_c_rating,
+    AVG(sr.part_d_summary) AS avg_part_d_rating,
+    SUM(CASE WHEN sr.overall_rating >= 4.0 THEN 1 ELSE 0 END) AS contracts_4plus_stars,
+    SUM(CASE WHEN sr.overall_rating = 5.0 THEN 1 ELSE 0 END) AS contracts_5_stars
+FROM contracts c
+JOIN summary_ratings sr ON c.contract_id = sr.contract_id
+WHERE sr.overall_rating IS NOT NULL
+GROUP BY c.parent_organization, sr.rating_year;
+"""
+
+
+class ConnectionPool:
+    """
+    Fixed-size pool of SQLite connections
+
+    Connections are opened once and handed out one at a time, so concurrent
+    requests each get their own connection without paying connect/prepare
+    costs on every query.
+    """
+
+    def __init__(self, db_path: str, size: int = DEFAULT_POOL_SIZE, read_only: bool = True):
+        self.db_path = db_path
+        self._pool: "queue.Queue[sqlite3.Connection]" = queue.Queue(maxsize=size)
+        uri = f"file:{db_path}?mode=ro" if read_only else f"file:{db_path}"
+        for _ in range(size):
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            self._pool.put(conn)
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection (blocks while all are in use)"""
+        conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    def close(self):
+        """Close every pooled connection"""
+        while not self._pool.empty():
+            self._pool.get_nowait().close()
+
+
+def find_source_files(directory: str, year: int) -> Dict[str, str]:
+    """
+    Locate one year's CMS tables in a directory
+
+    Returns:
+        Dictionary of SOURCE_TABLES key -> path
+
+    Raises:
+        FileNotFoundError: If a table is missing
+    """
+    paths = {}
+    for key, name in SOURCE_TABLES.items():
+        matches = sorted(glob.glob(os.path.join(directory, f"{year} Star Ratings Data Table - {name}*.csv")))
+        if not matches:
+            raise FileNotFoundError(f"No {year} {name} table in {directory or '.'}")
+        paths[key] = matches[-1]
+    return paths
+
+
+def _rating_or_status(cells: pd.Series):
+    """Summary cells as (rating or None, status text) pairs"""
+    ratings = pd.to_numeric(cells, errors='coerce')
+    return [
+        (None, cell) if np.isnan(rating) else (float(rating), 'Valid')
+        for rating, cell in zip(ratings.to_numpy(dtype=float), cells)
+    ]
+
+
+def _insert_contracts(conn: sqlite3.Connection, path: str, year: int) -> int:
+    """Contracts and summary ratings from a Summary Ratings table"""
+    layout = detect_header_layout(path)
+    count = 0
+    for chunk in read_chunks(path, layout):
+        chunk = chunk.reindex(columns=range(11), fill_value='').apply(lambda col: col.str.strip())
+        disaster = [pd.to_numeric(chunk[col], errors='coerce').astype(object) for col in (6, 7)]
+        conn.executemany(
+            """INSERT INTO contracts (contract_id, organization_type, contract_name,
+                   organization_marketing_name, parent_organization, is_snp,
+                   disaster_pct_prior, disaster_pct, rating_year)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT (contract_id) DO UPDATE SET
+                   organization_type = excluded.organization_type,
+                   contract_name = excluded.contract_name,
+                   organization_marketing_name = excluded.organization_marketing_name,
+                   parent_organization = excluded.parent_organization,
+                   is_snp = excluded.is_snp,
+                   disaster_pct_prior = excluded.disaster_pct_prior,
+                   disaster_pct = excluded.disaster_pct,
+                   rating_year = excluded.rating_year,
+                   updated_at = CURRENT_TIMESTAMP
+               WHERE excluded.rating_year >= contracts.rating_year""",
+            [
+                (cid, org, name, marketing, parent, int(snp.lower() == 'yes'),
+                 None if pd.isna(d1) else d1, None if pd.isna(d2) else d2, year)
+                for cid, org, name, marketing, parent, snp, d1, d2 in zip(
+                    chunk[0], chunk[1], chunk[2], chunk[3], chunk[4], chunk[5], *disaster)
+            ],
+        )
+        parts = [_rating_or_status(chunk[col]) for col in (8, 9, 10)]
+        conn.executemany(
+            """INSERT INTO summary_ratings (contract_id, rating_year, part_c_summary, part_d_summary,
+                   overall_rating, part_c_status, part_d_status, overall_status)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+            [(cid, year, c[0], d[0], o[0], c[1], d[1], o[1])
+             for cid, c, d, o in zip(chunk[0], *parts)],
+        )
+        count += len(chunk)
+    return count
+
+
+def _insert_measures(conn: sqlite3.Connection, measure_data_path: str):
+    """Measure definitions, with names and periods from the Measure Data header"""
+    layout = detect_header_layout(measure_data_path)
+    for order, (col, code) in enumerate(sorted(layout.measure_codes.items())):
+        if code not in MEASURE_CONFIGS:
+            continue
+        config = MEASURE_CONFIGS[code]
+        conn.execute(
+            """INSERT OR REPLACE INTO measures (measure_code, measure_name, measure_domain, domain_name,
+                   part_type, measurement_period, higher_is_better, format_type, weight, display_order)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            (code, config.name, config.domain, DOMAIN_NAMES.get(config.domain), config.part_type,
+             layout.periods.get(col), int(not config.is_inverse), config.format_type,
+             current_profile().weight(code), order),
+        )
+
+
+def _insert_cut_points(conn: sqlite3.Connection, part_c_path: str, part_d_path: str, year: int) -> int:
+    """One row per measure x category x star, with the band as the report displays it"""
+    df_c = pd.read_csv(part_c_path)
+    df_d = pd.read_csv(part_d_path)
+    rows = []
+    for code, config in MEASURE_CONFIGS.items():
+        categories = ('Part C',) if config.part_type == 'C' else PART_D_CATEGORIES
+        for category in categories:
+            for star in range(1, 6):
+                band, lower, upper = threshold_from_cut_points(df_c, df_d, code, star, category)
+                if band is None:
+                    continue
+                rows.append((code, category, star, lower, upper, band, year))
+    conn.executemany(
+        """INSERT INTO cut_points (measure_code, org_type_category, star_rating, threshold_min,
+               threshold_max, threshold_operator, rating_year)
+           VALUES (?, ?, ?, ?, ?, ?, ?)""",
+        rows,
+    )
+    return len(rows)
+
+
+def _insert_performance(conn: sqlite3.Connection, measure_data_path: str,
+                        measure_stars_path: str, year: int) -> int:
+    """Raw values from Measure Data, then stars from Measure Stars, streamed in chunks"""
+    layout = detect_header_layout(measure_data_path)
+    measure_cols = [col for col, code in layout.measure_codes.items() if code in MEASURE_CONFIGS]
+    codes = [layout.measure_codes[col] for col in measure_cols]
+    formats = [MEASURE_CONFIGS[code].format_type for code in codes]
+
+    count = 0
+    for chunk in read_chunks(measure_data_path, layout):
+        contract_ids = chunk[0].str.strip().tolist()
+        rows = []
+        for col, code, format_type in zip(measure_cols, codes, formats):
+            cells = chunk.reindex(columns=[col], fill_value='')[col].str.strip()
+            special = special_codes(cells)
+            values = parse_measure_values(cells, format_type)
+            for cid, cell, value, spec in zip(contract_ids, cells, values, special):
+                if spec:
+                    rows.append((cid, code, year, None, cell, cell, SPECIAL_CATEGORIES[spec]))
+                else:
+                    rows.append((cid, code, year, None if np.isnan(value) else float(value),
+                                 cell, 'Valid', None))
+        conn.executemany(
+            """INSERT INTO measure_performance (contract_id, measure_code, rating_year, raw_value,
+                   raw_value_display, data_status, special_category)
+               VALUES (?, ?, ?, ?, ?, ?, ?)""",
+            rows,
+        )
+        count += len(rows)
+
+    layout = detect_header_layout(measure_stars_path)
+    star_cols = [(col, code) for col, code in layout.measure_codes.items() if code in MEASURE_CONFIGS]
+    for chunk in read_chunks(measure_stars_path, layout):
+        contract_ids = chunk[0].str.strip().tolist()
+        updates = []
+        for col, code in star_cols:
+            cells = chunk.reindex(columns=[col], fill_value='')[col].str.strip()
+            stars = np.where(special_codes(cells) > 0, 0, parse_star_values(cells))
+            updates.extend((int(star), cid, code, year)
+                           for cid, star in zip(contract_ids, stars) if star)
+        conn.executemany(
+            """UPDATE measure_performance SET star_rating = ?
+               WHERE contract_id = ? AND measure_code = ? AND rating_year = ?""",
+            updates,
+        )
+    return count
+
+
+def build_database(db_path: str = DEFAULT_DB_PATH, year: int = DEFAULT_YEAR,
+                   paths: Optional[Dict[str, str]] = None) -> Dict[str, int]:
+    """
+    Build (or refresh one year of) the SQLite store from the CMS tables
+
+    Rows already stored for the year are replaced; other years are kept, so
+    the store can hold many rating years.
+
+    Args:
+        db_path: SQLite file to create or update
+        year: Rating year of the source tables
+        paths: SOURCE_TABLES key -> path (defaults to the tables contract_report loads)
+
+    Returns:
+        Row counts by table
+    """
+    paths = paths or {
+        'summary': SUMMARY_PATH,
+        'measure_data': MEASURE_DATA_PATH,
+        'measure_stars': MEASURE_STARS_PATH,
+        'part_c_cut_points': PART_C_CUT_POINTS_PATH,
+        'part_d_cut_points': PART_D_CUT_POINTS_PATH,
+    }
+
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.executescript(SCHEMA)
+        with conn:
+            for table in ('measure_performance', 'cut_points', 'summary_ratings'):
+                conn.execute(f"DELETE FROM {table} WHERE rating_year = ?", (year,))
+            counts = {
+                'contracts': _insert_contracts(conn, paths['summary'], year),
+                'cut_points': _insert_cut_points(conn, paths['part_c_cut_points'],
+                                                 paths['part_d_cut_points'], year),
+            }
+            _insert_measures(conn, paths['measure_data'])
+            counts['measure_performance'] = _insert_performance(
+                conn, paths['measure_data'], paths['measure_stars'], year
+            )
+        conn.execute("ANALYZE")
+    finally:
+        conn.close()
+
+    print(f"✓ Built {db_path} ({year}): {counts['contracts']} contracts, "
+          f"{counts['measure_performance']} measure rows, {counts['cut_points']} cut points")
+    return counts
+
+
+def _rating_text(rating: Optional[float], status: Optional[str]):
+    """Summary rating as the CSV shows it ("3.5", "3", or the status text)"""
+    return f"{rating:g}" if rating is not None else status
+
+
+class DatabaseReportGenerator(ContractReportGenerator):
+    """
+    ContractReportGenerator backed by the SQLite store
+
+    Nothing is loaded up front; every report and cross-contract query is an
+    index lookup through the connection pool.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, year: Optional[int] = None,
+                 pool_size: int = DEFAULT_POOL_SIZE):
+        if not os.path.exists(db_path):
+            raise FileNotFoundError(f"{db_path} not found (run: python stars_db.py build --db {db_path})")
+        self.pool = ConnectionPool(db_path, pool_size)
+
+        with self.pool.connection() as conn:
+            self.years = [row[0] for row in conn.execute(
+                "SELECT DISTINCT rating_year FROM summary_ratings ORDER BY rating_year"
+            )]
+            if not self.years:
+                raise ValueError(f"{db_path} has no rating years")
+            self.year = year if year is not None else self.years[-1]
+            if self.year not in self.years:
+                raise ValueError(f"Rating year {self.year} not in {db_path}")
+            self.measure_columns = [
+                f"{row['measure_code']}: {row['measure_name']}"
+                for row in conn.execute("SELECT measure_code, measure_name FROM measures ORDER BY display_order")
+            ]
+            contracts = conn.execute(
+                "SELECT COUNT(*) FROM summary_ratings WHERE rating_year = ?", (self.year,)
+            ).fetchone()[0]
+
+        print(f"✓ Opened {db_path}: {contracts} contracts, {len(self.measure_columns)} measures ({self.year})")
+
+    def close(self):
+        """Close pooled connections"""
+        self.pool.close()
+
+    def _query(self, sql: str, params: tuple = ()) -> List[sqlite3.Row]:
+        with self.pool.connection() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def get_threshold_for_measure(self, measure_code: str, star_rating: int,
+                                  part_d_set: str = 'MA-PD'):
+        """
+        Get threshold band for a measure at given star rating
+
+        Returns:
+            Tuple of (formatted_string, lower_bound, upper_bound) or (None, None, None)
+        """
+        config = get_measure_config(measure_code)
+        category = 'Part C' if config.part_type == 'C' else part_d_set
+        rows = self._query(
+            """SELECT threshold_operator, threshold_min, threshold_max FROM cut_points
+               WHERE measure_code = ? AND org_type_category = ? AND star_rating = ? AND rating_year = ?""",
+            (config.code, category, star_rating, self.year),
+        )
+        if not rows:
+            return (None, None, None)
+        return (rows[0]['threshold_operator'], rows[0]['threshold_min'], rows[0]['threshold_max'])
+
+    def generate_report(self, contract_id: str) -> Dict:
+        """
+        Generate complete performance report for a contract
+
+        Contract info matches the CSV backend: stripped cells, is_snp as
+        "Yes"/"No" and summary ratings as the table shows them ("3.5" or
+        the status text).
+
+        Returns:
+            Dictionary with contract info and measure lines
+        """
+        contract_id = str(contract_id).strip()
+        summary = self._query(
+            """SELECT c.*, sr.* FROM summary_ratings sr
+               JOIN contracts c ON c.contract_id = sr.contract_id
+               WHERE sr.contract_id = ? AND sr.rating_year = ?""",
+            (contract_id, self.year),
+        )
+        if not summary:
+            raise ValueError(f"Contract {contract_id} not found")
+        summary = summary[0]
+
+        contract_info = {
+            'contract_id': contract_id,
+            'org_type': summary['organization_type'],
+            'contract_name': summary['contract_name'],
+            'marketing_name': summary['organization_marketing_name'],
+            'parent_org': summary['parent_organization'],
+            'is_snp': 'Yes' if summary['is_snp'] else 'No',
+            'part_c_rating': _rating_text(summary['part_c_summary'], summary['part_c_status']),
+            'part_d_rating': _rating_text(summary['part_d_summary'], summary['part_d_status']),
+            'overall_rating': _rating_text(summary['overall_rating'], summary['overall_status']),
+        }
+        part_d_set = self.determine_part_d_threshold_set(contract_id, contract_info['org_type'])
+
+        rows = self._query(
+            """SELECT mp.*, m.measure_name, m.measure_domain, m.format_type,
+                      cp.threshold_operator, cp.threshold_min, cp.threshold_max
+               FROM measure_performance mp
+               JOIN measures m ON m.measure_code = mp.measure_code
+               LEFT JOIN cut_points cp ON cp.measure_code = mp.measure_code
+                    AND cp.rating_year = mp.rating_year
+                    AND cp.star_rating = mp.star_rating
+                    AND cp.org_type_category = CASE m.part_type WHEN 'C' THEN 'Part C' ELSE ? END
+               WHERE mp.contract_id = ? AND mp.rating_year = ?
+               ORDER BY m.display_order""",
+            (part_d_set, contract_id, self.year),
+        )
+        if not rows:
+            raise ValueError(f"No measure data found for {contract_id}")
+
+        measure_lines = []
+        for row in rows:
+            is_special = row['data_status'] != 'Valid'
+            has_band = not is_special and row['star_rating'] is not None and row['threshold_operator'] is not None
+            measure_lines.append(MeasureLine(
+                measure_code=row['measure_code'],
+                measure_name=row['measure_name'],
+                star_rating=row['star_rating'],
+                performance_value=(row['raw_value_display'] if is_special else
+                                   format_value_for_display(row['raw_value_display'], row['format_type'])),
+                performance_numeric=None if is_special else row['raw_value'],
+                threshold_band=row['threshold_operator'] if has_band else 'N/A',
+                threshold_lower=row['threshold_min'] if has_band else None,
+                threshold_upper=row['threshold_max'] if has_band else None,
+                is_special=is_special,
+                special_category=row['special_category'],
+                domain=row['measure_domain'],
+            ))
+
+        return {
+            'contract_info': contract_info,
+            'part_d_set': part_d_set,
+            'measure_lines': measure_lines
+        }
+
+    def list_contracts(self, parent_org: Optional[str] = None) -> List[str]:
+        """
+        Contract IDs rated in this year
+
+        Args:
+            parent_org: Only contracts under this parent organization
+        """
+        if parent_org is None:
+            rows = self._query(
+                "SELECT contract_id FROM summary_ratings WHERE rating_year = ? ORDER BY contract_id", (self.year,)
+            )
+        else:
+            rows = self._query(
+                """SELECT sr.contract_id FROM summary_ratings sr
+                   JOIN contracts c ON c.contract_id = sr.contract_id
+                   WHERE c.parent_organization = ? AND sr.rating_year = ?
+                   ORDER BY sr.contract_id""",
+                (parent_org.strip(), self.year),
+            )
+        return [row['contract_id'] for row in rows]
+
+    def contracts_by_parent(self, parent_org: str) -> List[Dict]:
+        """
+        Contracts under a parent organization with their ratings
+
+        Returns:
+            List of {contract_id, org_type, marketing_name, part_c_summary, part_d_summary, overall_rating}
+        """
+        rows = self._query(
+            """SELECT c.contract_id, c.organization_type AS org_type,
+                      c.organization_marketing_name AS marketing_name,
+                      sr.part_c_summary, sr.part_d_summary, sr.overall_rating
+               FROM contracts c
+               JOIN summary_ratings sr ON sr.contract_id = c.contract_id AND sr.rating_year = ?
+               WHERE c.parent_organization = ?
+               ORDER BY c.contract_id""",
+            (self.year, parent_org),
+        )
+        return [dict(row) for row in rows]
+
+    def contracts_by_rating(self, min_rating: float, max_rating: float = 5.0) -> List[Dict]:
+        """
+        Contracts whose overall rating falls in [min_rating, max_rating]
+
+        Returns:
+            List of {contract_id, marketing_name, parent_org, overall_rating}, highest first
+        """
+        rows = self._query(
+            """SELECT sr.contract_id, c.organization_marketing_name AS marketing_name,
+                      c.parent_organization AS parent_org, sr.overall_rating
+               FROM summary_ratings sr
+               JOIN contracts c ON c.contract_id = sr.contract_id
+               WHERE sr.overall_rating BETWEEN ? AND ? AND sr.rating_year = ?
+               ORDER BY sr.overall_rating DESC, sr.contract_id""",
+            (min_rating, max_rating, self.year),
+        )
+        return [dict(row) for row in rows]
+
+    def measure_values(self, measure_code: str) -> List[Dict]:
+        """
+        Every contract's value and star on one measure
+
+        Returns:
+            List of {contract_id, raw_value, star_rating, data_status}
+        """
+        rows = self._query(
+            """SELECT contract_id, raw_value, star_rating, data_status FROM measure_performance
+               WHERE measure_code = ? AND rating_year = ?
+               ORDER BY contract_id""",
+            (get_measure_config(measure_code).code, self.year),
+        )
+        return [dict(row) for row in rows]
+
+    def measure_benchmarks(self, measure_code: str) -> Dict:
+        """
+        Market distribution of one measure (view_measure_benchmarks for a single measure)
+
+        Returns:
+            Dictionary with contract_count, avg/min/max, p25/median/p75,
+            avg_star_rating and star_counts {1..5: n}
+        """
+        rows = self._query(
+            """SELECT raw_value, star_rating FROM measure_performance
+               WHERE measure_code = ? AND rating_year = ? AND data_status = 'Valid'""",
+            (get_measure_config(measure_code).code, self.year),
+        )
+        values = np.array([r['raw_value'] for r in rows if r['raw_value'] is not None], dtype=float)
+        stars = [r['star_rating'] for r in rows if r['star_rating'] is not None]
+        result = {'measure_code': measure_code, 'rating_year': self.year, 'contract_count': len(rows)}
+        if len(values):
+            p25, median, p75 = np.percentile(values, [25, 50, 75])
+            result.update(avg_performance=float(values.mean()), min_performance=float(values.min()),
+                          max_performance=float(values.max()), p25=float(p25), median=float(median),
+                          p75=float(p75))
+        result['avg_star_rating'] = float(np.mean(stars)) if stars else None
+        result['star_counts'] = {star: stars.count(star) for star in range(1, 6)}
+        return result
+
+    def parent_org_performance(self, min_contracts: int = 1) -> List[Dict]:
+        """
+        Rating aggregates by parent organization (view_parent_org_performance)
+
+        Returns:
+            List of view rows, most contracts first
+        """
+        rows = self._query(
+            """SELECT * FROM view_parent_org_performance
+               WHERE rating_year = ? AND contract_count >= ?
+               ORDER BY contract_count DESC, parent_organization""",
+            (self.year, min_contracts),
+        )
+        return [dict(row) for row in rows]
+
+
+def compare_backends(db_generator: DatabaseReportGenerator, csv_generator: ContractReportGenerator) -> int:
+    """
+    Compare every contract's report from the store against the CSV backend
+
+    Returns:
+        Number of contracts whose contract list entry, contract info, Part D
+        threshold set or measure lines differ
+    """
+    mismatches = 0
+    db_ids, csv_ids = set(db_generator.list_contracts()), set(csv_generator.list_contracts())
+    for contract_id in sorted(db_ids ^ csv_ids):
+        mismatches += 1
+        print(f"✗ {contract_id} is only in the {'store' if contract_id in db_ids else 'CSV tables'}")
+
+    for contract_id in sorted(db_ids & csv_ids):
+        try:
+            expected = csv_generator.generate_report(contract_id)
+        except ValueError as e:
+            expected = str(e)
+        try:
+            got = db_generator.generate_report(contract_id)
+        except ValueError as e:
+            got = str(e)
+        if got != expected:
+            mismatches += 1
+            fields = ([key for key in ('contract_info', 'part_d_set', 'measure_lines') if got[key] != expected[key]]
+                      if isinstance(got, dict) and isinstance(expected, dict) else ['error'])
+            print(f"✗ {contract_id} differs: {', '.join(fields)}")
+    return mismatches
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description="Build and query the Star Ratings SQLite store")
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help="SQLite file (default %(default)s)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser('build', help="ingest one year of CMS tables")
+    build.add_argument('--year', type=int, default=DEFAULT_YEAR)
+    build.add_argument('--dir', help="directory holding '<year> Star Ratings Data Table - *.csv' "
+                                     "(default: the tables in the current directory)")
+
+    report = commands.add_parser('report', help="print a contract report from the store")
+    report.add_argument('contract_id')
+    report.add_argument('--year', type=int)
+
+    commands.add_parser('check', help="compare every report against the CSV backend (current directory tables)")
+
+    args = parser.parse_args()
+    try:
+        if args.command == 'build':
+            paths = find_source_files(args.dir, args.year) if args.dir else None
+            build_database(args.db, args.year, paths)
+        elif args.command == 'check':
+            db_generator = DatabaseReportGenerator(args.db)
+            mismatches = compare_backends(db_generator, ContractReportGenerator())
+            if mismatches:
+                print(f"✗ {mismatches} contracts differ")
+                sys.exit(1)
+            print(f"✓ {len(db_generator.list_contracts())} contract reports match the CSV backend")
+        else:
+            generator = DatabaseReportGenerator(args.db, args.year)
+            generator.print_report(generator.generate_report(args.contract_id))
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
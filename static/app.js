@@ -3,8 +3,13 @@
 let currentContract = null;
 let measures = [];
 let whatIfValues = {};
-let allContracts = [];
+let whatIfEdits = {};
+let savedScenarios = [];
+let whatIfSession = null;
+let whatIfSocket = null;
 let selectedContractId = null;
+let searchQuery = '';
+let searchTimer = null;
 
 // Load contracts on page load
 document.addEventListener('DOMContentLoaded', async () => {
@@ -15,27 +20,19 @@ document.addEventListener('DOMContentLoaded', async () => {
     
     // Show dropdown on focus
     searchInput.addEventListener('focus', () => {
-        if (allContracts.length > 0) {
-            displayContractOptions(allContracts);
-            dropdown.classList.remove('hidden');
-        }
+        runSearch(searchQuery);
     });
     
-    // Filter as user types
+    // Search server-side as user types (debounced)
     searchInput.addEventListener('input', (e) => {
-        const query = e.target.value.toLowerCase();
-        if (query === '') {
-            displayContractOptions(allContracts);
-        } else {
-            const filtered = allContracts.filter(c => 
-                c.display.toLowerCase().includes(query) ||
-                c.id.toLowerCase().includes(query)
-            );
-            displayContractOptions(filtered);
-        }
-        dropdown.classList.remove('hidden');
+        searchQuery = e.target.value;
+        clearTimeout(searchTimer);
+        searchTimer = setTimeout(() => runSearch(searchQuery), 120);
     });
     
+    document.getElementById('saveScenario').addEventListener('click', saveScenario);
+    document.getElementById('scenarioSelect').addEventListener('change', (e) => loadScenario(e.target.value));
+    
     // Close dropdown when clicking outside
     document.addEventListener('click', (e) => {
         if (!searchInput.contains(e.target) && !dropdown.contains(e.target)) {
@@ -44,29 +41,47 @@ document.addEventListener('DOMContentLoaded', async () => {
     });
 });
 
+async function searchContracts(query, cursor = null) {
+    const params = new URLSearchParams({ q: query, limit: 50 });
+    if (cursor) params.set('cursor', cursor);
+    const response = await fetch(`/api/contracts/search?${params}`);
+    return response.json();
+}
+
 async function loadContracts() {
     try {
-        const response = await fetch('/api/contracts');
-        const data = await response.json();
-        allContracts = data.contracts;
-        
-        document.getElementById('contractSearch').placeholder = `Search ${allContracts.length} contracts...`;
+        const data = await searchContracts('');
+        document.getElementById('contractSearch').placeholder = `Search ${data.total} contracts...`;
     } catch (error) {
         console.error('Error loading contracts:', error);
         document.getElementById('contractSearch').placeholder = 'Error loading contracts';
     }
 }
 
-function displayContractOptions(contracts) {
+async function runSearch(query, cursor = null) {
+    try {
+        const data = await searchContracts(query, cursor);
+        // Ignore responses for queries the user has already typed past
+        if (query !== searchQuery) return;
+        displayContractOptions(data.results, data.total, data.next_cursor, cursor !== null);
+        document.getElementById('contractDropdown').classList.remove('hidden');
+    } catch (error) {
+        console.error('Error searching contracts:', error);
+    }
+}
+
+function displayContractOptions(contracts, total, nextCursor, append = false) {
     const dropdown = document.getElementById('contractDropdown');
-    dropdown.innerHTML = '';
+    const existingMore = dropdown.querySelector('.load-more');
+    if (existingMore) existingMore.remove();
+    if (!append) dropdown.innerHTML = '';
     
-    if (contracts.length === 0) {
+    if (contracts.length === 0 && !append) {
         dropdown.innerHTML = '<div class="px-4 py-3 text-sm text-gray-500">No contracts found</div>';
         return;
     }
     
-    contracts.slice(0, 100).forEach(contract => {
+    contracts.forEach(contract => {
         const div = document.createElement('div');
         div.className = 'px-4 py-3 hover:bg-blue-50 cursor-pointer transition-colors border-b border-gray-100 last:border-0';
         div.innerHTML = `
@@ -85,10 +100,14 @@ function displayContractOptions(contracts) {
         dropdown.appendChild(div);
     });
     
-    if (contracts.length > 100) {
+    if (nextCursor) {
         const more = document.createElement('div');
-        more.className = 'px-4 py-2 text-xs text-gray-500 bg-gray-50 sticky bottom-0';
-        more.textContent = `Showing first 100 of ${contracts.length} results. Keep typing to narrow down...`;
+        more.className = 'load-more px-4 py-2 text-xs text-blue-600 bg-gray-50 sticky bottom-0 cursor-pointer';
+        more.textContent = `Showing ${dropdown.children.length} of ${total} results. Load more...`;
+        more.addEventListener('click', (e) => {
+            e.stopPropagation();
+            runSearch(searchQuery, nextCursor);
+        });
         dropdown.appendChild(more);
     }
 }
@@ -101,9 +120,13 @@ async function loadContract(contractId) {
         currentContract = data;
         measures = data.measures;
         whatIfValues = {};
+        whatIfEdits = {};
+        await startWhatIfSession(contractId);
+        await loadScenarioList(contractId);
         
-        // Save raw weighted avg
-        window.rawWeightedAvg = data.raw_weighted_avg || 0;
+        // Raw weighted avg on the same basis as the What-If figure (the unedited session)
+        const sessionAvg = whatIfSession ? sessionRawAvg(whatIfSession.ratings) : null;
+        window.rawWeightedAvg = sessionAvg !== null ? sessionAvg : (data.raw_weighted_avg || 0);
         
         // Update UI
         displayContractInfo(data);
@@ -187,242 +210,186 @@ function displayMeasures(measures) {
     });
 }
 
+function startWhatIfSession(contractId) {
+    // One WebSocket per contract: the server holds the compiled contract state,
+    // coalesces streamed edits and pushes back only what changed
+    if (whatIfSession && !whatIfSocket) {
+        fetch(`/api/whatif/session/${whatIfSession.session_id}`, { method: 'DELETE' });
+    }
+    if (whatIfSocket) {
+        whatIfSocket.onclose = null;
+        whatIfSocket.close();
+        whatIfSocket = null;
+    }
+    whatIfSession = null;
+    
+    const protocol = location.protocol === 'https:' ? 'wss' : 'ws';
+    const socket = new WebSocket(`${protocol}://${location.host}/api/whatif/ws?contract_id=${encodeURIComponent(contractId)}`);
+    whatIfSocket = socket;
+    
+    return new Promise(resolve => {
+        socket.onmessage = (event) => {
+            const message = JSON.parse(event.data);
+            if (message.type === 'state') {
+                whatIfSession = message;
+                resolve();
+            } else if (message.type === 'update') {
+                applyWhatIfUpdate(message);
+            } else if (message.type === 'error') {
+                console.error('What-if error:', message.detail);
+            }
+        };
+        socket.onclose = () => {
+            if (whatIfSocket === socket) whatIfSocket = null;
+        };
+        socket.onerror = async () => {
+            // No WebSocket support (proxy, old server): fall back to POST per edit
+            if (!whatIfSession) {
+                await startWhatIfPostSession(contractId);
+            }
+            resolve();
+        };
+    });
+}
+
+async function startWhatIfPostSession(contractId) {
+    const response = await fetch('/api/whatif/session', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ contract_id: contractId })
+    });
+    whatIfSession = response.ok ? await response.json() : null;
+}
+
+function applyWhatIfUpdate(update) {
+    if (!whatIfSession) return;
+    Object.assign(whatIfSession.ratings, update.ratings);
+    Object.assign(whatIfSession.domains, update.domains);
+    
+    Object.entries(update.measures).forEach(([measureCode, measure]) => {
+        const cell = document.querySelector(`.whatif-star-${measureCode}`);
+        if (measure.value === null) {
+            whatIfValues[measureCode] = null;
+            if (cell) cell.textContent = '—';
+        } else {
+            whatIfValues[measureCode] = measure.star;
+            if (cell) cell.textContent = measure.star ? `${measure.star}⭐` : 'N/A';
+        }
+    });
+    
+    // C30/D04 re-derived from the edited measures (only sent when prior-year data is loaded)
+    Object.entries(update.improvement || {}).forEach(([measureCode, star]) => {
+        const cell = document.querySelector(`.whatif-star-${measureCode}`);
+        whatIfValues[measureCode] = star;
+        if (cell) cell.textContent = star ? `${star}⭐` : 'N/A';
+    });
+    
+    calculateMetrics();
+}
+
 async function handleWhatIfInput(e) {
     const measureCode = e.target.dataset.measure;
     const value = parseFloat(e.target.value);
+    const edit = {
+        measure_code: measureCode,
+        value: (!value || value === 0) ? null : value
+    };
+    if (!whatIfSession) return;
+    if (edit.value === null) {
+        delete whatIfEdits[measureCode];
+    } else {
+        whatIfEdits[measureCode] = edit.value;
+    }
     
-    if (!value || value === 0) {
-        whatIfValues[measureCode] = null;
-        document.querySelector(`.whatif-star-${measureCode}`).textContent = '—';
-        calculateMetrics();
+    // Streamed: no response to wait for, the server pushes an update
+    if (whatIfSocket && whatIfSocket.readyState === WebSocket.OPEN) {
+        whatIfSocket.send(JSON.stringify(edit));
         return;
     }
     
     try {
-        const response = await fetch('/api/whatif', {
+        const response = await fetch(`/api/whatif/session/${whatIfSession.session_id}`, {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({
-                measure_code: measureCode,
-                value: value,
-                contract_id: currentContract.contract_info.contract_id
-            })
+            body: JSON.stringify(edit)
         });
         
         const data = await response.json();
-        whatIfValues[measureCode] = data.star;
-        
-        const starText = data.star ? `${data.star}⭐` : 'N/A';
-        document.querySelector(`.whatif-star-${measureCode}`).textContent = starText;
-        
-        calculateMetrics();
+        applyWhatIfUpdate({
+            measures: { [data.measure_code]: { value: data.value, star: data.star } },
+            improvement: data.improvement,
+            ratings: data.ratings,
+            domains: data.domains
+        });
     } catch (error) {
         console.error('Error calculating what-if:', error);
     }
 }
 
-function calculateRiskStatus(measure) {
-    if (!measure.performance_numeric) {
-        return '<span class="text-gray-400">N/A</span>';
+// Saved scenarios (scenarios.py): the current what-if values under a name
+async function loadScenarioList(contractId) {
+    const select = document.getElementById('scenarioSelect');
+    select.innerHTML = '<option value="">Saved scenarios…</option>';
+    try {
+        const response = await fetch(`/api/scenarios?contract_id=${encodeURIComponent(contractId)}`);
+        savedScenarios = response.ok ? (await response.json()).scenarios : [];
+    } catch (error) {
+        savedScenarios = [];
     }
-    
-    const isInverse = measure.is_inverse;
-    const perf = measure.performance_numeric;
-    let lower = measure.threshold_lower;
-    let upper = measure.threshold_upper;
-    
-    // Handle open-ended bounds - assume 0 as lower bound for 1-star measures
-    if (lower === null && upper !== null) {
-        // For 1-star measures with "<X", assume range is 0 to X
-        lower = 0;
+    savedScenarios.forEach(scenario => {
+        const option = document.createElement('option');
+        option.value = scenario.scenario_id;
+        const overall = scenario.outcome && scenario.outcome.overall;
+        option.textContent = overall ? `${scenario.name} (${overall}⭐)` : scenario.name;
+        select.appendChild(option);
+    });
+}
+
+async function saveScenario() {
+    const name = document.getElementById('scenarioName').value.trim();
+    const status = document.getElementById('scenarioStatus');
+    if (!name || !selectedContractId) {
+        status.textContent = 'Enter a scenario name first';
+        return;
     }
-    
-    if (lower !== null && upper === null) {
-        // For measures with ">=X" (open upper bound)
-        const is5Star = measure.star_rating === 5;
-        
-        // Special case: if exactly at threshold, it's At Risk (barely made it)
-        if (perf === lower) {
-            return is5Star 
-                ? '<span class="text-red-500">🔴 At Risk</span>'  // 5-star: barely at threshold
-                : (isInverse ? '<span class="text-red-500">🔴 At Risk</span>' : '<span class="text-green-500">🟢 Upside</span>');
+    const response = await fetch('/api/scenarios', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ name, contract_id: selectedContractId, values: whatIfEdits })
+    });
+    const data = await response.json();
+    status.textContent = response.ok ? `Saved "${data.name}"` : data.detail;
+    if (response.ok) await loadScenarioList(selectedContractId);
+}
+
+function loadScenario(scenarioId) {
+    const scenario = savedScenarios.find(s => String(s.scenario_id) === String(scenarioId));
+    if (!scenario) return;
+    document.getElementById('scenarioName').value = scenario.name;
+    document.querySelectorAll('.whatif-input').forEach(input => {
+        const value = scenario.values[input.dataset.measure];
+        const next = value === undefined ? '' : String(value);
+        if (input.value !== next) {
+            input.value = next;
+            input.dispatchEvent(new Event('input'));
         }
-        
-        // Otherwise, assume upper bound and calculate thirds
-        const assumedUpper = isInverse ? lower * 2 : 100;  // For inverse, assume 2x threshold; for normal, assume 100%
-        upper = assumedUpper;
-        measure.assumedUpperBound = true;  // Flag for later use in discrete logic
-        
-        // Now fall through to normal thirds calculation below
-    }
-    
-    // Need at least upper bound
-    if (upper === null) {
+    });
+}
+
+// Risk status is classified server-side (risk_engine.py)
+const RISK_STYLES = {
+    'At Risk': ['text-red-500', '🔴'],
+    'Neutral': ['text-yellow-500', '🟡'],
+    'Upside': ['text-green-500', '🟢']
+};
+
+function calculateRiskStatus(measure) {
+    const style = RISK_STYLES[measure.risk_status];
+    if (!style) {
         return '<span class="text-gray-400">N/A</span>';
     }
-    
-    // Check for exact value bands (e.g., "100.0%" where lower == upper)
-    const is5Star = measure.star_rating === 5;
-    const hasAssumedUpperBound = measure.assumedUpperBound || false;
-    if (lower === upper) {
-        // Exact value band - always neutral (exactly on target)
-        return '<span class="text-yellow-500">🟡 Neutral</span>';
-    }
-    
-    // For 1-value discrete bands, check if performance is within boundaries
-    // This handles cases like ">9 to <=10" where 10 is inside the band
-    const range = upper - lower;
-    if (range > 0.5 && range <= 1) {
-        // Check bounds based on measure type:
-        // Normal: "88 to <89" → only 88 is valid (exclusive upper)
-        // Inverse: ">10 to <=11" → only 11 is valid (exclusive lower)
-        let isInside;
-        if (isInverse) {
-            isInside = perf > lower && perf <= upper;  // Exclusive lower, inclusive upper
-        } else {
-            isInside = perf >= lower && perf < upper;  // Inclusive lower, exclusive upper
-        }
-        
-        if (isInside) {
-            // Inside a 1-value band → Neutral
-            return '<span class="text-yellow-500">🟡 Neutral</span>';
-        }
-        // Otherwise, fall through to outside-band checks
-    }
-    
-    // Check if performance is outside the band
-    
-    if (perf >= upper) {
-        // Performance is above the band
-        if (isInverse) {
-            return '<span class="text-red-500">🔴 At Risk!</span>';
-        } else {
-            // For 5-star, can't go higher, so just neutral
-            return is5Star 
-                ? '<span class="text-yellow-500">🟡 Neutral</span>'
-                : '<span class="text-green-500">🟢 Upside!</span>';
-        }
-    }
-    if (perf < lower) {
-        // Performance is below the band
-        if (isInverse) {
-            // For inverse, being below is good
-            return is5Star 
-                ? '<span class="text-yellow-500">🟡 Neutral</span>'  // 5-star: can't go higher
-                : '<span class="text-green-500">🟢 Upside!</span>';
-        } else {
-            return '<span class="text-red-500">🔴 At Risk!</span>';
-        }
-    }
-    
-    // Calculate thirds (only if inside the band)
-    // For ranges > 0.5, use discrete (integer) logic; otherwise use continuous (decimal) logic
-    // EXCEPTION: 5-star inverse decimals starting at 0 should use discrete logic
-    const isSpecialDecimal = isInverse && lower === 0 && range < 1 && is5Star;
-    const isDiscrete = range > 0.5 || isSpecialDecimal;
-    
-    if (isDiscrete) {
-        // For inverse measures: lower is EXCLUSIVE (">X"), upper is INCLUSIVE ("<=Y")
-        // For normal measures: lower is INCLUSIVE (">=X"), upper is EXCLUSIVE ("<Y")
-        let lowerInt, upperInt;
-        if (isInverse) {
-            // SPECIAL CASE: 5-star inverse decimal starting at 0 (e.g., D02 "≤0.11")
-            // Treat as 1-11 (hundredths), not 0-11, since 0 complaints is unrealistic
-            if (isSpecialDecimal) {
-                lowerInt = 1;  // Start at 0.01 (1 in hundredths)
-                upperInt = Math.round(upper * 100);  // 0.11 → 11
-            } else if (lower === 0) {
-                lowerInt = 0;  // For percentages (e.g., D03 "≤8%"), include 0
-                upperInt = Math.floor(upper);  // Inclusive upper
-            } else {
-                lowerInt = Math.floor(lower) + 1;  // Exclusive: ">10" means starts at 11
-                upperInt = Math.floor(upper);       // Inclusive: "<=12" means ends at 12
-            }
-        } else {
-            lowerInt = Math.floor(lower);       // Inclusive: ">=76" means starts at 76
-            // For assumed upper bounds (e.g., "86%+"), 100% is achievable (inclusive)
-            // For explicit upper bounds (e.g., "<84"), 84% is NOT achievable (exclusive, so use 83)
-            upperInt = hasAssumedUpperBound 
-                ? Math.floor(upper)         // Inclusive: "86%+" → 86-100
-                : Math.floor(upper) - 1;    // Exclusive: "<84" → ends at 83
-        }
-        const totalValues = upperInt - lowerInt + 1;
-        
-        // For decimal special case (D02), convert to hundredths; otherwise round normally
-        const perfInt = isSpecialDecimal
-            ? Math.round(perf * 100)  // D02: 0.08 → 8
-            : Math.round(perf);        // D03: 6% → 6, C24: 89 → 89
-        
-        // If only 1 value, it's Neutral (no way to split)
-        if (totalValues <= 1) {
-            return '<span class="text-yellow-500">🟡 Neutral</span>';
-        }
-        
-        let position;
-        
-        // If exactly 2 values, split: first = At Risk, second = Upside
-        if (totalValues === 2) {
-            position = (perfInt === lowerInt) ? 'lower' : 'upper';
-        } else {
-            // 3+ values: Split into thirds (remainder goes to middle)
-            // 9→3,3,3 | 8→2,4,2 | 7→2,3,2 | 11→3,5,3 | 15→5,5,5
-            const outerThirdSize = Math.floor(totalValues / 3);
-            const firstThirdEnd = lowerInt + outerThirdSize - 1;
-            const lastThirdStart = upperInt - outerThirdSize + 1;
-            
-            if (perfInt <= firstThirdEnd) position = 'lower';
-            else if (perfInt >= lastThirdStart) position = 'upper';
-            else position = 'middle';
-        }
-        
-        // For 5-star, there is no upside (can't go higher than 5)
-        if (isInverse) {
-            if (position === 'lower') {
-                return is5Star 
-                    ? '<span class="text-yellow-500">🟡 Neutral</span>' 
-                    : '<span class="text-green-500">🟢 Upside</span>';
-            }
-            if (position === 'upper') return '<span class="text-red-500">🔴 At Risk</span>';
-        } else {
-            if (position === 'lower') return '<span class="text-red-500">🔴 At Risk</span>';
-            if (position === 'upper') {
-                return is5Star 
-                    ? '<span class="text-yellow-500">🟡 Neutral</span>' 
-                    : '<span class="text-green-500">🟢 Upside</span>';
-            }
-        }
-        return '<span class="text-yellow-500">🟡 Neutral</span>';
-    } else {
-        // For decimals/continuous ranges (e.g., 0.11 to 0.32)
-        // Use strict inequality so boundary values go to middle (tie-to-middle)
-        const range = upper - lower;
-        const third = range / 3.0;
-        const lowerThirdEnd = lower + third;
-        const upperThirdStart = upper - third;
-        
-        let position;
-        if (perf < lowerThirdEnd) position = 'lower';
-        else if (perf > upperThirdStart) position = 'upper';
-        else position = 'middle';
-        
-        // For 5-star, there is no upside (can't go higher than 5)
-        if (isInverse) {
-            if (position === 'lower') {
-                return is5Star 
-                    ? '<span class="text-yellow-500">🟡 Neutral</span>' 
-                    : '<span class="text-green-500">🟢 Upside</span>';
-            }
-            if (position === 'upper') return '<span class="text-red-500">🔴 At Risk</span>';
-        } else {
-            if (position === 'lower') return '<span class="text-red-500">🔴 At Risk</span>';
-            if (position === 'upper') {
-                return is5Star 
-                    ? '<span class="text-yellow-500">🟡 Neutral</span>' 
-                    : '<span class="text-green-500">🟢 Upside</span>';
-            }
-        }
-        return '<span class="text-yellow-500">🟡 Neutral</span>';
-    }
+    const mark = measure.risk_outside && measure.risk_status !== 'Neutral' ? '!' : '';
+    return `<span class="${style[0]}">${style[1]} ${measure.risk_status}${mark}</span>`;
 }
 
 function calculateToNext(measure) {
@@ -430,57 +397,50 @@ function calculateToNext(measure) {
         return 'Already at 5⭐';
     }
     
-    if (!measure.performance_numeric || measure.threshold_upper === null) {
+    // Precomputed server-side: improvement needed to reach the next band's entry edge
+    if (measure.gap_to_next === null || measure.gap_to_next === undefined) {
         return 'N/A';
     }
     
-    const gap = measure.threshold_upper - measure.performance_numeric;
+    const gap = measure.gap_to_next;
     
-    if (gap <= 0) {
+    if (gap < 0 || (gap === 0 && measure.next_inclusive)) {
         return 'At threshold';
     }
     
+    // Exclusive edges ("> 85") must be passed, not just reached
+    const prefix = measure.next_inclusive ? '' : '>';
+    
     if (measure.format_type === 'PERCENTAGE') {
-        return `${gap.toFixed(1)}%`;
+        return `${prefix}${gap.toFixed(1)}%`;
     } else if (measure.format_type === 'INTEGER') {
-        return `${Math.floor(gap)}`;
+        return `${prefix}${Math.ceil(gap)}`;
     } else if (measure.format_type === 'DECIMAL') {
-        return `${gap.toFixed(2)}`;
+        return `${prefix}${gap.toFixed(2)}`;
     }
     
-    return `${gap.toFixed(1)}`;
+    return `${prefix}${gap.toFixed(1)}`;
+}
+
+function sessionRawAvg(ratings) {
+    // Overall raw score; PDP-only and MA-only contracts have no overall, so use their one summary
+    for (const part of ['overall', 'part_d', 'part_c']) {
+        if (ratings[part] && ratings[part].raw !== null) return ratings[part].raw;
+    }
+    return null;
 }
 
 function calculateMetrics() {
-    let whatifWeightedSum = 0;
-    let whatifTotalWeight = 0;
-    let riskScore = 0;
-    
-    measures.forEach(measure => {
-        // What-If calculation
-        const whatifStar = whatIfValues[measure.code];
-        const starToUse = whatifStar || measure.star_rating;
-        
-        if (starToUse) {
-            whatifWeightedSum += starToUse * measure.weight;
-            whatifTotalWeight += measure.weight;
-        }
-        
-        // Risk score
-        const riskStatus = calculateRiskStatus(measure);
-        if (riskStatus.includes('At Risk')) {
-            riskScore -= measure.weight;
-        } else if (riskStatus.includes('Upside')) {
-            riskScore += measure.weight;
-        }
-    });
+    // Weighted risk score from the backend
+    const riskScore = currentContract ? (currentContract.risk_score || 0) : 0;
     
     // Display raw weighted average from backend
     const rawAvg = window.rawWeightedAvg || 0;
     document.getElementById('rawWeightedAvg').textContent = `${rawAvg.toFixed(2)}⭐`;
     
-    // What-If (raw calculation only)
-    const whatifAvg = whatifTotalWeight > 0 ? (whatifWeightedSum / whatifTotalWeight) : 0;
+    // What-If from the server-side session (raw weighted average)
+    const sessionAvg = whatIfSession ? sessionRawAvg(whatIfSession.ratings) : null;
+    const whatifAvg = sessionAvg !== null ? sessionAvg : rawAvg;
     document.getElementById('whatifAvg').textContent = `${whatifAvg.toFixed(2)}⭐`;
     
     document.getElementById('riskScore').textContent = riskScore >= 0 ? `+${riskScore.toFixed(1)}` : riskScore.toFixed(1);
@@ -0,0 +1,72 @@
+"""
+Tests for the risk status engine
+Scenarios ported from test_risk_logic.js (5-star "no upside", one- and two-value bands)
+"""
+
+import math
+
+from risk_engine import RISK_LABELS, classify_risk
+
+NA = None
+
+# (scenario, perf, lower, upper, star, is_inverse, expected)
+# "!" marks a value outside its band; the UI never adds it to Neutral
+SCENARIOS = [
+    ('5⭐ at threshold (99% in "99%+")', 99, 99, NA, 5, False, 'At Risk'),
+    ('5⭐ above threshold (100% in "99%+")', 100, 99, NA, 5, False, 'Neutral'),
+    ('5⭐ exact value (100% in "100%")', 100, 100, 100, 5, False, 'Neutral'),
+    ('5⭐ lower third (95% in "95-100%")', 95, 95, 100, 5, False, 'At Risk'),
+    ('5⭐ upper third (99% in "95-100%")', 99, 95, 100, 5, False, 'Neutral'),
+    ('4⭐ upper third (83% in "76-84%")', 83, 76, 84, 4, False, 'Upside'),
+    ('5⭐ above band (101% in "95-100%")', 101, 95, 100, 5, False, 'Neutral'),
+    ('4⭐ above band (85% in "76-84%")', 85, 76, 84, 4, False, 'Upside!'),
+    ('5⭐ inverse lower third (0.10 in "0.10-0.20")', 0.10, 0.10, 0.20, 5, True, 'Neutral'),
+    ('5⭐ inverse below band (0.08 in "0.10-0.20")', 0.08, 0.10, 0.20, 5, True, 'Neutral'),
+    ('5⭐ single value (90% in "90-91%")', 90, 90, 91, 5, False, 'Neutral'),
+    ('5⭐ two-value lower (88% in "88-90%")', 88, 88, 90, 5, False, 'At Risk'),
+    ('5⭐ two-value upper (89% in "88-90%")', 89, 88, 90, 5, False, 'Neutral'),
+    ('2⭐ above 1-value band (87 in "85-86")', 87, 85, 86, 2, False, 'Upside!'),
+    ('3⭐ inverse 1-value band (10% in ">9-10%")', 10, 9, 10, 3, True, 'Neutral'),
+    ('2⭐ inverse 2-value lower (11% in ">10-12%")', 11, 10, 12, 2, True, 'Upside'),
+    ('2⭐ inverse 2-value upper (12% in ">10-12%")', 12, 10, 12, 2, True, 'At Risk'),
+    ('2⭐ above 1-value band (89 in "88 to <89")', 89, 88, 89, 2, False, 'Upside!'),
+    ('2⭐ inside 1-value band (88 in "88 to <89")', 88, 88, 89, 2, False, 'Neutral'),
+    ('5⭐ inverse zero complaints (0.00 in "<=0.11")', 0.0, NA, 0.11, 5, True, 'Neutral'),
+    ('No performance value', NA, 76, 84, 4, False, 'N/A'),
+]
+
+
+def _nan(value):
+    return math.nan if value is None else value
+
+
+def render(label: int, outside: bool) -> str:
+    """Status text as the frontend shows it"""
+    text = RISK_LABELS[label]
+    return f"{text}!" if outside and text not in ('Neutral', 'N/A') else text
+
+
+def test_scenarios_one_at_a_time():
+    for scenario, perf, lower, upper, star, inverse, expected in SCENARIOS:
+        result = classify_risk(_nan(perf), _nan(lower), _nan(upper), star, inverse)
+        got = render(int(result['label']), bool(result['outside']))
+        assert got == expected, f"{scenario}: expected {expected}, got {got}"
+
+
+def test_scenarios_vectorised():
+    columns = list(zip(*SCENARIOS))
+    result = classify_risk(
+        [_nan(v) for v in columns[1]], [_nan(v) for v in columns[2]],
+        [_nan(v) for v in columns[3]], list(columns[4]), list(columns[5])
+    )
+    got = [render(label, outside) for label, outside in zip(result['label'], result['outside'])]
+    assert got == list(columns[6])
+
+
+if __name__ == "__main__":
+    print("=== Testing risk status logic ===\n")
+    test_scenarios_one_at_a_time()
+    print(f"✓ {len(SCENARIOS)} scenarios pass one at a time")
+    test_scenarios_vectorised()
+    print(f"✓ {len(SCENARIOS)} scenarios pass vectorised")
+    print("\n✅ All risk logic tests passed!")
@@ -0,0 +1,67 @@
+"""
+Per-version caches
+Market-wide structures (sensitivity, domains, leaderboards) built once per dataset version
+"""
+
+import threading
+from typing import Callable, Dict, Generic, TypeVar
+
+T = TypeVar('T')
+
+
+class VersionCache(Generic[T]):
+    """
+    The structure for the current dataset version
+
+    Holds one entry: a request for a new dataset version (or a different
+    RatingEngine) builds a replacement and drops the old one. Requests run in
+    SingleFlight worker threads, so lookups and builds happen under a lock;
+    concurrent first requests wait for one build instead of each building.
+    """
+
+    def __init__(self):
+        self._items: Dict[str, T] = {}
+        self._lock = threading.Lock()
+
+    def get(self, dataset_version: str, rating_engine, build: Callable[[], T]) -> T:
+        """Cached entry for dataset_version built on rating_engine, or build() it"""
+        with self._lock:
+            item = self._items.get(dataset_version)
+            if item is None or item.engine is not rating_engine:
+                item = build()
+                self._items.clear()
+                self._items[dataset_version] = item
+            return item
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+# Test cases
+if __name__ == "__main__":
+    from concurrent.futures import ThreadPoolExecutor
+    import time
+
+    print("Testing version cache...")
+
+    class Built:
+        count = 0
+
+        def __init__(self, engine):
+            Built.count += 1
+            time.sleep(0.01)
+            self.engine = engine
+
+    cache: VersionCache[Built] = VersionCache()
+    engine = object()
+    with ThreadPoolExecutor(8) as pool:
+        items = list(pool.map(lambda _: cache.get('v1', engine, lambda: Built(engine)), range(32)))
+    assert Built.count == 1 and all(item is items[0] for item in items)
+    print("✓ Concurrent first requests share one build")
+
+    assert cache.get('v2', engine, lambda: Built(engine)) is not items[0] and len(cache) == 1
+    other = object()
+    assert cache.get('v2', other, lambda: Built(other)).engine is other and Built.count == 3
+    print("✓ A new version or engine replaces the entry")
+
+    print("\n✅ All version cache tests passed!")
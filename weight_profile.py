@@ -0,0 +1,181 @@
+"""
+Measure weight profiles
+Versioned CMS measure weights (weight_profiles/*.json); the current profile is the single source of rating weights
+"""
+
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from measure_config import MEASURE_CONFIGS
+
+WEIGHT_PROFILE_DIR = 'weight_profiles'
+
+# Profile the published ratings use (RatingEngine and everything built on it)
+CURRENT_PROFILE = '2026'
+
+# CURRENT_PROFILE, loaded on first use
+_current: Optional['WeightProfile'] = None
+
+
+@dataclass
+class WeightProfile:
+    """
+    One methodology year's measure weights
+
+    weights are the CMS weights for every measure. overall_duplicates maps a
+    Part D measure to the Part C measure it duplicates (D02 -> C28); those
+    count in the Part D summary but get weight 0 in the overall rating so the
+    shared measure is counted once.
+    """
+    name: str
+    weights: Dict[str, float]
+    rating_year: Optional[int] = None
+    description: str = ''
+    overall_duplicates: Dict[str, str] = field(default_factory=dict)
+
+    def part_weights(self, codes: List[str]) -> Dict[str, np.ndarray]:
+        """Per-part weight vectors aligned to codes (measures missing from the profile weigh 0)"""
+        part = np.array([float(self.weights.get(code, 0.0)) for code in codes])
+        overall = np.where([code in self.overall_duplicates for code in codes], 0.0, part)
+        return {'part_c': part, 'part_d': part, 'overall': overall}
+
+    def weight(self, code: str) -> float:
+        """A measure's weight in the overall rating (0 for overall duplicates)"""
+        return 0.0 if code in self.overall_duplicates else float(self.weights.get(code, 0.0))
+
+    def to_dict(self) -> Dict:
+        return {
+            'name': self.name,
+            'rating_year': self.rating_year,
+            'description': self.description,
+            'weights': dict(self.weights),
+            'overall_duplicates': dict(self.overall_duplicates),
+        }
+
+
+def _validate(data: Dict, source: str):
+    for code, weight in data.get('weights', {}).items():
+        if code not in MEASURE_CONFIGS:
+            raise ValueError(f"{source}: unknown measure code {code}")
+        if not isinstance(weight, (int, float)) or isinstance(weight, bool) or not weight >= 0:
+            raise ValueError(f"{source}: weight for {code} must be a non-negative number, got {weight!r}")
+    for code, duplicate_of in data.get('overall_duplicates', {}).items():
+        if code not in MEASURE_CONFIGS or duplicate_of not in MEASURE_CONFIGS:
+            raise ValueError(f"{source}: unknown measure in overall_duplicates {code} -> {duplicate_of}")
+
+
+def profile_from_dict(data: Dict, directory: str = WEIGHT_PROFILE_DIR, _seen: tuple = ()) -> WeightProfile:
+    """
+    Build a profile from its JSON form, resolving 'extends'
+
+    A profile that extends another inherits its weights and duplicates and
+    overrides only the measures it lists.
+
+    Raises:
+        ValueError: For unknown measures, bad weights or circular extends
+        KeyError: If the extended profile does not exist
+    """
+    name = str(data.get('name') or 'custom')
+    if not isinstance(data.get('weights', {}), dict):
+        raise ValueError(f"{name}: weights must be an object of measure code -> weight")
+    _validate(data, name)
+
+    weights: Dict[str, float] = {}
+    duplicates: Dict[str, str] = {}
+    base_name = data.get('extends')
+    if base_name:
+        if base_name in _seen:
+            raise ValueError(f"Circular weight profile extends: {' -> '.join(_seen + (base_name,))}")
+        base = load_profile(base_name, directory, _seen + (name,))
+        weights.update(base.weights)
+        duplicates.update(base.overall_duplicates)
+
+    weights.update({code: float(w) for code, w in data.get('weights', {}).items()})
+    duplicates.update(data.get('overall_duplicates', {}))
+    return WeightProfile(
+        name=name,
+        weights=weights,
+        rating_year=data.get('rating_year'),
+        description=data.get('description', ''),
+        overall_duplicates=duplicates,
+    )
+
+
+def load_profile(name: str, directory: str = WEIGHT_PROFILE_DIR, _seen: tuple = ()) -> WeightProfile:
+    """
+    Load weight_profiles/<name>.json
+
+    Raises:
+        KeyError: If no such profile exists
+        ValueError: If the profile is invalid
+    """
+    path = os.path.join(directory, f"{os.path.basename(str(name))}.json")
+    if not os.path.exists(path):
+        raise KeyError(f"Weight profile {name} not found")
+    with open(path) as f:
+        data = json.load(f)
+    data.setdefault('name', str(name))
+    return profile_from_dict(data, directory, _seen)
+
+
+def list_profiles(directory: str = WEIGHT_PROFILE_DIR) -> List[Dict]:
+    """Name, rating year, description and base of every profile file"""
+    profiles = []
+    for filename in sorted(os.listdir(directory)) if os.path.isdir(directory) else []:
+        if filename.endswith('.json'):
+            with open(os.path.join(directory, filename)) as f:
+                data = json.load(f)
+            profiles.append({
+                'name': data.get('name', filename[:-5]),
+                'rating_year': data.get('rating_year'),
+                'description': data.get('description', ''),
+                'extends': data.get('extends'),
+            })
+    return profiles
+
+
+def current_profile() -> WeightProfile:
+    """The CURRENT_PROFILE weights, loaded once"""
+    global _current
+    if _current is None:
+        _current = load_profile(CURRENT_PROFILE)
+    return _current
+
+
+# Test cases
+if __name__ == "__main__":
+    print("Testing weight profiles...")
+
+    current = current_profile()
+    assert current is current_profile() and current.name == CURRENT_PROFILE
+    codes = list(MEASURE_CONFIGS)
+    assert len(current.weights) == len(codes)
+    weights = current.part_weights(codes)
+    d02 = codes.index('D02')
+    assert weights['part_d'][d02] == 2.0 and weights['overall'][d02] == 0.0
+    assert current.weight('D02') == 0.0 and current.weight('C12') == 3.0
+    print(f"✓ Profile {current.name}: D02/D03 count in Part D but once overall")
+
+    next_year = load_profile('2027')
+    assert next_year.weights['C04'] == next_year.weights['C05'] == 3.0
+    assert next_year.weights['C12'] == 3.0 and next_year.overall_duplicates == current.overall_duplicates
+    print("✓ 2027 extends 2026 with C04/C05 at weight 3")
+
+    for bad in ({'weights': {'X99': 1}}, {'weights': {'C01': -1}}, {'weights': {'C01': 'high'}}):
+        try:
+            profile_from_dict(bad)
+            assert False, bad
+        except ValueError:
+            pass
+    try:
+        load_profile('1999')
+        assert False
+    except KeyError:
+        pass
+    print("✓ Bad profiles are rejected")
+
+    print("\n✅ All weight profile tests passed!")
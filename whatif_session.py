@@ -0,0 +1,375 @@
+"""
+What-if sessions
+Per-contract running sums so a single measure change updates the ratings in O(1)
+"""
+
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from domain_rollup import NOT_APPLICABLE, domain_star, minimum_rated
+from improvement import IMPROVEMENT_MEASURES
+from measure_config import MEASURE_CONFIGS
+from rating_engine import RATING_PARTS, round_to_half_star
+
+# Sessions kept in memory; the least recently used is dropped beyond this
+MAX_SESSIONS = 1000
+
+# Idle sessions expire after this many seconds
+SESSION_TTL_SECONDS = 3600
+
+# Streamed edits arriving within this window are coalesced into one update
+EDIT_DEBOUNCE_SECONDS = 0.05
+
+
+class WhatIfSession:
+    """
+    One contract's what-if state
+
+    Holds the weighted star sum and total weight of each rating part, and the
+    star sum and rated count of each domain (CMS domain ratings are unweighted;
+    the rounding and Table 5 minimum follow DomainRollup).
+    A measure change swaps its old star for the new one in those sums, so the
+    ratings are recomputed without touching the other measures.
+
+    With an ImprovementEngine, edits to measures used in C30/D04 also re-derive
+    the improvement stars; the published star stays until the modelled star
+    moves away from its own baseline.
+    """
+
+    def __init__(self, session_id: str, engine, contract_id: str, improvement=None):
+        index = engine.index
+        contract_id = str(contract_id).strip()
+        row = index.row_of.get(contract_id)
+        if row is None:
+            raise ValueError(f"Contract {contract_id} not found")
+
+        self.session_id = session_id
+        self.contract_id = contract_id
+        self.index = index
+        self.row = row
+        self.part_d_set = int(index.part_d_set[row])
+        self.baseline_stars = index.stars[row].astype(np.int64)
+        self.stars = self.baseline_stars.copy()
+        self.overrides: Dict[str, float] = {}
+        self.values = index.values[row].copy()
+        self.cai = {part: float(engine.cai[part][row]) for part in RATING_PARTS}
+        self.last_used = time.time()
+
+        weights = engine.weights
+        # Per measure: (part, weight) pairs it contributes to
+        self._contributions: List[List[Tuple[str, float]]] = [
+            [(part, float(weights[part][m])) for part in RATING_PARTS if engine.masks[part][m]]
+            for m in range(len(index.codes))
+        ]
+        self._domains = [MEASURE_CONFIGS[code].domain for code in index.codes]
+
+        self.weighted_sum = {part: 0.0 for part in RATING_PARTS}
+        self.total_weight = {part: 0.0 for part in RATING_PARTS}
+        self.domain_sum: Dict[str, int] = {domain: 0 for domain in self._domains}
+        self.domain_count: Dict[str, int] = {domain: 0 for domain in self._domains}
+        # Rated measures each domain needs; "not required" / "benefit not offered" measures do not count
+        applicable: Dict[str, int] = {domain: 0 for domain in self._domains}
+        for domain, special in zip(self._domains, index.special[row]):
+            applicable[domain] += int(special not in NOT_APPLICABLE)
+        self.domain_minimum = {domain: int(minimum_rated(n)) for domain, n in applicable.items()}
+        for m, star in enumerate(self.stars):
+            self._add(m, int(star), 1)
+
+        self.improvement = improvement
+        if improvement is not None:
+            self._improvement_baseline = improvement.contract_stars(row, self.values, self.stars)
+
+        self._ratings = self.ratings()
+        self._domain_ratings = self.domain_ratings()
+
+    def _set_star(self, m: int, new_star: int):
+        old_star = int(self.stars[m])
+        if new_star != old_star:
+            self._add(m, old_star, -1)
+            self._add(m, new_star, 1)
+            self.stars[m] = new_star
+
+    def _update_improvement(self) -> Dict[str, Optional[int]]:
+        """Re-derive C30/D04 from the edited values; returns the improvement stars that changed"""
+        modelled = self.improvement.contract_stars(self.row, self.values, self.stars)
+        changed = {}
+        for part, code in IMPROVEMENT_MEASURES.items():
+            m = self.improvement.improvement_cols[part]
+            if m is None or code in self.overrides:
+                continue
+            if modelled[part] == self._improvement_baseline[part]:
+                star = int(self.baseline_stars[m])
+            else:
+                star = modelled[part]
+            if star != self.stars[m]:
+                self._set_star(m, star)
+                changed[code] = star or None
+        return changed
+
+    def _add(self, m: int, star: int, sign: int):
+        """Add (sign=1) or remove (sign=-1) one measure star from the running sums"""
+        if star <= 0:
+            return
+        for part, weight in self._contributions[m]:
+            self.weighted_sum[part] += sign * star * weight
+            self.total_weight[part] += sign * weight
+        domain = self._domains[m]
+        self.domain_sum[domain] += sign * star
+        self.domain_count[domain] += sign
+
+    def ratings(self) -> Dict[str, Dict[str, Optional[float]]]:
+        """Raw, CAI-adjusted and half-star rounded rating per part"""
+        has_both = self.total_weight['part_c'] > 0 and self.total_weight['part_d'] > 0
+        result = {}
+        for part in RATING_PARTS:
+            total = self.total_weight[part]
+            if total <= 0 or (part == 'overall' and not has_both):
+                result[part] = {'raw': None, 'adjusted': None, 'rating': None}
+                continue
+            raw = self.weighted_sum[part] / total
+            adjusted = raw + self.cai[part]
+            result[part] = {
+                'raw': round(raw, 6),
+                'adjusted': round(adjusted, 6),
+                'rating': round_to_half_star(adjusted),
+            }
+        return result
+
+    def domain_ratings(self) -> Dict[str, Optional[int]]:
+        """Domain star per domain (same rule as DomainRollup; None when not rated)"""
+        domains = list(self.domain_count)
+        count = np.array([self.domain_count[d] for d in domains])
+        star_sum = np.array([self.domain_sum[d] for d in domains], dtype=np.float64)
+        stars = domain_star(star_sum / np.maximum(count, 1), count, [self.domain_minimum[d] for d in domains])
+        return {domain: int(star) or None for domain, star in zip(domains, stars)}
+
+    def apply(self, measure_code: str, value: Optional[float]) -> Dict:
+        """
+        Set a what-if value for one measure (None reverts to the actual star)
+
+        Args:
+            measure_code: Measure code (e.g., "C01")
+            value: What-if performance value
+
+        Returns:
+            The measure's new star, any improvement measure stars it moved, and
+            only the part and domain ratings that changed
+        """
+        m = self.index.get_column(measure_code)
+        code = self.index.codes[m]
+
+        if value is None:
+            self.overrides.pop(code, None)
+            self.values[m] = self.index.values[self.row, m]
+            new_star = int(self.baseline_stars[m])
+        else:
+            value = float(value)
+            self.overrides[code] = value
+            self.values[m] = value
+            new_star = self.index.cut_points.assign_star(m, value, self.part_d_set) or 0
+
+        self._set_star(m, new_star)
+        improvement = self._update_improvement() if self.improvement is not None else {}
+
+        ratings = self.ratings()
+        domains = self.domain_ratings()
+        changed = {part: r for part, r in ratings.items() if r != self._ratings[part]}
+        changed_domains = {d: r for d, r in domains.items() if r != self._domain_ratings[d]}
+        self._ratings, self._domain_ratings = ratings, domains
+        self.last_used = time.time()
+
+        return {
+            'measure_code': code,
+            'value': value,
+            'star': new_star or None,
+            'baseline_star': int(self.baseline_stars[m]) or None,
+            'improvement': improvement,
+            'ratings': changed,
+            'domains': changed_domains,
+        }
+
+    def apply_many(self, edits: Dict[str, Optional[float]]) -> Dict:
+        """
+        Apply several measure changes as one update
+
+        Every edit is validated before any is applied, so a bad code or value
+        leaves the session unchanged.
+
+        Args:
+            edits: Measure code -> what-if value (None reverts)
+
+        Returns:
+            Dictionary with measures {code: {value, star, baseline_star}},
+            improvement stars moved by the batch, and the part and domain
+            ratings that changed over the whole batch
+        """
+        parsed = {}
+        for code, value in edits.items():
+            code = self.index.codes[self.index.get_column(code)]
+            parsed[code] = None if value is None else float(value)
+
+        ratings, domains = self._ratings, self._domain_ratings
+        measures, improvement = {}, {}
+        for code, value in parsed.items():
+            update = self.apply(code, value)
+            measures[code] = {key: update[key] for key in ('value', 'star', 'baseline_star')}
+            improvement.update(update['improvement'])
+
+        return {
+            'measures': measures,
+            'improvement': improvement,
+            'ratings': {part: r for part, r in self._ratings.items() if r != ratings[part]},
+            'domains': {d: r for d, r in self._domain_ratings.items() if r != domains[d]},
+        }
+
+    def reset(self):
+        """Drop every override"""
+        for code in list(self.overrides):
+            self.apply(code, None)
+
+    def to_dict(self) -> Dict:
+        """Full session state"""
+        return {
+            'session_id': self.session_id,
+            'contract_id': self.contract_id,
+            'overrides': dict(self.overrides),
+            'ratings': self._ratings,
+            'domains': self._domain_ratings,
+        }
+
+
+class WhatIfSessionStore:
+    """In-memory what-if sessions with LRU eviction and an idle timeout"""
+
+    def __init__(self, engine, max_sessions: int = MAX_SESSIONS, ttl: float = SESSION_TTL_SECONDS,
+                 improvement=None):
+        self.engine = engine
+        self.improvement = improvement
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessions: 'OrderedDict[str, WhatIfSession]' = OrderedDict()
+
+    def _expire(self):
+        cutoff = time.time() - self.ttl
+        for session_id in [s for s, session in self._sessions.items() if session.last_used < cutoff]:
+            del self._sessions[session_id]
+
+    def create(self, contract_id: str) -> WhatIfSession:
+        """Start a session for a contract (ValueError if the contract is unknown)"""
+        self._expire()
+        session = WhatIfSession(uuid.uuid4().hex, self.engine, contract_id, self.improvement)
+        self._sessions[session.session_id] = session
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+        return session
+
+    def get(self, session_id: str) -> WhatIfSession:
+        """Look up a live session (KeyError if unknown or expired)"""
+        session = self._sessions.get(session_id)
+        if session is None or session.last_used < time.time() - self.ttl:
+            self._sessions.pop(session_id, None)
+            raise KeyError(f"What-if session {session_id} not found")
+        self._sessions.move_to_end(session_id)
+        return session
+
+    def delete(self, session_id: str):
+        """End a session"""
+        self._sessions.pop(session_id, None)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+
+# Test cases
+if __name__ == "__main__":
+    from contract_report import ContractReportGenerator
+    from measure_index import MeasureIndex
+    from rating_engine import RatingEngine
+
+    print("Testing what-if sessions...")
+
+    generator = ContractReportGenerator()
+    index = MeasureIndex(generator)
+    engine = RatingEngine(index)
+    store = WhatIfSessionStore(engine, max_sessions=2)
+
+    session = store.create('H0028')
+    row = index.row_of['H0028']
+    for part in RATING_PARTS:
+        expected = engine.baseline[part]['raw'][row]
+        assert abs(session.ratings()[part]['raw'] - expected) < 1e-6, part
+    print("✓ Session sums match the rating engine")
+
+    m = index.get_column('C01')
+    top = index.cut_points.bands(m, session.part_d_set)[0]
+    high_value = top['lower'] if top['lower'] is not None else 100.0
+    update = session.apply('C01', high_value)
+    assert update['star'] == 5
+    stars = index.stars.copy()
+    stars[row, m] = 5
+    recomputed = engine.compute(stars)
+    assert abs(session.ratings()['part_c']['raw'] - recomputed['part_c']['raw'][row]) < 1e-6
+    assert 'part_d' not in update['ratings']
+    print("✓ Single measure update matches a full recompute")
+
+    session.apply('C01', None)
+    assert session.ratings()['part_c']['raw'] == round(engine.baseline['part_c']['raw'][row], 6)
+    assert not session.overrides
+    print("✓ Reverting restores the baseline")
+
+    # Domain stars follow DomainRollup (whole-star rounding, Table 5 minimum) for every contract
+    from domain_rollup import DOMAINS, DomainRollup
+    rollup = DomainRollup(engine)
+    for contract_id in index.contract_ids:
+        domains = WhatIfSession('domains', engine, contract_id).domain_ratings()
+        r = index.row_of[contract_id]
+        assert domains == {d: int(rollup.star[r, j]) or None for j, d in enumerate(DOMAINS)}, contract_id
+    print("✓ Domain ratings match DomainRollup")
+
+    store.create('H0034')
+    store.create('H1290')
+    try:
+        store.get(session.session_id)
+        assert False, "oldest session should be evicted"
+    except KeyError:
+        pass
+    print("✓ LRU eviction works")
+
+    session = store.create('H0028')
+    batch = session.apply_many({'C01': high_value, 'c02': 99.0, 'C01 ': None})
+    assert batch['measures']['C01']['star'] == int(session.baseline_stars[m])
+    assert 'C02' in batch['measures'] and session.overrides == {'C02': 99.0}
+    try:
+        session.apply_many({'C03': 50.0, 'X99': 1.0})
+        assert False, "unknown code should be rejected"
+    except ValueError:
+        assert 'C03' not in session.overrides
+    print("✓ Batched edits coalesce and validate up front")
+
+    from improvement import ImprovementEngine
+    shift = np.where(index.is_inverse, 10.0, -10.0)
+    improvement = ImprovementEngine(index, index.values + shift)
+    session = WhatIfSession('imp', engine, 'H0028', improvement)
+    c30 = index.get_column('C30')
+    assert session.stars[c30] == session.baseline_stars[c30]
+    # Undo the synthetic gains on every Part C measure: no net change is 3 stars
+    edits = {index.codes[c]: float(index.values[row, c] + shift[c])
+             for c in np.flatnonzero(improvement.part_cols['part_c']) if np.isfinite(index.values[row, c])}
+    batch = session.apply_many(edits)
+    assert session.stars[c30] == 3 and batch['improvement'].get('C30', 3) == 3
+    session.reset()
+    assert session.stars[c30] == session.baseline_stars[c30]
+    print("✓ Edits re-derive the C30 improvement star")
+
+    start = time.perf_counter()
+    s = store.create('H0034')
+    for i in range(1000):
+        s.apply('C01', 50.0 + (i % 50))
+    elapsed = (time.perf_counter() - start) / 1000
+    print(f"✓ {elapsed * 1e6:.0f} µs per what-if update")
+
+    print("\n✅ All what-if session tests passed!")